@@ -2,7 +2,12 @@ from dash import Dash, html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 from components.experiment_panel import experiment_panel, register_callbacks
 from components.results_panel import results_panel, register_results_callbacks
-from components.live_results_panel import live_results_panel, register_live_results_callbacks, data_storage
+from components.live_results_panel import (live_results_panel, register_live_results_callbacks, data_storage,
+                                           start_ingest, SharedDataStorage)
+from components.compare_panel import compare_panel, register_compare_callbacks
+from components.health_panel import health_panel, register_health_callbacks
+from utils.metrics import registry, process_metrics, count_subprocesses, instrument_dash, register_metrics_endpoint
+from utils.broadcaster import broadcaster, register_event_stream
 
 
 
@@ -17,6 +22,8 @@ sidebar = dbc.Nav(
         dbc.NavLink("Experiment", href="/", active="exact", id="experiment-link"),
         dbc.NavLink("Results", href="/results", active="exact", id="results-link"),
         dbc.NavLink("Live Results", href="/live-results", active="exact", id="live-results-link"),
+        dbc.NavLink("Compare Runs", href="/compare", active="exact", id="compare-link"),
+        dbc.NavLink("Tool Health", href="/health", active="exact", id="health-link"),
      ],
     vertical=True,
     pills=True,
@@ -46,11 +53,15 @@ app.layout = dbc.Container(
 )
 def render_page(pathname):
     if pathname in ("/", "/experiment"):
-        return experiment_panel
+        return experiment_panel()
     elif pathname == "/results":
-        return results_panel
+        return results_panel()
     elif pathname == "/live-results":
-        return live_results_panel
+        return live_results_panel()
+    elif pathname == "/compare":
+        return compare_panel()
+    elif pathname == "/health":
+        return health_panel()
     return html.Div("404: Page not found", className="text-danger")
 
 
@@ -65,6 +76,29 @@ register_results_callbacks(app)
 
 register_live_results_callbacks(app)
 
+register_compare_callbacks(app)
+
+register_health_callbacks(app)
+
+# Server-Sent Events endpoint feeding live latency, container stats, status and terminal output
+register_event_stream(app.server, broadcaster)
+
+# Overhead of the tool itself: callback time and payload size, subprocesses, CPU and memory
+process_metrics(registry)
+count_subprocesses(registry)
+instrument_dash(app, registry)
+metrics_sources = []
+if isinstance(data_storage, SharedDataStorage):
+    metrics_sources.append(({"process": "ingester"}, data_storage.ingester_metrics))
+register_metrics_endpoint(app.server, registry, metrics_sources)
+
+# MQTT (or the shared store relay) starts with the first request, not at import
+app.server.before_request(start_ingest)
+
+# WSGI entry point for the production server (see gunicorn.conf.py)
+server = app.server
+
 if __name__ == "__main__":
-    app.run_server(debug=True)
+    # Development server; use `gunicorn -c gunicorn.conf.py app:server` for multiple workers
+    app.run(debug=True)
     
\ No newline at end of file
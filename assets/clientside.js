@@ -0,0 +1,222 @@
+function extendOrCreate(figure, xs, ys, maxPoints) {
+    // Extend the first trace in place, or build the trace when the figure is still a placeholder
+    var noUpdate = window.dash_clientside.no_update;
+    var trace = figure && figure.data && figure.data[0];
+    if (trace && trace.x && trace.x.length !== 0) {
+        return [[{x: [xs], y: [ys]}, [0], maxPoints], noUpdate];
+    }
+    var base = Object.assign({type: "scatter", mode: "lines+markers"}, trace || {});
+    base.x = xs;
+    base.y = ys;
+    var layout = Object.assign({}, figure ? figure.layout : {}, {annotations: []});
+    return [noUpdate, {data: [base], layout: layout}];
+}
+
+function namedItems(figure, key, name) {
+    // Layout shapes or annotations with the given name
+    var items = (figure && figure.layout && figure.layout[key]) || [];
+    return items.filter(function(item) { return item.name === name; });
+}
+
+function formatBytes(bytes) {
+    if (!bytes) {
+        return "0 B";
+    }
+    var units = ["B", "KB", "MB", "GB", "TB"];
+    var unit = 0;
+    while (bytes >= 1024 && unit < units.length - 1) {
+        bytes /= 1024;
+        unit += 1;
+    }
+    return unit === 0 ? Math.floor(bytes) + " B" : bytes.toFixed(1) + " " + units[unit];
+}
+
+function formatDuration(ms) {
+    var total = Math.max(Math.floor(ms / 1000), 0);
+    var pad = function(v) { return (v < 10 ? "0" : "") + v; };
+    return pad(Math.floor(total / 3600)) + ":" + pad(Math.floor((total % 3600) / 60)) + ":" + pad(total % 60);
+}
+
+var statusSeen = {status: null, at: 0};
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        toggleCollapse: function(n_clicks, is_open) {
+            if (n_clicks) {
+                return !is_open;
+            }
+            return is_open;
+        },
+
+        updateTooltip: function(mouseoverNode, mouseoverEdge, mouseoutNode, mouseoutEdge) {
+            var baseStyle = {
+                position: "absolute",
+                backgroundColor: "white",
+                padding: "5px",
+                border: "1px solid #ccc",
+                borderRadius: "3px",
+                zIndex: 1000,
+                fontSize: "12px"
+            };
+            var triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered || triggered.length === 0) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            if (triggered.some(function(t) { return t.prop_id.indexOf("mouseout") !== -1; })) {
+                return ["", Object.assign({}, baseStyle, {display: "none"})];
+            }
+
+            var propId = triggered[0].prop_id;
+            var text = null;
+            if (propId.indexOf("mouseoverNodeData") !== -1 && mouseoverNode) {
+                text = "CPU: " + (mouseoverNode.cpu || "N/A") + ", Memory: " + (mouseoverNode.memory || "N/A");
+                if (mouseoverNode.profile) {
+                    text += " (" + mouseoverNode.profile + ")";
+                }
+            } else if (propId.indexOf("mouseoverEdgeData") !== -1 && mouseoverEdge) {
+                var bandwidth = mouseoverEdge.bandwidth !== undefined ? mouseoverEdge.bandwidth : 100;
+                text = "Bandwidth: " + bandwidth + " Mbit/s";
+                if (mouseoverEdge.latency !== undefined) {
+                    text += ", Latency: " + mouseoverEdge.latency + " ms";
+                }
+            }
+            if (text === null) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var pos = window.cyMousePos || {x: 10, y: 10};
+            return [text, Object.assign({}, baseStyle, {
+                display: "block",
+                top: (pos.y + 12) + "px",
+                left: (pos.x + 12) + "px"
+            })];
+        }
+    },
+
+    live: {
+        appendLatency: function(batch, figure, config, span, zoom) {
+            // Points are [series, time, latency]; each series is the trace with its name
+            if (!batch || batch.length === 0 || span || zoom) {
+                // Rollup and zoomed views are redrawn from the server instead
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var traces = (figure && figure.data) || [];
+            var indices = {};
+            traces.forEach(function(trace, i) { indices[trace.name] = i; });
+            var groups = {};
+            var order = [];
+            batch.forEach(function(p) {
+                if (!groups[p[0]]) {
+                    groups[p[0]] = {x: [], y: []};
+                    order.push(p[0]);
+                }
+                groups[p[0]].x.push(p[1]);
+                groups[p[0]].y.push(p[2]);
+            });
+            var isNew = function(name) { return indices[name] === undefined; };
+            if (!order.some(isNew)) {
+                return [[{x: order.map(function(n) { return groups[n].x; }),
+                          y: order.map(function(n) { return groups[n].y; })},
+                         order.map(function(n) { return indices[n]; }), config.maxLatencyPoints],
+                        window.dash_clientside.no_update];
+            }
+            // A series appeared: add its trace, and extend the known ones in the same figure
+            var max = config.maxLatencyPoints;
+            var data = traces.map(function(trace) {
+                var group = groups[trace.name];
+                if (!group) {
+                    return trace;
+                }
+                return Object.assign({}, trace, {x: (trace.x || []).concat(group.x).slice(-max),
+                                                 y: (trace.y || []).concat(group.y).slice(-max)});
+            });
+            order.filter(isNew).forEach(function(name) {
+                data.push({type: "scatter", mode: "lines+markers", name: name,
+                           x: groups[name].x.slice(-max), y: groups[name].y.slice(-max)});
+            });
+            // Drop the placeholder text, keep the anomaly labels
+            var layout = Object.assign({}, figure ? figure.layout : {},
+                                       {annotations: namedItems(figure, "annotations", "anomaly")});
+            return [window.dash_clientside.no_update, {data: data, layout: layout}];
+        },
+
+        markAnomalies: function(events, figure, config) {
+            // Same markers as GraphCreator.add_anomaly_markers
+            if (!events || events.length === 0 || !figure) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var colors = {increase: "crimson", spike: "darkorange", decrease: "seagreen"};
+            var shapes = ((figure.layout && figure.layout.shapes) || []).slice();
+            var annotations = ((figure.layout && figure.layout.annotations) || []).slice();
+            events.forEach(function(e) {
+                var color = colors[e.kind] || "gray";
+                var moved = (e.containers || []).map(function(c) {
+                    return c.container + " " + c.metric + ": " + c.before.toFixed(1) + " -> " + c.after.toFixed(1);
+                });
+                shapes.push({type: "line", x0: e.time, x1: e.time, y0: 0, y1: 1, xref: "x", yref: "paper",
+                             name: "anomaly", line: {color: color, width: 1, dash: "dot"}});
+                annotations.push({x: e.time, y: 1, xref: "x", yref: "paper", yanchor: "bottom", showarrow: false,
+                                  text: e.kind, font: {color: color, size: 10}, name: "anomaly",
+                                  hovertext: e.series + ": " + e.value.toFixed(1) + " ms, baseline " +
+                                             e.baseline.toFixed(1) + " ms" + (moved.length ? "<br>" + moved.join("<br>") : "")});
+            });
+            var layout = Object.assign({}, figure.layout, {shapes: shapes.slice(-config.maxAnomalies),
+                                                           annotations: annotations.slice(-config.maxAnomalies)});
+            return {data: figure.data, layout: layout};
+        },
+
+        updateStatus: function(status, n_intervals) {
+            if (!status) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            if (statusSeen.status !== status) {
+                statusSeen = {status: status, at: Date.now()};
+            }
+            var badge = status.connected
+                ? {namespace: "dash_bootstrap_components", type: "Badge",
+                   props: {children: "Connected", color: "success", className: "ml-2"}}
+                : {namespace: "dash_bootstrap_components", type: "Badge",
+                   props: {children: "Disconnected: " + (status.last_error || "Connection error"),
+                           color: "danger", className: "ml-2"}};
+            var duration = "00:00:00";
+            if (status.experiment_running && status.experiment_started_ms) {
+                // Elapsed on the server clock when the status was sent, plus local time since
+                var elapsed = status.server_now_ms - status.experiment_started_ms + (Date.now() - statusSeen.at);
+                duration = formatDuration(elapsed);
+            }
+            return [badge, duration];
+        },
+
+        appendStats: function(batch, selected, cpuFig, memFig, rxFig, txFig, config) {
+            var samples = (batch || []).filter(function(s) { return s[0] === selected; });
+            if (samples.length === 0) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var max = config.maxStatsPoints;
+            var xs = samples.map(function(s) { return s[5]; });
+            var column = function(i, scale) {
+                return samples.map(function(s) { return s[i] / (scale || 1); });
+            };
+            var cpu = extendOrCreate(cpuFig, xs, column(1), max);
+            var mem = extendOrCreate(memFig, xs, column(2), max);
+            var rx = extendOrCreate(rxFig, xs, column(3, 1024), max);
+            var tx = extendOrCreate(txFig, xs, column(4, 1024), max);
+            var last = samples[samples.length - 1];
+            return [
+                last[1].toFixed(1) + "%", last[2].toFixed(1) + "%", formatBytes(last[3]), formatBytes(last[4]),
+                cpu[0], mem[0], rx[0], tx[0], cpu[1], mem[1], rx[1], tx[1]
+            ];
+        },
+
+        spanRefreshDisabled: function(span, zoom) {
+            // Only a selected span that is not zoomed into is redrawn on a timer
+            return !span || !!zoom;
+        },
+
+        appendTerminal: function(lines, current) {
+            if (!lines || lines.length === 0) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return (current || "") + lines.join("");
+        }
+    }
+});
@@ -1,18 +1,13 @@
 (function() {
-    document.addEventListener('DOMContentLoaded', function() {
+    // Dash renders the graph after DOMContentLoaded, so listen on the document and
+    // keep the last pointer position relative to the graph for the tooltip callback.
+    window.cyMousePos = {x: 10, y: 10};
+    document.addEventListener('mousemove', function(e) {
         var cyContainer = document.getElementById('network-topology-graph');
-        if (cyContainer) {
-            cyContainer.addEventListener('mousemove', function(e) {
-                var rect = cyContainer.getBoundingClientRect();
-                var x = e.clientX - rect.left;
-                var y = e.clientY - rect.top;
-                var mouseStore = document.getElementById('mouse-pos-store');
-                if (mouseStore) {
-                    mouseStore.value = JSON.stringify({x: x, y: y});
-                    var event = new Event('input', { bubbles: true });
-                    mouseStore.dispatchEvent(event);
-                }
-            });
+        if (!cyContainer || !cyContainer.contains(e.target)) {
+            return;
         }
+        var rect = cyContainer.getBoundingClientRect();
+        window.cyMousePos = {x: e.clientX - rect.left, y: e.clientY - rect.top};
     });
 })();
@@ -0,0 +1,44 @@
+(function() {
+    // channel -> [store the event is written to, element only present on the page that uses it]
+    var targets = {
+        latency: ["push-latency", "live-results-graph"],
+        anomaly: ["push-anomaly", "live-results-graph"],
+        status: ["push-status", "live-results-graph"],
+        summary: ["push-summary", "latency-summary"],
+        bottlenecks: ["push-bottlenecks", "bottleneck-table"],
+        stats: ["push-stats", "cpu-live-graph"],
+        terminal: ["push-terminal", "terminal-output"],
+        results: ["push-results", "live-csv-dropdown"]
+    };
+
+    function deliver(channel, data) {
+        var target = targets[channel];
+        var clientside = window.dash_clientside;
+        if (!target || !clientside || !clientside.set_props) {
+            return;
+        }
+        // Pages that are not mounted get a fresh snapshot from the server when they render
+        if (!document.getElementById(target[1])) {
+            return;
+        }
+        clientside.set_props(target[0], {data: data});
+    }
+
+    function connect() {
+        if (!window.EventSource) {
+            return;
+        }
+        var source = new EventSource("/events");
+        Object.keys(targets).forEach(function(channel) {
+            source.addEventListener(channel, function(e) {
+                deliver(channel, JSON.parse(e.data));
+            });
+        });
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", connect);
+    } else {
+        connect();
+    }
+})();
@@ -0,0 +1,59 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.clock_sync import ClockSync, ClockResponder, LoopbackTransport, PROBE_TOPIC, REPLY_TOPIC
+
+
+def run(offset_ms, base_ms, jitter_ms, probes, interval_s, window):
+    """Probe a stand-in responder whose clock is offset_ms ahead, over a jittery loopback link.
+
+    Returns the estimator's offset error after every probe, in ms.
+    """
+    rng = random.Random(1)
+    # Queueing delay is one-sided, most messages are quick and a few wait much longer
+    transport = LoopbackTransport(lambda topic: (base_ms + rng.expovariate(1 / jitter_ms)) / 1000)
+    sync = ClockSync(transport.publish, window=window, monitor_id="bench")
+    responder = ClockResponder(transport.publish, "node-1", offset_ms=offset_ms)
+    transport.subscribe(PROBE_TOPIC, lambda payload: responder.handle_probe(payload))
+    transport.subscribe(REPLY_TOPIC, lambda payload: sync.handle_reply(payload))
+
+    errors = []
+    for _ in range(probes):
+        sync.probe()
+        time.sleep(interval_s)
+        errors.append(sync.offset_ms("node-1") - offset_ms)
+    return errors, sync.estimator.estimate("node-1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy of the probe-based clock offset estimate")
+    parser.add_argument("--offset-ms", type=float, default=37.25, help="True skew of the stand-in node")
+    parser.add_argument("--base-ms", type=float, default=2.0, help="Minimum one-way delay")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Mean extra one-way queueing delay")
+    parser.add_argument("--probes", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between probes")
+    parser.add_argument("--window", type=int, default=16)
+    parser.add_argument("--budget-ms", type=float, default=1.0,
+                        help="Fail if the final offset error exceeds this many ms")
+    args = parser.parse_args()
+
+    errors, estimate = run(args.offset_ms, args.base_ms, args.jitter_ms, args.probes, args.interval, args.window)
+    settled = errors[args.window:] or errors
+    print(f"true offset {args.offset_ms:.3f} ms, estimated {estimate['offset_ms']:.3f} ms "
+          f"(best probe delay {estimate['delay_ms']:.3f} ms, bound ±{estimate['error_ms']:.3f} ms)")
+    print(f"error after first probe {errors[0]:+.3f} ms, after {args.probes} probes {errors[-1]:+.3f} ms")
+    print(f"mean |error| once the window is full: {statistics.mean(abs(e) for e in settled):.3f} ms")
+
+    if abs(errors[-1]) > args.budget_ms:
+        print(f"\noffset error {errors[-1]:+.3f} ms is over the {args.budget_ms:.3f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
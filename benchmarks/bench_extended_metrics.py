@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from utils.extended_metrics import ExtendedMetricsCollector  # noqa: E402
+
+# A stand-in worker: an idle process with many threads, like a JVM
+WORKER = "import threading, time\n" \
+         "for _ in range({threads}): threading.Thread(target=time.sleep, args=(3600,), daemon=True).start()\n" \
+         "time.sleep(3600)\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the CPU overhead of the extended metrics collector")
+    parser.add_argument("--interval-ms", type=float, default=250)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--processes", type=int, default=4, help="Worker processes to sample")
+    parser.add_argument("--threads", type=int, default=100, help="Threads per worker, JVMs run dozens")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Fail if the collector uses more than this fraction of one core (e.g. 0.01)")
+    parser.add_argument("--output", default=None, help="Append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER.format(threads=args.threads)])
+               for _ in range(args.processes)]
+    samples = []
+    try:
+        time.sleep(1.0)
+        collector = ExtendedMetricsCollector(lambda ts, rows: samples.append(len(rows)),
+                                             discover=lambda: {f"worker-{w.pid}": w.pid for w in workers},
+                                             interval_s=args.interval_ms / 1000)
+        # Same loop as the collector thread, timed here so the result does not depend on thread scheduling
+        cpu_started, started = time.process_time(), time.monotonic()
+        while time.monotonic() - started < args.seconds:
+            tick = time.monotonic()
+            collector.sample()
+            time.sleep(max(collector.interval_s - (time.monotonic() - tick), 0.0))
+        cpu = time.process_time() - cpu_started
+        wall = time.monotonic() - started
+    finally:
+        for worker in workers:
+            worker.kill()
+
+    ratio = cpu / wall
+    per_sample_ms = 1000 * cpu / max(len(samples), 1)
+    print(f"{len(samples)} samples of ~{max(samples, default=0)} metrics every {args.interval_ms:g} ms from "
+          f"{args.processes} processes x {args.threads} threads")
+    print(f"collector CPU: {ratio * 100:.2f}% of one core, {per_sample_ms:.2f} ms per sample")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "interval_ms": args.interval_ms,
+                "processes": args.processes,
+                "threads": args.threads,
+                "cpu_ratio": round(ratio, 5),
+                "per_sample_ms": round(per_sample_ms, 3),
+            }) + "\n")
+
+    if args.budget is not None and ratio > args.budget:
+        print(f"\ncollector used {ratio * 100:.2f}% of a core, over the {args.budget * 100:.2f}% budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module):
+    """Run `python -X importtime -c "import <module>"` in a fresh interpreter.
+
+    Returns (wall seconds, {module: (self us, cumulative us)}).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the import time of the app (python -X importtime)")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Fail if the median import time of --module exceeds this many seconds")
+    parser.add_argument("--output", default=None, help="Append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    walls, runs = [], []
+    for _ in range(args.repeat):
+        wall, timings = import_profile(args.module)
+        walls.append(wall)
+        runs.append(timings)
+
+    # Median per module across runs, the first run also pays for cold caches
+    modules = set().union(*runs)
+    median = {name: (statistics.median(run.get(name, (0, 0))[0] for run in runs),
+                     statistics.median(run.get(name, (0, 0))[1] for run in runs))
+              for name in modules}
+    import_s = median.get(args.module, (0, 0))[1] / 1e6
+
+    print(f"import {args.module}: {import_s * 1000:.0f} ms (median of {args.repeat}), "
+          f"interpreter + import {statistics.median(walls) * 1000:.0f} ms")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, (self_us, cumulative_us) in sorted(median.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "module": args.module,
+                "import_ms": round(import_s * 1000, 1),
+                "wall_ms": round(statistics.median(walls) * 1000, 1),
+                "top": {name: round(median[name][1] / 1000, 1)
+                        for name in sorted(median, key=lambda n: -median[n][1])[:args.top]},
+            }) + "\n")
+
+    if args.budget is not None and import_s > args.budget:
+        print(f"\nimport {args.module} took {import_s:.2f}s, over the {args.budget:.2f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def encode(rows, fmt):
+    """One MQTT payload holding rows (dicts with the same fields) in the given format"""
+    if fmt == "json":
+        return json.dumps(rows[0] if len(rows) == 1 else rows)
+    if fmt == "msgpack":
+        import msgpack
+        # Columnar map, so the monitor pulls the timestamps out as one array
+        return msgpack.packb({field: [row[field] for row in rows] for field in rows[0]})
+    import pyarrow as pa
+    batch = pa.RecordBatch.from_pylist(rows)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def publish(broker, port, topics, messages, ready, fmt="json", batch=1):
+    """Publisher process: send messages results round-robin over topics as fast as possible,
+    batch results per MQTT message"""
+    import paho.mqtt.client as mqtt
+
+    client = mqtt.Client()
+    client.max_queued_messages_set(0)
+    client.connect(broker, port, 60)
+    client.loop_start()
+    ready.wait()
+    for i in range(0, messages, batch):
+        topic = topics[(i // batch) % len(topics)]
+        rows = [{"bid$timestamp": time.time() * 1000, "query": topic.split("/")[1],
+                 "source": f"sink-{os.getpid()}", "price": j} for j in range(i, min(i + batch, messages))]
+        client.publish(topic, encode(rows, fmt))
+    # QoS 0: wait until everything is on the wire
+    while client.want_write():
+        time.sleep(0.01)
+    time.sleep(0.5)
+    client.loop_stop()
+    client.disconnect()
+
+
+def run_config(shards, args, results):
+    """One measurement in a fresh process, so the shard processes go away with it"""
+    from components.live_results_panel import DataStorage, MQTTClient, ShardedMQTTIngest
+
+    topics = [f"bench/q{i + 1}/results" for i in range(args.queries)]
+    storage = DataStorage()
+    if shards:
+        ingest = ShardedMQTTIngest(storage, shards, group=args.group, topics=topics,
+                                   broker=args.broker, port=args.port)
+    else:
+        ingest = MQTTClient(storage, topics=topics, broker=args.broker, port=args.port)
+    ingest.start()
+    # Let every subscriber connect and subscribe before the load starts
+    time.sleep(args.settle)
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    per_publisher = args.messages // args.publishers
+    publishers = [context.Process(target=publish, args=(args.broker, args.port, topics, per_publisher, ready,
+                                                        args.format, args.batch))
+                  for _ in range(args.publishers)]
+    for process in publishers:
+        process.start()
+    time.sleep(1.0)
+    expected = per_publisher * args.publishers
+    started = time.perf_counter()
+    ready.set()
+
+    received, last_change, last_count = 0, time.perf_counter(), -1
+    while received < expected and time.perf_counter() - last_change < args.idle_timeout:
+        time.sleep(0.05)
+        received = sum(series.count for series in list(storage.series.values()))
+        if received != last_count:
+            last_count, last_change = received, time.perf_counter()
+    elapsed = last_change - started
+    for process in publishers:
+        process.join(timeout=5)
+    if shards:
+        ingest.stop()
+    results.put({"shards": shards, "received": received, "expected": expected,
+                 "seconds": round(elapsed, 3), "rate": round(received / elapsed) if elapsed > 0 else 0})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test MQTT ingestion against a local broker")
+    parser.add_argument("--broker", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--broker-cmd", default="mosquitto -p {port}" if shutil.which("mosquitto") else None,
+                        help="Command starting a local broker, e.g. 'mosquitto -p {port}' (default when installed)")
+    parser.add_argument("--shards", default="0,1,2,4",
+                        help="Shard counts to compare, 0 is the single-threaded MQTTClient")
+    parser.add_argument("--group", default="stream-ui",
+                        help="Shared subscription group, empty to split the topics between shards instead")
+    parser.add_argument("--queries", type=int, default=4, help="Result topics, bench/q<N>/results")
+    parser.add_argument("--publishers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=200_000, help="Results published per run")
+    parser.add_argument("--format", choices=("json", "msgpack", "arrow"), default="json",
+                        help="Payload encoding, msgpack and arrow need the msgpack / pyarrow packages")
+    parser.add_argument("--batch", type=int, default=1, help="Results per MQTT message")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds for subscribers to connect")
+    parser.add_argument("--idle-timeout", type=float, default=5.0,
+                        help="Stop waiting once nothing arrived for this many seconds")
+    parser.add_argument("--output", default=None, help="Append the results as JSON lines to this file")
+    args = parser.parse_args()
+
+    broker = None
+    if args.broker_cmd:
+        broker = subprocess.Popen(shlex.split(args.broker_cmd.format(port=args.port)),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(args.broker, args.port):
+            sys.exit(f"No broker on {args.broker}:{args.port}, start one or pass --broker-cmd")
+        context = multiprocessing.get_context("spawn")
+        print(f"{args.messages} results over {args.queries} topics from {args.publishers} publishers "
+              f"as {args.format} x{args.batch}, {os.cpu_count()} cores")
+        print(f"{'shards':>6} {'received':>10} {'seconds':>8} {'results/s':>9}")
+        for shards in (int(n) for n in args.shards.split(",")):
+            results = context.Queue()
+            process = context.Process(target=run_config, args=(shards, args, results))
+            process.start()
+            result = results.get()
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+            lost = result["expected"] - result["received"]
+            print(f"{shards:>6} {result['received']:>10} {result['seconds']:>8.2f} {result['rate']:>9}"
+                  + (f"  ({lost} lost)" if lost else ""))
+            if args.output:
+                with open(args.output, "a") as f:
+                    f.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "group": args.group,
+                                        "format": args.format, "batch": args.batch,
+                                        "cores": os.cpu_count(), **result}) + "\n")
+    finally:
+        if broker is not None:
+            broker.terminate()
+            broker.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
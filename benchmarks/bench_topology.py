@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.topology import build_tree_elements, count_descendants
+
+
+def count_descendants_recursive(i, num):
+    # The previous implementation, kept here as the reference point
+    count = 0
+    left = 2 * i + 1
+    right = 2 * i + 2
+    if left < num:
+        count += 1 + count_descendants_recursive(left, num)
+    if right < num:
+        count += 1 + count_descendants_recursive(right, num)
+    return count
+
+
+def expanded_to_depth(num, depth):
+    """Expand every node in the top `depth` levels, like a user drilling into the tree."""
+    return [i for i in range(min(num, 2 ** depth - 1)) if 2 * i + 1 < num]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the network topology builder")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--depth", type=int, default=8, help="Levels expanded for the partial render")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>10} {'render':>8} {'elements':>9} {'cold ms':>9} {'cached ms':>10} {'recursive ms':>13}")
+    for num in args.sizes:
+        for name, expanded in (("partial", expanded_to_depth(num, args.depth)),
+                               ("full", [i for i in range(num) if 2 * i + 1 < num])):
+            elements, cold = timed(build_tree_elements, num, expanded)
+            _, cached = timed(build_tree_elements, num, expanded)
+
+            # Labels of the collapsed frontier are what the old code paid for
+            collapsed = [int(e['data']['id']) for e in elements
+                         if 'id' in e['data'] and '[+' in e['data']['label']]
+            recursive = ""
+            if num <= 100_000:
+                _, t = timed(lambda: [count_descendants_recursive(i, num) for i in collapsed])
+                recursive = f"{t * 1000:.1f}"
+            assert all(count_descendants(i, num) >= 0 for i in collapsed)
+            print(f"{num:>10} {name:>8} {len(elements):>9} {cold * 1000:>9.1f} {cached * 1000:>10.3f} {recursive:>13}")
+
+
+if __name__ == "__main__":
+    main()
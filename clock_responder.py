@@ -0,0 +1,44 @@
+import argparse
+import socket
+
+from utils.clock_sync import ClockResponder, PROBE_TOPIC
+
+
+def run_responder(broker, port, source, offset_ms=0.0):
+    """Answer the monitor's clock probes from this node until interrupted."""
+    import paho.mqtt.client as mqtt
+
+    client = mqtt.Client()
+    responder = ClockResponder(client.publish, source, offset_ms=offset_ms)
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            client.subscribe(PROBE_TOPIC)
+            print(f"Answering clock probes as '{source}' on {broker}:{port}")
+        else:
+            print(f"Connection failed with code {rc}")
+
+    def on_message(client, userdata, msg):
+        # Receive time before anything else, it is t2 of the probe
+        received_ms = responder.now_ms()
+        try:
+            responder.handle_probe(msg.payload, received_ms)
+        except Exception as e:
+            print("Clock probe error:", e)
+
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.connect(broker, port, 60)
+    client.loop_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clock probe responder for nodes that publish results")
+    parser.add_argument("--broker", default="172.19.0.1")
+    parser.add_argument("--port", type=int, default=1882)
+    parser.add_argument("--source", default=socket.gethostname(),
+                        help="Name this node uses in the 'source' field of its results")
+    parser.add_argument("--offset-ms", type=float, default=0.0,
+                        help="Shift this responder's clock, to stand in for a skewed node")
+    args = parser.parse_args()
+    run_responder(args.broker, args.port, args.source, args.offset_ms)
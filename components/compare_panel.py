@@ -0,0 +1,145 @@
+from dash import html, dcc, Input, Output, State
+from dash.exceptions import PreventUpdate
+import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
+import os
+from utils.results_index import results_index
+from utils.run_comparison import run_loader, compare_runs, quantile_profile, PROFILE_PROBS
+
+TABLE_COLUMNS = [
+    ("run", "Run"),
+    ("samples", "Samples"),
+    ("p50", "p50"),
+    ("p50_delta_pct", "Δp50 %"),
+    ("p95_delta_pct", "Δp95 %"),
+    ("p99_delta_pct", "Δp99 %"),
+    ("median_delta", "Δmedian"),
+    ("ci_low", "CI low"),
+    ("ci_high", "CI high"),
+    ("p_value", "p-value"),
+]
+
+def format_cell(value):
+    if isinstance(value, bool) or value is None:
+        return "" if value is None else str(value)
+    if isinstance(value, float):
+        if value != value:
+            return "–"
+        if value != 0 and abs(value) < 1e-3:
+            return f"{value:.1e}"
+        return f"{value:.3f}"
+    return str(value)
+
+def build_comparison_table(rows):
+    header = html.Thead(html.Tr([html.Th(label) for _, label in TABLE_COLUMNS] + [html.Th("Status")]))
+    body = []
+    for row in rows:
+        if row["baseline"]:
+            status, class_name = "Baseline", "table-info"
+        elif row.get("regression"):
+            status, class_name = "Regression", "table-danger"
+        else:
+            status, class_name = "OK", None
+        cells = [html.Td(format_cell(row.get(key))) for key, _ in TABLE_COLUMNS]
+        body.append(html.Tr(cells + [html.Td(status)], className=class_name))
+    return dbc.Table([header, html.Tbody(body)], bordered=True, hover=True, size="sm", responsive=True)
+
+def build_profile_figure(runs, baseline):
+    fig = go.Figure()
+    percentiles = PROFILE_PROBS * 100
+    for name, values in runs.items():
+        fig.add_trace(go.Scatter(
+            x=percentiles,
+            y=quantile_profile(values),
+            mode="lines",
+            name=f"{name} (baseline)" if name == baseline else name,
+            line=dict(width=3 if name == baseline else 1.5),
+        ))
+    fig.update_layout(
+        title="Distribution by Percentile",
+        xaxis_title="Percentile",
+        yaxis_title="Value",
+        margin=dict(l=40, r=20, t=40, b=30),
+    )
+    return fig
+
+def compare_panel():
+    """Layout of the Compare Runs page, listing the result files present now."""
+    run_options = [{"label": f, "value": f} for f in results_index.names()]
+    return dbc.Card(
+        dbc.CardBody(
+            [
+                html.H5("Compare Runs", className="card-title"),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Runs"),
+                     dcc.Dropdown(id="compare-runs", options=run_options, multi=True,
+                                  placeholder="Select runs to compare", style={"minWidth": "400px"})],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Pinned Baseline"),
+                     dcc.Dropdown(id="compare-baseline", options=run_options, persistence=True,
+                                  persistence_type="local", placeholder="Select baseline run",
+                                  style={"minWidth": "400px"})],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Metric Column"),
+                     dbc.Input(id="compare-column", placeholder="Second column by default", type="text")],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Regression Threshold (%)"),
+                     dbc.Input(id="compare-threshold", type="number", value=5, min=0)],
+                    className="mb-3",
+                ),
+                dbc.Checklist(
+                    id="compare-higher-better",
+                    options=[{"label": "Higher is better (e.g. throughput)", "value": "higher"}],
+                    value=[],
+                    className="mb-3",
+                ),
+                dbc.Button("Compare", id="compare-btn", color="primary"),
+                html.Div(id="compare-error", className="text-danger mt-2"),
+                dcc.Graph(id="compare-profile-graph"),
+                html.Div(id="compare-table"),
+            ]
+        ),
+        style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0,0,0,0.1)"}
+    )
+
+def register_compare_callbacks(app):
+    @app.callback(
+        [Output("compare-profile-graph", "figure"),
+         Output("compare-table", "children"),
+         Output("compare-error", "children")],
+        Input("compare-btn", "n_clicks"),
+        [State("compare-runs", "value"),
+         State("compare-baseline", "value"),
+         State("compare-column", "value"),
+         State("compare-threshold", "value"),
+         State("compare-higher-better", "value")],
+        prevent_initial_call=True
+    )
+    def update_comparison(n_clicks, selected, baseline, column, threshold, higher_better):
+        if not n_clicks:
+            raise PreventUpdate
+        if not baseline:
+            return {}, None, "Select a baseline run."
+        names = [baseline] + [name for name in (selected or []) if name != baseline]
+        try:
+            runs = {
+                name: run_loader.load(os.path.join("results", name), column or None)
+                for name in names
+            }
+        except Exception as e:
+            print(f"[ERROR] Failed to load runs for comparison: {e}")
+            return {}, None, f"Failed to load runs: {e}"
+
+        rows = compare_runs(
+            baseline,
+            runs,
+            threshold=(threshold or 0) / 100.0,
+            higher_is_better="higher" in (higher_better or []),
+        )
+        return build_profile_figure(runs, baseline), build_comparison_table(rows), ""
@@ -1,236 +1,340 @@
-from dash import html, dcc, Input, Output, State, callback_context
+from dash import html, dcc, Input, Output, State, callback_context, Patch, no_update, ClientsideFunction
 import dash
 import dash_bootstrap_components as dbc
 import dash_cytoscape as cyto
 from utils.file_operations import save_to_yaml, load_yaml_from_content
-import subprocess, threading, time
+from utils.topology import topology_elements, generate_topology, save_topology
+from components.live_results_panel import stats_sampler, data_storage as live_storage
+from utils.run_catalog import run_catalog
+from utils.throughput import run_throughput
+import subprocess, threading, time, math, re
 
 import threading
-terminal_lock = threading.Lock()
-terminal_logs = ""
 
-def count_descendants(i, num):
-    count = 0
-    left = 2 * i + 1
-    right = 2 * i + 2
-    if left < num:
-        count += 1 + count_descendants(left, num)
-    if right < num:
-        count += 1 + count_descendants(right, num)
-    return count
 
-def build_tree_elements(num, expanded):
-    elements = []
+def log_terminal(msg, echo=True):
+    """Append to the terminal log, which is pushed to connected browsers."""
+    # Kept with the live data so every web worker of the production server sees it
+    live_storage.append_terminal(msg)
+    if echo:
+        print(msg, end="")
+
+
+TOPOLOGY_LAYOUTS = {
+    "star": {'name': 'concentric', 'padding': 10},
+    "mesh": {'name': 'circle', 'padding': 10},
+    "tree": {'name': 'breadthfirst', 'directed': True, 'padding': 10},
+}
+
+TOPOLOGY_STYLESHEET = [
+    {'selector': 'node', 'style': {'label': 'data(label)', 'font-size': '10px'}},
+    {'selector': '.group', 'style': {
+        'shape': 'round-rectangle',
+        'background-color': '#6c757d',
+        'width': 'mapData(members, 1, 200, 25, 70)',
+        'height': 'mapData(members, 1, 200, 25, 70)',
+    }},
+    {'selector': 'edge', 'style': {'width': 1, 'line-color': '#adb5bd'}},
+    {'selector': '.bundle', 'style': {
+        'width': 'mapData(count, 1, 1000, 1, 12)',
+        'line-color': '#495057',
+        'opacity': 0.8,
+    }},
+]
 
-    def add_node(i):
-        if i >= num:
-            return
-        left = 2 * i + 1
-        right = 2 * i + 2
-        has_children = left < num
-        if has_children and i not in expanded:
-            descendant_count = count_descendants(i, num)
-            label = f"Node {i} [+{descendant_count}]"
+OVERLAY_LEVELS = 10
+OVERLAY_INTERVAL_MS = 3000
+
+def match_containers(container_names, num, node_containers=None):
+    """Map topology node ids to monitored containers.
+
+    Explicit "Node Containers" from the configuration win; otherwise a coordinator maps to
+    node 0 and a name ending in a number (e.g. "worker-3") maps to that node.
+    """
+    mapping = {int(k): v for k, v in (node_containers or {}).items() if int(k) < num}
+    taken = set(mapping.values())
+    for name in sorted(container_names):
+        if name in taken:
+            continue
+        if "coordinator" in name.lower():
+            node = 0
         else:
-            label = f"Node {i}"
-        elements.append({'data': {'id': str(i), 'label': label, 'cpu': "2.5 GHz", 'memory': "8GB"}})
-        if i in expanded:
-            if left < num:
-                add_node(left)
-                elements.append({'data': {'source': str(i), 'target': str(left), 'bandwidth': 100}})
-            if right < num:
-                add_node(right)
-                elements.append({'data': {'source': str(i), 'target': str(right), 'bandwidth': 100}})
-    add_node(0)
-    return elements
+            match = re.search(r"(\d+)$", name)
+            if not match:
+                continue
+            node = int(match.group(1))
+        if node < num and node not in mapping:
+            mapping[node] = name
+            taken.add(name)
+    return mapping
 
-experiment_panel = dbc.Card(
-    dbc.CardBody(
-        [
-            html.H5("Experiment Configuration", className="card-title"),
-            dbc.InputGroup(
-                [dbc.InputGroupText("Data Set"),
-                 dbc.Input(id="data-set", placeholder="Enter data set", type="text")],
-                className="mb-3",
-            ),
-            dbc.InputGroup(
-                [dbc.InputGroupText("Query"),
-                 dbc.Input(id="query", placeholder="Enter query", type="text")],
-                className="mb-3",
-            ),
-            dbc.InputGroup(
-                [dbc.InputGroupText("Hardware Heterogeneity"),
-                 dcc.Dropdown(
-                     id="hardware-heterogeneity",
-                     options=[
-                         {"label": "Homogeneous", "value": "homogeneous"},
-                         {"label": "Heterogeneous", "value": "heterogeneous"},
-                     ],
-                     placeholder="Select hardware heterogeneity",
-                     style={"width": "300px"},
-                 )],
-                className="mb-3",
-            ),
-            dbc.InputGroup(
-                [dbc.InputGroupText("Network Topology"),
-                 dcc.Dropdown(
-                     id="network-topology",
-                     options=[
-                         {"label": "Star Topology", "value": "star"},
-                         {"label": "Mesh Topology", "value": "mesh"},
-                         {"label": "Tree Topology", "value": "tree"},
-                     ],
-                     placeholder="Select network topology",
-                     style={"width": "300px"},
-                 )],
-                className="mb-3",
-            ),
-            dbc.InputGroup(
-                [dbc.InputGroupText("Number of Nodes"),
-                 dbc.Input(id="num-of-nodes", placeholder="Enter number of nodes", type="number")],
-                className="mb-3",
-            ),
-            html.Div(
-                [
-                    dbc.Button("Save Configuration", id="save-btn", color="success", className="me-2"),
-                    dcc.Upload(
-                        id="upload-config",
-                        children=dbc.Button("Load Configuration", color="secondary", className="me-2"),
-                        accept=".yaml",
-                    ),
-                    dbc.Button("Start Experiment", id="start-btn", color="danger"),
-                ],
-                className="d-flex justify-content-between",
-            ),
-            html.Hr(),
-            html.Div([
-                html.H5("Terminal Output", className="card-title", style={"display": "inline-block"}),
-                dbc.Button("Expand/Collapse", id="toggle-terminal-btn", color="primary", size="sm", style={"marginLeft": "10px"})
-            ]),
-            dbc.Collapse(
-                dbc.Card(
-                    dbc.CardBody(
-                        [
-                            html.Div(
-                                id="terminal-output",
-                                style={
-                                    "backgroundColor": "#1e1e1e",
-                                    "color": "#d4d4d4",
-                                    "height": "400px",
-                                    "overflowY": "scroll",
-                                    "padding": "10px",
-                                    "fontFamily": "monospace",
-                                    "whiteSpace": "pre-wrap",
-                                    "borderRadius": "5px",
-                                },
-                            )
-                        ]
-                    ),
-                    style={"height": "420px"},
+def overlay_levels(stats):
+    """Quantized CPU, memory and network levels, so small fluctuations don't cause style updates."""
+    cpu = min(stats['cpu'][-1], 100.0)
+    memory = min(stats['memory'][-1], 100.0)
+    net_rate = 0.0
+    if len(stats['timestamps']) > 1:
+        dt = (stats['timestamps'][-1] - stats['timestamps'][-2]).total_seconds()
+        moved = (stats['net_rx'][-1] - stats['net_rx'][-2]) + (stats['net_tx'][-1] - stats['net_tx'][-2])
+        if dt > 0 and moved > 0:
+            net_rate = moved / dt / 1024
+    return [
+        int(cpu / 100 * OVERLAY_LEVELS),
+        int(memory / 100 * OVERLAY_LEVELS),
+        min(int(math.log10(net_rate + 1) * 2), OVERLAY_LEVELS),
+    ]
+
+def overlay_styles(node_id, levels):
+    cpu_level, mem_level, net_level = levels
+    # Green at idle to red at full CPU
+    ratio = cpu_level / OVERLAY_LEVELS
+    color = f"rgb({int(40 + 180 * ratio)}, {int(167 - 114 * ratio)}, {int(69 - 16 * ratio)})"
+    size = 20 + 4 * mem_level
+    node_style = {'selector': f'node[id = "{node_id}"]',
+                  'style': {'background-color': color, 'width': size, 'height': size}}
+    # Uplinks of the node (where it is the edge target) get wider with its network rate
+    edge_style = {'selector': f'edge[target = "{node_id}"]',
+                  'style': {'width': 1 + net_level, 'line-color': color}}
+    return node_style, edge_style
+
+def node_profile_pairs(node_profiles):
+    """Hashable form of the {node id: profile} mapping loaded from a configuration."""
+    return tuple(sorted((int(k), v) for k, v in (node_profiles or {}).items()))
+
+def parse_int(value, default=None):
+    try:
+        return int(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+def experiment_panel():
+    """Layout of the Experiment page, built on every visit."""
+    return dbc.Card(
+        dbc.CardBody(
+            [
+                html.H5("Experiment Configuration", className="card-title"),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Data Set"),
+                     dbc.Input(id="data-set", placeholder="Enter data set", type="text")],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Query"),
+                     dbc.Input(id="query", placeholder="Enter query", type="text")],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Hardware Heterogeneity"),
+                     dcc.Dropdown(
+                         id="hardware-heterogeneity",
+                         options=[
+                             {"label": "Homogeneous", "value": "homogeneous"},
+                             {"label": "Heterogeneous", "value": "heterogeneous"},
+                         ],
+                         placeholder="Select hardware heterogeneity",
+                         style={"width": "300px"},
+                     )],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Network Topology"),
+                     dcc.Dropdown(
+                         id="network-topology",
+                         options=[
+                             {"label": "Star Topology", "value": "star"},
+                             {"label": "Mesh Topology", "value": "mesh"},
+                             {"label": "Tree Topology", "value": "tree"},
+                         ],
+                         placeholder="Select network topology",
+                         style={"width": "300px"},
+                     )],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Number of Nodes"),
+                     dbc.Input(id="num-of-nodes", placeholder="Enter number of nodes", type="number")],
+                    className="mb-3",
+                ),
+                dbc.InputGroup(
+                    [dbc.InputGroupText("Topology Degree"),
+                     dbc.Input(id="topology-degree", type="number", min=1,
+                               placeholder="Tree fan-out or mesh neighbours per node (default: binary tree / full mesh)")],
+                    className="mb-3",
                 ),
-                id="terminal-collapse",
-                is_open=True
-            ),
-            dcc.Interval(id="terminal-interval", interval=1000, n_intervals=0),
-            html.Hr(),
-            html.Div([
-                html.H5("Network Topology", className="card-title", style={"display": "inline-block"}),
-                dbc.Button("Expand/Collapse", id="toggle-network-btn", color="primary", size="sm", style={"marginLeft": "10px"})
-            ]),
-            dbc.Collapse(
-                dbc.Card(
-                    dbc.CardBody(
-                        [
-                        html.Div(
+                html.Div(
+                    [
+                        dbc.Button("Save Configuration", id="save-btn", color="success", className="me-2"),
+                        dcc.Upload(
+                            id="upload-config",
+                            children=dbc.Button("Load Configuration", color="secondary", className="me-2"),
+                            accept=".yaml",
+                        ),
+                        dbc.Button("Start Experiment", id="start-btn", color="danger"),
+                    ],
+                    className="d-flex justify-content-between",
+                ),
+                html.Hr(),
+                html.Div([
+                    html.H5("Terminal Output", className="card-title", style={"display": "inline-block"}),
+                    dbc.Button("Expand/Collapse", id="toggle-terminal-btn", color="primary", size="sm", style={"marginLeft": "10px"})
+                ]),
+                dbc.Collapse(
+                    dbc.Card(
+                        dbc.CardBody(
                             [
-                                cyto.Cytoscape(
-                                    id='network-topology-graph',
-                                    layout={'name': 'breadthfirst', 'directed': True, 'padding': 10},
-                                    style={'width': '100%', 'height': '400px'},
-                                    elements=[],
-                                ),
                                 html.Div(
-                                    id="cyto-tooltip",
+                                    id="terminal-output",
                                     style={
-                                        "position": "absolute",
-                                        "display": "none",
-                                        "backgroundColor": "white",
-                                        "padding": "5px",
-                                        "border": "1px solid #ccc",
-                                        "borderRadius": "3px",
-                                        "zIndex": 1000,
-                                        "fontSize": "12px"
-                                    }
+                                        "backgroundColor": "#1e1e1e",
+                                        "color": "#d4d4d4",
+                                        "height": "400px",
+                                        "overflowY": "scroll",
+                                        "padding": "10px",
+                                        "fontFamily": "monospace",
+                                        "whiteSpace": "pre-wrap",
+                                        "borderRadius": "5px",
+                                    },
                                 )
-                            ],
-                            style={"position": "relative", "width": "100%", "height": "400px"}
-                        )
-                        ])
+                            ]
+                        ),
+                        style={"height": "420px"},
+                    ),
+                    id="terminal-collapse",
+                    is_open=True
                 ),
-                id="network-collapse",
-                is_open=True
-            ),
-            dcc.Store(id="expanded-nodes", data=[]),
-        ]
-    ),
-    style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0, 0, 0, 0.1)"},
-)
+                dcc.Store(id="push-terminal"),
+                html.Hr(),
+                html.Div([
+                    html.H5("Network Topology", className="card-title", style={"display": "inline-block"}),
+                    dbc.Button("Expand/Collapse", id="toggle-network-btn", color="primary", size="sm", style={"marginLeft": "10px"})
+                ]),
+                dbc.Collapse(
+                    dbc.Card(
+                        dbc.CardBody(
+                            [
+                            html.Div(
+                                [
+                                    cyto.Cytoscape(
+                                        id='network-topology-graph',
+                                        layout=TOPOLOGY_LAYOUTS["tree"],
+                                        stylesheet=TOPOLOGY_STYLESHEET,
+                                        style={'width': '100%', 'height': '400px'},
+                                        elements=[],
+                                    ),
+                                    html.Div(
+                                        id="cyto-tooltip",
+                                        style={
+                                            "position": "absolute",
+                                            "display": "none",
+                                            "backgroundColor": "white",
+                                            "padding": "5px",
+                                            "border": "1px solid #ccc",
+                                            "borderRadius": "3px",
+                                            "zIndex": 1000,
+                                            "fontSize": "12px"
+                                        }
+                                    )
+                                ],
+                                style={"position": "relative", "width": "100%", "height": "400px"}
+                            )
+                            ])
+                    ),
+                    id="network-collapse",
+                    is_open=True
+                ),
+                dcc.Store(id="expanded-nodes", data=[]),
+                dcc.Store(id="node-profiles", data={}),
+                dcc.Store(id="node-containers", data={}),
+                dcc.Store(id="topology-overlay-state"),
+                dcc.Interval(id="topology-overlay-interval", interval=OVERLAY_INTERVAL_MS, n_intervals=0),
+            ]
+        ),
+        style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0, 0, 0, 0.1)"},
+    )
 
 def run_benchmark(params, data_storage=None):
-    global terminal_logs
     try:
         msg = "Starting experiment...\n"
-        with terminal_lock:
-            terminal_logs += msg
-        print(msg, end="")
+        log_terminal(msg)
         
+        topology = generate_topology(params['network_topology'], int(params['num_of_nodes']),
+                                     params.get('topology_degree'), params['hardware_heterogeneity'],
+                                     node_profiles=node_profile_pairs(params.get('node_profiles')))
+        topology_file = save_topology(topology)
+        command = [
+            "python", "-u", "runBenchmark.py",
+            "--dataset", params['data_set'],
+            "--query", params['query'],
+            "--heterogeneity", params['hardware_heterogeneity'],
+            "--topology", params['network_topology'],
+            "--nodes", str(params['num_of_nodes']),
+            "--topology-file", topology_file,
+        ]
+        if params.get('topology_degree'):
+            command += ["--degree", str(params['topology_degree'])]
+
         if data_storage:
             data_storage.start_experiment()
+            # Sink counts at the start, the run's throughput is what arrives from here on
+            baseline = {name: snapshot["total"] for name, snapshot in data_storage.get_throughput().items()}
+        started_ms = time.time() * 1000
+        run_id = None
         process = subprocess.Popen(
-            [
-                "python", "-u", "runBenchmark.py",
-                "--dataset", params['data_set'],
-                "--query", params['query'],
-                "--heterogeneity", params['hardware_heterogeneity'],
-                "--topology", params['network_topology'],
-                "--nodes", str(params['num_of_nodes'])
-            ],
+            command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
         )
         for stdout_line in iter(process.stdout.readline, ""):
-            with terminal_lock:
-                terminal_logs += stdout_line
-            print(stdout_line, end="")
+            log_terminal(stdout_line)
+            if stdout_line.startswith("Run ID:"):
+                run_id = parse_int(stdout_line.split(":", 1)[1].strip())
         process.stdout.close()
         stderr = process.stderr.read()
         if stderr:
-            with terminal_lock:
-                terminal_logs += stderr
-            print(stderr, end="")
+            log_terminal(stderr)
         process.stderr.close()
         return_code = process.wait()
         if return_code == 0:
             msg = "Experiment completed successfully.\n"
         else:
             msg = f"Experiment failed with return code {return_code}.\n"
-        with terminal_lock:
-            terminal_logs += msg
-        print(msg, end="")
+        log_terminal(msg)
         
         if data_storage:
             data_storage.stop_experiment()
+            if run_id is not None:
+                record_sink_metrics(run_id, data_storage, baseline, started_ms)
             
     except Exception as e:
         msg = f"Error running experiment: {e}\n"
-        with terminal_lock:
-            terminal_logs += msg
-        print(msg, end="")
+        log_terminal(msg)
         
         if data_storage:
             data_storage.stop_experiment()
 
+def record_sink_metrics(run_id, data_storage, baseline, started_ms):
+    """Store the sink throughput, event-time lag, latency anomalies and likely bottlenecks of the run
+    with its results"""
+    finished_ms = time.time() * 1000
+    metrics = run_throughput(data_storage.get_throughput(), baseline, started_ms, finished_ms)
+    if not metrics:
+        log_terminal("No sink results were received during the run.\n")
+        return
+    metrics["latency_anomalies"] = data_storage.get_anomalies(started_ms / 1000, finished_ms / 1000)
+    metrics["bottlenecks"] = data_storage.get_bottlenecks(started_ms / 1000, finished_ms / 1000)
+    try:
+        run_catalog.update_metrics(run_id, metrics)
+    except Exception as e:
+        log_terminal(f"Could not store sink metrics of run {run_id}: {e}\n")
+        return
+    log_terminal(f"Sink: {metrics['sink_events']} events, {metrics['sink_throughput_mean']:.1f} events/s mean, "
+                 f"{metrics['sink_throughput_peak']} events/s peak, "
+                 f"{len(metrics['latency_anomalies'])} latency anomalies\n")
+    for row in metrics["bottlenecks"][:3]:
+        log_terminal(f"Likely bottleneck: {row['container']} {row['metric']}, correlation {row['score']:.2f} "
+                     f"at {row['lag_s']:g} s lag\n")
+
 def register_callbacks(app, data_storage=None):
     @app.callback(
         Output("save-btn", "n_clicks"),
@@ -239,10 +343,13 @@ def register_callbacks(app, data_storage=None):
          State("query", "value"),
          State("hardware-heterogeneity", "value"),
          State("network-topology", "value"),
-         State("num-of-nodes", "value")]
+         State("num-of-nodes", "value"),
+         State("topology-degree", "value"),
+         State("node-profiles", "data"),
+         State("node-containers", "data")]
     )
-    def save_configuration(n_clicks, data_set, query, hardware_heterogeneity, network_topology, num_of_nodes):
-        global terminal_logs
+    def save_configuration(n_clicks, data_set, query, hardware_heterogeneity, network_topology, num_of_nodes,
+                           topology_degree, node_profiles, node_containers):
         if n_clicks:
             config = {
                 "Data Set": data_set,
@@ -250,15 +357,16 @@ def register_callbacks(app, data_storage=None):
                 "Hardware Heterogeneity": hardware_heterogeneity,
                 "Network Topology": network_topology,
                 "Number of Nodes": num_of_nodes,
+                "Topology Degree": topology_degree,
+                "Node Profiles": node_profiles or {},
+                "Node Containers": node_containers or {},
             }
             try:
                 filename = save_to_yaml(config)
                 msg = f"Configuration saved to {filename}\n"
             except Exception as e:
                 msg = f"Error saving configuration: {e}\n"
-            with terminal_lock:
-                terminal_logs += msg
-            print(msg, end="")
+            log_terminal(msg)
             return 0  # Reset n_clicks
         return dash.no_update
 
@@ -267,31 +375,32 @@ def register_callbacks(app, data_storage=None):
          Output("query", "value"),
          Output("hardware-heterogeneity", "value"),
          Output("network-topology", "value"),
-         Output("num-of-nodes", "value")],
+         Output("num-of-nodes", "value"),
+         Output("topology-degree", "value"),
+         Output("node-profiles", "data"),
+         Output("node-containers", "data")],
         [Input("upload-config", "contents")]
     )
     def load_configuration(contents):
-        global terminal_logs
         if contents:
             try:
                 config = load_yaml_from_content(contents)
                 msg = "Configuration loaded successfully.\n"
-                with terminal_lock:
-                    terminal_logs += msg
-                print(msg, end="")
+                log_terminal(msg)
                 return (
                     config.get("Data Set", ""),
                     config.get("Query", ""),
                     config.get("Hardware Heterogeneity", ""),
                     config.get("Network Topology", ""),
-                    config.get("Number of Nodes", None)
+                    config.get("Number of Nodes", None),
+                    config.get("Topology Degree", None),
+                    config.get("Node Profiles") or {},
+                    config.get("Node Containers") or {}
                 )
             except Exception as e:
                 msg = f"Error loading configuration: {e}\n"
-                with terminal_lock:
-                    terminal_logs += msg
-                print(msg, end="")
-        return "", "", "", "", None
+                log_terminal(msg)
+        return "", "", "", "", None, None, {}, {}
 
     @app.callback(
         Output("start-btn", "n_clicks"),
@@ -300,16 +409,16 @@ def register_callbacks(app, data_storage=None):
          State("query", "value"),
          State("hardware-heterogeneity", "value"),
          State("network-topology", "value"),
-         State("num-of-nodes", "value")]
+         State("num-of-nodes", "value"),
+         State("topology-degree", "value"),
+         State("node-profiles", "data")]
     )
-    def start_experiment(n_clicks, data_set, query, hardware_heterogeneity, network_topology, num_of_nodes):
-        global terminal_logs
+    def start_experiment(n_clicks, data_set, query, hardware_heterogeneity, network_topology, num_of_nodes,
+                         topology_degree, node_profiles):
         if n_clicks:
             if not all([data_set, query, hardware_heterogeneity, network_topology, num_of_nodes]):
                 msg = "All fields are required to start an experiment.\n"
-                with terminal_lock:
-                    terminal_logs += msg
-                print(msg, end="")
+                log_terminal(msg)
                 return 0
             params = {
                 "data_set": data_set,
@@ -317,138 +426,157 @@ def register_callbacks(app, data_storage=None):
                 "hardware_heterogeneity": hardware_heterogeneity,
                 "network_topology": network_topology,
                 "num_of_nodes": num_of_nodes,
+                "topology_degree": parse_int(topology_degree),
+                "node_profiles": node_profiles or {},
             }
-            with terminal_lock:
-                terminal_logs += "--------------------------------------------------\n"
+            log_terminal("--------------------------------------------------\n", echo=False)
             threading.Thread(target=run_benchmark, args=(params, data_storage)).start()
         return 0
 
     @app.callback(
         Output("terminal-output", "children"),
-        [Input("terminal-interval", "n_intervals")]
+        [Input("terminal-output", "id")]
+    )
+    def load_terminal(_):
+        # Full log when the page renders, later lines arrive through the event stream
+        return live_storage.get_terminal_output()
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="appendTerminal"),
+        Output("terminal-output", "children", allow_duplicate=True),
+        Input("push-terminal", "data"),
+        State("terminal-output", "children"),
+        prevent_initial_call=True,
     )
-    def update_terminal(n):
-        global terminal_logs
-        with terminal_lock:
-            current_logs = terminal_logs
-        return current_logs
 
     @app.callback(
-        Output("network-topology-graph", "elements"),
+        [Output("network-topology-graph", "elements"),
+         Output("network-topology-graph", "layout")],
         [Input("num-of-nodes", "value"),
          Input("network-topology", "value"),
+         Input("topology-degree", "value"),
+         Input("hardware-heterogeneity", "value"),
+         Input("node-profiles", "data"),
          Input("expanded-nodes", "data")]
     )
-    def update_network_topology(num_nodes, topology_type, expanded):
-        try:
-            num = int(num_nodes) if num_nodes is not None else 3
-        except:
-            num = 3
-        if num <= 3:
-            elements = []
-            for i in range(num):
-                elements.append({'data': {'id': str(i), 'label': f'Node {i}', 'cpu': "2.5 GHz", 'memory': "8GB"}})
-            for i in range(num):
-                left = 2 * i + 1
-                right = 2 * i + 2
-                if left < num:
-                    elements.append({'data': {'source': str(i), 'target': str(left), 'bandwidth': 100}})
-                if right < num:
-                    elements.append({'data': {'source': str(i), 'target': str(right), 'bandwidth': 100}})
-            return elements
-        if expanded is None:
-            expanded = []
-        return build_tree_elements(num, expanded)
+    def update_network_topology(num_nodes, topology_type, degree, heterogeneity, node_profiles, expanded):
+        num = max(parse_int(num_nodes, 3), 0)
+        kind = topology_type or "tree"
+        if kind == "tree" and num <= 3:
+            # Small trees are shown fully expanded
+            expanded = range(num)
+        elements = topology_elements(kind, num, parse_int(degree), expanded or [],
+                                     heterogeneity or "homogeneous", node_profiles=node_profile_pairs(node_profiles))
+        return elements, TOPOLOGY_LAYOUTS.get(kind, TOPOLOGY_LAYOUTS["tree"])
 
     @app.callback(
         Output("expanded-nodes", "data"),
-        [Input("network-topology-graph", "tapNodeData")],
-        [State("expanded-nodes", "data"),
-         State("num-of-nodes", "value")]
+        [Input("network-topology-graph", "tapNodeData"),
+         Input("num-of-nodes", "value"),
+         Input("network-topology", "value"),
+         Input("topology-degree", "value")],
+        [State("expanded-nodes", "data")]
     )
-    def expand_node(tapData, expanded_data, num_nodes):
+    def expand_node(tapData, num_nodes, topology_type, degree, expanded_data):
+        if callback_context.triggered_id != "network-topology-graph":
+            # A different topology invalidates whatever was expanded
+            return []
         if not tapData:
             raise dash.exceptions.PreventUpdate
-        try:
-            num = int(num_nodes) if num_nodes is not None else 3
-        except:
-            num = 3
-        node_id = int(tapData["id"])
-        if 2 * node_id + 1 >= num:
-            raise dash.exceptions.PreventUpdate
+        node_id = tapData["id"]
+        if node_id.startswith("g"):
+            # Collapsed group of a star/mesh topology
+            item = node_id
+        else:
+            num = parse_int(num_nodes, 3)
+            fanout = parse_int(degree) or 2
+            item = int(node_id)
+            if (topology_type or "tree") != "tree" or fanout * item + 1 >= num:
+                raise dash.exceptions.PreventUpdate
         if expanded_data is None:
             expanded_data = []
-        if node_id not in expanded_data:
-            expanded_data.append(node_id)
+        if item not in expanded_data:
+            expanded_data.append(item)
         return expanded_data
 
 
     @app.callback(
+        [Output("network-topology-graph", "stylesheet"),
+         Output("topology-overlay-state", "data")],
+        [Input("topology-overlay-interval", "n_intervals")],
+        [State("num-of-nodes", "value"),
+         State("node-containers", "data"),
+         State("topology-overlay-state", "data")]
+    )
+    def update_topology_overlay(n, num_nodes, node_containers, overlay_state):
+        if data_storage is None:
+            raise dash.exceptions.PreventUpdate
+        stats_sampler.start()
+        num = max(parse_int(num_nodes, 3), 0)
+        # Read once, in shared mode it is rebuilt from the stats ring
+        container_stats = data_storage.container_stats
+        mapping = match_containers(list(container_stats), num, node_containers)
+
+        # Only styles whose level changed are sent, as a patch against the current stylesheet
+        overlay_state = overlay_state or {"next_index": len(TOPOLOGY_STYLESHEET), "nodes": {}}
+        patch = Patch()
+        changed = False
+        for node_id, container in mapping.items():
+            stats = container_stats.get(container)
+            if not stats or not stats['cpu']:
+                continue
+            levels = overlay_levels(stats)
+            entry = overlay_state["nodes"].get(str(node_id))
+            if entry is not None and entry["levels"] == levels:
+                continue
+            node_style, edge_style = overlay_styles(node_id, levels)
+            if entry is None:
+                index = overlay_state["next_index"]
+                patch.append(node_style)
+                patch.append(edge_style)
+                overlay_state["next_index"] += 2
+            else:
+                index = entry["index"]
+                patch[index] = node_style
+                patch[index + 1] = edge_style
+            overlay_state["nodes"][str(node_id)] = {"index": index, "levels": levels}
+            changed = True
+        # Nodes that lost their container (or its stats) go back to the base style; their
+        # stylesheet slots are kept for when a container is matched again
+        for node_id, entry in overlay_state["nodes"].items():
+            container = mapping.get(int(node_id))
+            if entry["levels"] is None or (container_stats.get(container) or {}).get('cpu'):
+                continue
+            patch[entry["index"]] = {'selector': f'node[id = "{node_id}"]', 'style': {}}
+            patch[entry["index"] + 1] = {'selector': f'edge[target = "{node_id}"]', 'style': {}}
+            entry["levels"] = None
+            changed = True
+        if not changed:
+            return no_update, no_update
+        return patch, overlay_state
+
+    # Purely cosmetic interactions run in the browser (assets/clientside.js), so hovering the
+    # topology or toggling a section never round-trips to the server
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="toggleCollapse"),
         Output("terminal-collapse", "is_open"),
         [Input("toggle-terminal-btn", "n_clicks")],
         [State("terminal-collapse", "is_open")]
     )
-    def toggle_terminal(n_clicks, is_open):
-        if n_clicks:
-            return not is_open
-        return is_open
 
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="toggleCollapse"),
         Output("network-collapse", "is_open"),
         [Input("toggle-network-btn", "n_clicks")],
         [State("network-collapse", "is_open")]
     )
-    def toggle_network(n_clicks, is_open):
-        if n_clicks:
-            return not is_open
-        return is_open
-    
-    @app.callback(
-    [Output("cyto-tooltip", "children"),
-     Output("cyto-tooltip", "style")],
-    [Input("network-topology-graph", "mouseoverNodeData"),
-     Input("network-topology-graph", "mouseoverEdgeData"),
-     Input("network-topology-graph", "mouseoutNodeData"),
-     Input("network-topology-graph", "mouseoutEdgeData")]
-        )
-    def update_tooltip(mouseoverNode, mouseoverEdge, mouseoutNode, mouseoutEdge):
-            ctx_trigger = callback_context.triggered
-            if ctx_trigger and any("mouseout" in t["prop_id"] for t in ctx_trigger):
-                return "", {"position": "absolute", "display": "none",
-                            "backgroundColor": "white", "padding": "5px",
-                            "border": "1px solid #ccc", "borderRadius": "3px",
-                            "zIndex": 1000, "fontSize": "12px"}
-            if ctx_trigger:
-                prop_id = ctx_trigger[0]["prop_id"]
-                if "mouseoverNodeData" in prop_id and mouseoverNode:
-                    cpu = mouseoverNode.get("cpu", "N/A")
-                    memory = mouseoverNode.get("memory", "N/A")
-                    tooltip_text = f"CPU: {cpu}, Memory: {memory}"
-                    pos = mouseoverNode.get("position", {"x": 10, "y": 10})
-                    style = {"position": "absolute",
-                            "top": f"{pos.get('y', 10)}px",
-                            "left": f"{pos.get('x', 10)}px",
-                            "display": "block",
-                            "backgroundColor": "white",
-                            "padding": "5px",
-                            "border": "1px solid #ccc",
-                            "borderRadius": "3px",
-                            "zIndex": 1000,
-                            "fontSize": "12px"}
-                    return tooltip_text, style
-                elif "mouseoverEdgeData" in prop_id and mouseoverEdge:
-                    bandwidth = mouseoverEdge.get("bandwidth", 100)
-                    tooltip_text = f"Bandwidth: {bandwidth}"
-                    pos = mouseoverEdge.get("position", {"x": 10, "y": 10})
-                    style = {"position": "absolute",
-                            "top": f"{pos.get('y', 10)}px",
-                            "left": f"{pos.get('x', 10)}px",
-                            "display": "block",
-                            "backgroundColor": "white",
-                            "padding": "5px",
-                            "border": "1px solid #ccc",
-                            "borderRadius": "3px",
-                            "zIndex": 1000,
-                            "fontSize": "12px"}
-                    return tooltip_text, style
-            raise dash.exceptions.PreventUpdate 
\ No newline at end of file
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="updateTooltip"),
+        [Output("cyto-tooltip", "children"),
+         Output("cyto-tooltip", "style")],
+        [Input("network-topology-graph", "mouseoverNodeData"),
+         Input("network-topology-graph", "mouseoverEdgeData"),
+         Input("network-topology-graph", "mouseoutNodeData"),
+         Input("network-topology-graph", "mouseoutEdgeData")]
+    )
@@ -0,0 +1,166 @@
+from dash import html, dcc, Input, Output, State
+import dash_bootstrap_components as dbc
+import time
+from utils.metrics import registry, histogram_quantile
+from components.live_results_panel import data_storage, SharedDataStorage
+
+HEALTH_INTERVAL_MS = 2000
+
+def collect_snapshot():
+    """Metrics of this web process and, in the production server, of the ingester process"""
+    snapshot = registry.snapshot()
+    if isinstance(data_storage, SharedDataStorage):
+        snapshot += [{**m, "labels": {**m["labels"], "process": "ingester"}} for m in data_storage.ingester_metrics()]
+    return snapshot
+
+def series_key(metric):
+    return metric["name"] + "|" + ",".join(f"{k}={v}" for k, v in sorted(metric["labels"].items()))
+
+def matching(snapshot, name, **labels):
+    return [m for m in snapshot if m["name"] == name and all(m["labels"].get(k) == v for k, v in labels.items())]
+
+def metric_total(snapshot, name):
+    return sum(m["value"] for m in matching(snapshot, name))
+
+def counter_values(snapshot):
+    """Counter values by series, kept in the browser between refreshes to compute rates"""
+    return {series_key(m): m["value"] for m in snapshot if m["type"] == "counter"}
+
+def counter_rate(snapshot, previous, elapsed, name, **labels):
+    """Per-second increase since the previous refresh, summed over the matching series"""
+    if not previous or elapsed <= 0:
+        return None
+    increase = 0
+    for m in matching(snapshot, name, **labels):
+        # A series that appeared since the last refresh is counted from the next one
+        increase += m["value"] - previous.get(series_key(m), m["value"])
+    return increase / elapsed
+
+def merged_histogram(snapshot, name, **labels):
+    """One histogram summed over every matching series (e.g. the web and ingester processes)"""
+    merged = None
+    for m in matching(snapshot, name, **labels):
+        if merged is None:
+            merged = {"buckets": m["buckets"], "counts": list(m["counts"]), "sum": m["sum"], "count": m["count"]}
+        else:
+            merged["counts"] = [a + b for a, b in zip(merged["counts"], m["counts"])]
+            merged["sum"] += m["sum"]
+            merged["count"] += m["count"]
+    return merged
+
+def format_value(value, scale=1.0, unit="", digits=1):
+    if value is None:
+        return "–"
+    return f"{value * scale:.{digits}f}{unit}"
+
+def summary_card(title, value, detail=""):
+    return dbc.Col(dbc.Card(dbc.CardBody([
+        html.H6(title, className="text-muted"),
+        html.Div(value, className="h4"),
+        html.Small(detail, className="text-muted"),
+    ])), width=3, className="mb-3")
+
+def build_summary(snapshot, previous, elapsed):
+    on_message = merged_histogram(snapshot, "mqtt_on_message_seconds")
+    ingest_rate = counter_rate(snapshot, previous, elapsed, "mqtt_messages_total")
+    cpu = counter_rate(snapshot, previous, elapsed, "process_cpu_seconds_total")
+    rss = metric_total(snapshot, "process_resident_memory_bytes")
+    errors = metric_total(snapshot, "mqtt_message_errors_total")
+    return dbc.Row([
+        summary_card("Ingest Rate", format_value(ingest_rate, unit=" msg/s"),
+                     f"{metric_total(snapshot, 'mqtt_messages_total')} messages, {errors} errors"),
+        summary_card("_on_message", format_value(histogram_quantile(on_message, 0.5) if on_message else None,
+                                                 1e6, " µs"),
+                     f"p99 {format_value(histogram_quantile(on_message, 0.99) if on_message else None, 1e6, ' µs')}"),
+        summary_card("Tool CPU", format_value(cpu, 100, " %"), "of one core, web + ingester"),
+        summary_card("Tool Memory", format_value(rss, 1 / 2 ** 20, " MB", 0),
+                     f"{metric_total(snapshot, 'sse_subscribers')} event stream clients"),
+    ])
+
+def build_callback_table(snapshot):
+    names = sorted({m["labels"]["callback"] for m in snapshot if m["name"] == "dash_callback_duration_seconds"})
+    header = html.Thead(html.Tr([html.Th(h) for h in
+                                 ("Callback", "Calls", "Mean ms", "p95 ms", "Mean response KB", "p95 response KB")]))
+    rows = []
+    for name in names:
+        duration = merged_histogram(snapshot, "dash_callback_duration_seconds", callback=name)
+        size = merged_histogram(snapshot, "dash_callback_response_bytes", callback=name)
+        rows.append(html.Tr([
+            html.Td(name),
+            html.Td(duration["count"]),
+            html.Td(format_value(duration["sum"] / duration["count"], 1000)),
+            html.Td(format_value(histogram_quantile(duration, 0.95), 1000)),
+            html.Td(format_value(size["sum"] / size["count"] if size and size["count"] else None, 1 / 1024)),
+            html.Td(format_value(histogram_quantile(size, 0.95) if size else None, 1 / 1024)),
+        ]))
+    return dbc.Table([header, html.Tbody(rows)], bordered=True, hover=True, size="sm", responsive=True)
+
+def build_subprocess_table(snapshot, previous, elapsed):
+    header = html.Thead(html.Tr([html.Th(h) for h in ("Process", "Command", "Spawned", "Per minute")]))
+    rows = []
+    for m in sorted(matching(snapshot, "subprocess_spawns_total"), key=lambda m: -m["value"]):
+        per_second = counter_rate(snapshot, previous, elapsed, m["name"], **m["labels"])
+        rows.append(html.Tr([
+            html.Td(m["labels"].get("process", "web")),
+            html.Td(m["labels"]["command"]),
+            html.Td(m["value"]),
+            html.Td(format_value(per_second, 60)),
+        ]))
+    return dbc.Table([header, html.Tbody(rows)], bordered=True, hover=True, size="sm", responsive=True)
+
+def build_clock_table(snapshot):
+    header = html.Thead(html.Tr([html.Th(h) for h in ("Source", "Offset ms", "Best probe delay ms")]))
+    delays = {m["labels"]["source"]: m["value"] for m in matching(snapshot, "clock_probe_delay_ms")}
+    rows = [html.Tr([html.Td(m["labels"]["source"]),
+                     html.Td(format_value(m["value"], digits=3)),
+                     html.Td(format_value(delays.get(m["labels"]["source"]), digits=3))])
+            for m in sorted(matching(snapshot, "clock_offset_ms"), key=lambda m: m["labels"]["source"])]
+    if not rows:
+        return html.P("No node has answered a clock probe, latencies are not offset-corrected.",
+                      className="text-muted")
+    return dbc.Table([header, html.Tbody(rows)], bordered=True, hover=True, size="sm", responsive=True)
+
+def health_panel():
+    """Layout of the Tool Health page: what the monitoring tool itself costs."""
+    return dbc.Card(
+        dbc.CardBody(
+            [
+                html.H5("Tool Health", className="card-title"),
+                html.P("Overhead of this tool while it monitors a benchmark. Also exported for Prometheus on /metrics.",
+                       className="text-muted"),
+                html.Div(id="health-summary"),
+                html.H6("Dash Callbacks"),
+                html.Div(id="health-callbacks"),
+                html.H6("Subprocesses"),
+                html.Div(id="health-subprocesses"),
+                html.H6("Clock Offsets"),
+                html.Div(id="health-clocks"),
+                dcc.Store(id="health-previous"),
+                dcc.Interval(id="health-interval", interval=HEALTH_INTERVAL_MS, n_intervals=0),
+            ]
+        ),
+        style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0,0,0,0.1)"}
+    )
+
+def register_health_callbacks(app):
+    @app.callback(
+        [Output("health-summary", "children"),
+         Output("health-callbacks", "children"),
+         Output("health-subprocesses", "children"),
+         Output("health-clocks", "children"),
+         Output("health-previous", "data")],
+        Input("health-interval", "n_intervals"),
+        State("health-previous", "data"),
+    )
+    def update_health(n, previous):
+        now = time.time()
+        snapshot = collect_snapshot()
+        counters = previous["counters"] if previous else None
+        elapsed = now - previous["time"] if previous else 0
+        return (
+            build_summary(snapshot, counters, elapsed),
+            build_callback_table(snapshot),
+            build_subprocess_table(snapshot, counters, elapsed),
+            build_clock_table(snapshot),
+            {"time": now, "counters": counter_values(snapshot)},
+        )
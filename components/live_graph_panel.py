@@ -1,62 +1,113 @@
-from dash import html, dcc, Input, Output, callback_context
+from dash import html, dcc, Input, Output, State, callback_context, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
 import os
 import plotly.express as px
+from utils.broadcaster import broadcaster
+from utils.csv_follower import CSVFollower
+from utils.results_index import results_index
+from utils.range_query import parse_relayout_range, decimate_minmax
+
+csv_follower = CSVFollower()
+
+# Most points drawn; longer files are min/max-decimated until zoomed in
+MAX_PLOT_POINTS = 5000
 
 def list_result_csvs():
-    files = []
-    for fname in os.listdir("results"):
-        if fname.lower().endswith(".csv"):
-            files.append(fname)
-    return sorted(files)
-
-live_graph_panel = dbc.Card(
-    dbc.CardBody(
-        [
-            html.H5("Live Graph", className="card-title"),
-            dbc.Row(
-                [
-                    dbc.Col(
-                        dbc.InputGroup(
-                            [
-                                dbc.InputGroupText("Select CSV"),
-                                dcc.Dropdown(
-                                    id="live-csv-dropdown",
-                                    options=[{"label": f, "value": f} for f in list_result_csvs()],
-                                    value=list_result_csvs()[0] if list_result_csvs() else None,
-                                    clearable=False,
-                                ),
-                            ],
-                            className="mb-3",
+    return results_index.names()
+
+def result_csv_options(names):
+    return [{"label": f, "value": f} for f in names]
+
+def live_graph_panel():
+    """Layout of the live CSV graph, listing the result files present now."""
+    initial_csvs = list_result_csvs()
+    return dbc.Card(
+        dbc.CardBody(
+            [
+                html.H5("Live Graph", className="card-title"),
+                dbc.Row(
+                    [
+                        dbc.Col(
+                            dbc.InputGroup(
+                                [
+                                    dbc.InputGroupText("Select CSV"),
+                                    dcc.Dropdown(
+                                        id="live-csv-dropdown",
+                                        options=result_csv_options(initial_csvs),
+                                        value=initial_csvs[0] if initial_csvs else None,
+                                        clearable=False,
+                                    ),
+                                ],
+                                className="mb-3",
+                            ),
+                            width=9,
                         ),
-                        width=9,
-                    ),
-                ]
-            ),
-            dcc.Graph(id="live-graph"),
-            dcc.Interval(id="live-graph-interval", interval=5_000, n_intervals=0),
-        ]
-    ),
-    style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0,0,0,0.1)"}
-)
+                    ]
+                ),
+                dcc.Graph(id="live-graph"),
+                # [start, end] of the x axis while the graph is zoomed in
+                dcc.Store(id="live-graph-zoom"),
+                dcc.Interval(id="live-graph-interval", interval=5_000, n_intervals=0),
+                # File list pushed by the results index when files come or go (assets/event_stream.js)
+                dcc.Store(id="push-results"),
+            ]
+        ),
+        style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0,0,0,0.1)"}
+    )
 
 def register_live_graph_callbacks(app):
+    # The index's watcher thread publishes the file list once for every open page; files being
+    # appended to leave it as it is
+    results_index.on_members = lambda names: broadcaster.publish("results", names)
+
+    @app.callback(
+        Output("live-csv-dropdown", "options"),
+        Input("push-results", "data"),
+        prevent_initial_call=True,
+    )
+    def refresh_csv_options(names):
+        return result_csv_options(names)
+
     @app.callback(
-        Output("live-graph", "figure"),
+        [Output("live-graph", "figure"),
+         Output("live-graph-zoom", "data")],
         [Input("live-csv-dropdown", "value"),
-         Input("live-graph-interval", "n_intervals")],
+         Input("live-graph-interval", "n_intervals"),
+         Input("live-graph", "relayoutData")],
+        State("live-graph-zoom", "data"),
         prevent_initial_call=False
     )
-    def update_live_graph(selected_csv, n):
+    def update_live_graph(selected_csv, n, relayout, zoom):
         if not selected_csv:
-            return {}
+            return {}, None
         path = os.path.join("results", selected_csv)
         try:
-            df = pd.read_csv(path)
+            df, changed = csv_follower.read(path)
         except Exception:
-            return {}
+            csv_follower.forget(path)
+            return {}, None
+        triggered = callback_context.triggered_id
+        if triggered == "live-graph":
+            # Numeric x axes only, the range comes back in data units
+            window = parse_relayout_range(relayout, dates=False)
+            if window is None:
+                return no_update, no_update
+            zoom = list(window) if window else None
+        elif triggered == "live-csv-dropdown":
+            zoom = None
+        elif not changed or zoom:
+            return no_update, no_update
+        if len(df.columns) < 2:
+            return {}, None
         x, y = df.columns[0], df.columns[1]
-        fig = px.line(df, x=x, y=y, markers=True,
+        if zoom and pd.api.types.is_numeric_dtype(df[x]):
+            df = df[df[x].between(*zoom)]
+        xs, ys = df[x].to_numpy(), df[y].to_numpy()
+        if pd.api.types.is_numeric_dtype(df[y]):
+            xs, ys = decimate_minmax(xs, ys, MAX_PLOT_POINTS)
+        fig = px.line(x=xs, y=ys, markers=len(xs) <= MAX_PLOT_POINTS // 5, labels={"x": x, "y": y},
                       title=f"{y} over {x} — {selected_csv}")
-        return fig
+        if zoom:
+            fig.update_layout(xaxis_range=zoom)
+        return fig, zoom
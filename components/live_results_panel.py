@@ -1,43 +1,407 @@
+import atexit
+import os
 import threading
-import json
 import time
 from datetime import datetime
 from collections import deque
 import subprocess
 
-import paho.mqtt.client as mqtt
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, ClientsideFunction, ctx, no_update
 import dash_bootstrap_components as dbc
-import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
+from utils.broadcaster import broadcaster
+from utils.shared_store import SharedStore, STORE_ENV, STATS_DTYPE, EXTENDED_DTYPE, stats_name
+from utils.ttl_cache import ttl_cache
+from utils.metrics import registry
+from utils.clock_sync import ClockSync, local_clock, REPLY_TOPIC
+from utils.throughput import ThroughputCounter, throughput_stats
+from utils.rollup import RollupStore, pick_resolution, select_window
+from utils.range_query import SampleRing, parse_relayout_range, decimate_minmax
+from utils.payloads import decode_results
+from utils.anomaly import ChangeDetector, correlate_containers
+from utils.correlation import rank_bottlenecks
+from utils.extended_metrics import ExtendedMetricsCollector, read_process_net
 
 class MQTTConfig:
     BROKER = "172.19.0.1"
     PORT = 1882
-    TOPIC = "q1-results"
+    # Comma-separated, MQTT wildcards allowed (e.g. "nexmark/+/results")
+    TOPICS = os.environ.get("STREAM_UI_MQTT_TOPICS", "q1-results").split(",")
+    # Payload field naming the query, the topic is used when absent
+    QUERY_FIELD = "query"
+    # Payload field naming the node that stamped the event, the topic is used when absent
+    SOURCE_FIELD = "source"
+    CLOCK_PROBE_INTERVAL_S = 2.0
+    # Subscriber processes sharing the result topics, 0 decodes everything in one thread
+    INGEST_SHARDS = int(os.environ.get("STREAM_UI_INGEST_SHARDS", 0))
+    # Shared subscription group of the shards; empty splits the topics between them instead
+    INGEST_GROUP = os.environ.get("STREAM_UI_INGEST_GROUP", "stream-ui")
 
 class MonitoringConfig:
     MAX_LATENCY_POINTS = 500
+    # Raw samples kept per series for zooming in, and the most points a zoomed view draws per series
+    RAW_LATENCY_SAMPLES = 100_000
+    MAX_ZOOM_POINTS = 2000
+    # Latest shared latency records searched for the per-series live buffers
+    RECENT_LATENCY_RECORDS = 65536
     MAX_STATS_POINTS = 50
+    # Container samples kept for correlating with latency, as many as the shared stats ring holds
+    STATS_HISTORY = 16384
+    # Latency lags searched and bottleneck rows shown by the resource/latency correlation
+    MAX_CORRELATION_LAG_S = 30
+    MAX_BOTTLENECKS = 10
+    # Finest grid the correlation uses, and the window analyzed when no experiment was started
+    MAX_CORRELATION_POINTS = 3600
+    BOTTLENECK_WINDOW_S = 900
+    BOTTLENECK_INTERVAL_MS = 10000
+    # Per-core CPU, disk I/O, context switches and JVM GC from /proc (utils/extended_metrics.py)
+    EXTENDED_METRICS = os.environ.get("STREAM_UI_EXTENDED_METRICS", "1") != "0"
+    EXTENDED_INTERVAL_MS = 250
+    # Samples kept per extended metric, an hour at 250 ms
+    EXTENDED_SAMPLES = 14400
+    # Metrics not sampled for this long (a process that went away) are dropped
+    EXTENDED_RETIRE_S = 3600
+    # GC logs of JVMs without perf data, comma-separated name=path
+    GC_LOGS = dict(entry.split("=", 1) for entry in os.environ.get("STREAM_UI_GC_LOGS", "").split(",") if "=" in entry)
     UPDATE_INTERVAL_MS = 2000
+    # How long Docker/process discovery results are reused before being refreshed
+    DOCKER_CHECK_TTL_S = 30
+    DISCOVERY_TTL_S = 10
     STATS_INTERVAL_MS = 3000
+    DURATION_INTERVAL_MS = 1000
+    # Most rollup buckets drawn per series, the resolution is picked to stay under it
+    MAX_ROLLUP_POINTS = 1000
+    # Time spans the live graph can show, 0 is the raw points as they arrive
+    LATENCY_SPANS_S = ((0, "Live"), (900, "15 min"), (3600, "1 h"), (21600, "6 h"), (86400, "24 h"))
+    # Latency anomalies kept for the graph and the run catalog
+    MAX_ANOMALIES = 500
 
-class DataStorage:
-    def __init__(self):
+MQTT_MESSAGES = registry.counter("mqtt_messages_total", "MQTT messages received")
+MQTT_ERRORS = registry.counter("mqtt_message_errors_total", "MQTT messages that could not be processed")
+MQTT_PAYLOAD_BYTES = registry.counter("mqtt_payload_bytes_total", "Bytes of MQTT payload received")
+MQTT_RESULTS = registry.counter("mqtt_results_total", "Results decoded, several per batched binary message")
+MQTT_ON_MESSAGE = registry.histogram("mqtt_on_message_seconds", "Time spent in MQTTClient._on_message")
+LATENCY_ANOMALIES = registry.counter("latency_anomalies_total", "Latency change points and spikes detected")
+STATS_SAMPLE = registry.histogram("container_stats_sample_seconds", "Time for one container stats sweep")
+
+def latency_percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+class LatencySeries:
+    """Latency buffer and running summary of one query, or of one query at one sink node.
+
+    samples is the SampleRing raw zoom queries read, None where they read the shared store.
+    """
+    def __init__(self, query, sink=None, index=0, samples=None):
+        self.query = query
+        self.sink = sink
+        self.name = query if sink is None else f"{query} @ {sink}"
+        self.index = index
         self.timestamps = deque(maxlen=MonitoringConfig.MAX_LATENCY_POINTS)
         self.latencies = deque(maxlen=MonitoringConfig.MAX_LATENCY_POINTS)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.throughput = ThroughputCounter()
+        self.rollups = RollupStore(index)
+        self.samples = samples
+        self.detector = ChangeDetector()
+
+    def add(self, timestamp, latency):
+        self.timestamps.append(timestamp)
+        self.latencies.append(latency)
+        self.record(latency, timestamp.timestamp() * 1000)
+
+    def record(self, latency, received_ms):
+        # The event time on the monitor's clock is the receive time minus the latency
+        self.throughput.add(received_ms, received_ms - latency)
+        self.rollups.add(received_ms / 1000, latency)
+        if self.samples is not None:
+            self.samples.append(received_ms / 1000, latency)
+        self.detector.update(received_ms / 1000, latency)
+        self.count += 1
+        self.total += latency
+        self.last = latency
+        if self.min is None or latency < self.min:
+            self.min = latency
+        if self.max is None or latency > self.max:
+            self.max = latency
+
+    def add_batch(self, received_ms, latencies):
+        """Many samples at once, numpy arrays in receive order"""
+        tail = slice(-MonitoringConfig.MAX_LATENCY_POINTS, None)
+        self.timestamps.extend(datetime.fromtimestamp(ms / 1000) for ms in received_ms[tail].tolist())
+        self.latencies.extend(latencies[tail].tolist())
+        self.record_batch(received_ms, latencies)
+
+    def record_batch(self, received_ms, latencies):
+        self.throughput.add_many(received_ms, received_ms - latencies)
+        self.rollups.add_batch(received_ms / 1000, latencies)
+        if self.samples is not None:
+            self.samples.extend(received_ms / 1000, latencies)
+        self.detector.update_many(received_ms / 1000, latencies)
+        self.count += len(latencies)
+        self.total += float(latencies.sum())
+        self.last = float(latencies[-1])
+        low, high = float(latencies.min()), float(latencies.max())
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    def summary(self, recent=None):
+        """Running count/mean/min/max since the start, percentiles over the buffered points"""
+        ordered = sorted(self.latencies if recent is None else recent)
+        return {
+            "name": self.name, "query": self.query, "sink": self.sink,
+            "count": self.count, "mean": self.total / self.count if self.count else None,
+            "min": self.min, "max": self.max, "last": self.last,
+            "p50": latency_percentile(ordered, 0.5), "p95": latency_percentile(ordered, 0.95),
+            "throughput": self.throughput.snapshot(),
+        }
+
+def with_throughput(summary, now_ms=None):
+    """Summary plus events in the last second and event-time lag, as of now"""
+    stats = throughput_stats(summary["throughput"], now_ms)
+    return {**summary, "rate": stats["rate"], "lag_ms": stats["lag_ms"]}
+
+class DataStorage:
+    def __init__(self):
+        # Series by name, and the same series by (query, sink) for routing incoming messages
+        self.series = {}
+        self._routes = {}
+        self._series_lock = threading.Lock()
+        self._summary_thread = None
+        self._bottleneck_thread = None
+        # (monotonic time, rows) of the last bottleneck ranking, shared by every open page
+        self._bottlenecks = (None, [])
+        self._bottleneck_lock = threading.Lock()
         self.connection_status = {"connected": False, "last_error": "Not connected yet"}
         self.container_stats = {}
+        self.stats_history = deque(maxlen=MonitoringConfig.STATS_HISTORY)
+        # (source, metric) -> SampleRing of float32 values, written by the extended metrics collector only
+        self.extended = {}
+        self.extended_seen = {}
         self.experiment_start_time = None
         self.experiment_running = False
+        self.sampled_containers = set()
+        self.terminal_output = ""
+        self._terminal_lock = threading.Lock()
+        self.anomalies = deque(maxlen=MonitoringConfig.MAX_ANOMALIES)
 
-    def add_latency_data(self, timestamp, latency):
-        self.timestamps.append(timestamp)
-        self.latencies.append(latency)
+    def series_for(self, query, sink=None):
+        """The series of a query at a sink node, created on its first message"""
+        series = self._routes.get((query, sink))
+        if series is None:
+            with self._series_lock:
+                series = self._routes.get((query, sink))
+                if series is None:
+                    series = self._new_series(query, sink, len(self.series))
+                    self.series[series.name] = series
+                    self._routes[(query, sink)] = series
+        return series
+
+    def _new_series(self, query, sink, index):
+        series = LatencySeries(query, sink, index, samples=self._raw_samples())
+        series.detector.on_event = lambda event: self._add_anomaly(series, event)
+        return series
+
+    def _raw_samples(self):
+        return SampleRing(MonitoringConfig.RAW_LATENCY_SAMPLES)
+
+    def _add_anomaly(self, series, event):
+        """Name a detected latency event and correlate it with the containers' CPU and memory"""
+        event.update(series=series.name, time=datetime.fromtimestamp(event["ts"]).isoformat(),
+                     containers=correlate_containers(self.container_stats, event["ts"]))
+        LATENCY_ANOMALIES.inc()
+        moved = ", ".join(f"{c['container']} {c['metric']} {c['before']:.1f} -> {c['after']:.1f}"
+                          for c in event["containers"])
+        print(f"Latency {event['kind']} on {series.name}: {event['value']:.1f} ms "
+              f"(baseline {event['baseline']:.1f} ms){'; ' + moved if moved else ''}")
+        self._store_anomaly(event)
+
+    def _store_anomaly(self, event):
+        self.anomalies.append(event)
+        broadcaster.publish("anomaly", [event])
+
+    def get_anomalies(self, start=None, end=None):
+        """Detected latency events, optionally within [start, end] (epoch s)"""
+        return [event for event in list(self.anomalies)
+                if (start is None or event["ts"] >= start) and (end is None or event["ts"] <= end)]
+
+    def add_latency_data(self, timestamp, latency, series=None):
+        series = series or self.series_for(MQTTConfig.TOPICS[0])
+        series.add(timestamp, latency)
+        broadcaster.publish_batched("latency", [series.name, timestamp.isoformat(), latency])
+
+    def add_latency_batch(self, series, received_ms, latencies):
+        """Samples of one series as numpy arrays of receive times (epoch ms) and latencies"""
+        if not len(latencies):
+            return
+        series.add_batch(received_ms, latencies)
+        # The browser keeps no more than this per series anyway
+        tail = slice(-MonitoringConfig.MAX_LATENCY_POINTS, None)
+        for ms, latency in zip(received_ms[tail].tolist(), latencies[tail].tolist()):
+            broadcaster.publish_batched("latency", [series.name, datetime.fromtimestamp(ms / 1000).isoformat(), latency])
+
+    def get_latency_series(self):
+        """{series name: (timestamps, latencies)} of every series"""
+        return {name: (list(series.timestamps), list(series.latencies)) for name, series in list(self.series.items())}
+
+    def get_latency_data(self, name=None):
+        series = self.get_latency_series()
+        if name is None:
+            name = next(iter(series), None)
+        return series.get(name, ([], []))
+
+    def get_latency_summaries(self):
+        return [with_throughput(series.summary()) for series in list(self.series.values())]
+
+    def start_summary_push(self, broadcaster, interval_s=MonitoringConfig.UPDATE_INTERVAL_MS / 1000):
+        """Push the latency summaries to the browsers every interval_s, computed once for all of them"""
+        with self._series_lock:
+            if self._summary_thread is not None:
+                return
+            self._summary_thread = threading.Thread(target=self._push_summaries, args=(broadcaster, interval_s),
+                                                    daemon=True)
+            self._summary_thread.start()
+
+    def _push_summaries(self, broadcaster, interval_s):
+        while True:
+            time.sleep(interval_s)
+            if not broadcaster.has_subscribers:
+                continue
+            try:
+                broadcaster.publish("summary", {"summaries": self.get_latency_summaries(), "now_ms": time.time() * 1000})
+            except Exception as e:
+                print("Latency summary push error:", e)
+
+    def get_throughput(self):
+        """{series name: throughput snapshot} of every series"""
+        return {name: series.throughput.snapshot() for name, series in list(self.series.items())}
+
+    def get_raw_range(self, start, end):
+        """{series name: (times, latencies)} of the raw samples within [start, end] (epoch s).
+
+        None when the raw samples kept no longer reach back to start.
+        """
+        window = {}
+        for name, series in list(self.series.items()):
+            oldest = series.samples.oldest()
+            if oldest is not None and oldest > start and series.samples.count > series.samples.capacity:
+                return None
+            window[name] = series.samples.window(start, end)
+        return window
+
+    def get_rollups(self, resolution, start=None, end=None):
+        """{series name: closed rollup buckets} of one resolution, optionally within [start, end] (epoch s)"""
+        # Samples are stamped with local_clock, buckets must close on the same clock
+        now = local_clock.now_ms() / 1000
+        rollups = {}
+        for name, series in list(self.series.items()):
+            series.rollups.flush(now)
+            rollups[name] = series.rollups.records(resolution, start, end)
+        return rollups
+
+    def add_extended_metrics(self, ts, rows):
+        """One sample (epoch s) of extended metrics as [(source, metric, value)]"""
+        for source, metric, value in rows:
+            ring = self.extended.get((source, metric))
+            if ring is None:
+                self._retire_extended(ts)
+                ring = self.extended[(source, metric)] = SampleRing(MonitoringConfig.EXTENDED_SAMPLES, "f4")
+            ring.append(ts, value)
+            self.extended_seen[(source, metric)] = ts
+
+    def _retire_extended(self, now):
+        """Drop the rings of metrics not sampled for EXTENDED_RETIRE_S, checked when new ones appear"""
+        for name, seen in list(self.extended_seen.items()):
+            if now - seen > MonitoringConfig.EXTENDED_RETIRE_S:
+                del self.extended[name], self.extended_seen[name]
+
+    def get_extended_history(self, start, end):
+        """{source: {metric: (times, values)}} of the extended metrics within [start, end] (epoch s)"""
+        history = {}
+        for (source, metric), ring in list(self.extended.items()):
+            history.setdefault(source, {})[metric] = ring.window(start, end)
+        return history
+
+    def get_bottlenecks(self, start, end):
+        """Container metrics ranked by their lagged correlation with latency over [start, end] (epoch s).
+
+        Latency is the count-weighted mean of every series' rollup buckets, on a grid no finer
+        than the container sampling interval. Extended metrics are ranked alongside.
+        """
+        resolution = pick_resolution(end - start, MonitoringConfig.MAX_CORRELATION_POINTS)
+        buckets = [records for records in self.get_rollups(resolution, start - resolution, end).values()
+                   if len(records)]
+        if not buckets:
+            return []
+        buckets = np.concatenate(buckets)
+        step = max(resolution, MonitoringConfig.STATS_INTERVAL_MS / 1000)
+        return rank_bottlenecks(self.get_stats_history(start, end), buckets["start"] + resolution / 2,
+                                buckets["mean"], start, end, step=step,
+                                max_lag_s=MonitoringConfig.MAX_CORRELATION_LAG_S,
+                                weights=buckets["count"],
+                                extra=self.get_extended_history(start, end))[:MonitoringConfig.MAX_BOTTLENECKS]
+
+    def get_current_bottlenecks(self, max_age_s=MonitoringConfig.BOTTLENECK_INTERVAL_MS / 1000):
+        """Bottlenecks of the current or last experiment (the last few minutes when none was started),
+        ranked at most once every max_age_s in this process"""
+        with self._bottleneck_lock:
+            ranked, rows = self._bottlenecks
+            if ranked is not None and time.monotonic() - ranked < max_age_s:
+                return rows
+            started = self.experiment_start_time
+            end = time.time()
+            start = started.timestamp() if started else end - MonitoringConfig.BOTTLENECK_WINDOW_S
+            rows = self.get_bottlenecks(start, end)
+            self._bottlenecks = (time.monotonic(), rows)
+            return rows
+
+    def start_bottleneck_push(self, broadcaster, interval_s=MonitoringConfig.BOTTLENECK_INTERVAL_MS / 1000):
+        """Push the bottleneck ranking to the browsers every interval_s, ranked once for all of them"""
+        with self._series_lock:
+            if self._bottleneck_thread is not None:
+                return
+            self._bottleneck_thread = threading.Thread(target=self._push_bottlenecks, args=(broadcaster, interval_s),
+                                                       daemon=True)
+            self._bottleneck_thread.start()
+
+    def _push_bottlenecks(self, broadcaster, interval_s):
+        while True:
+            time.sleep(interval_s)
+            if not broadcaster.has_subscribers:
+                continue
+            try:
+                # Slightly under the interval, so a ranking from a page load in between is not reused
+                broadcaster.publish("bottlenecks", self.get_current_bottlenecks(interval_s / 2))
+            except Exception as e:
+                print("Bottleneck push error:", e)
 
     def update_connection_status(self, connected, error=None):
+        changed = (self.connection_status["connected"], self.connection_status["last_error"]) != (connected, error)
         self.connection_status["connected"] = connected
         self.connection_status["last_error"] = error
+        if changed:
+            broadcaster.publish("status", self.get_status())
+
+    def get_status(self):
+        """Connection and experiment state as pushed to the browser"""
+        started = self.experiment_start_time.timestamp() * 1000 if self.experiment_start_time else None
+        return {
+            "connected": self.connection_status["connected"],
+            "last_error": self.connection_status["last_error"],
+            "experiment_running": self.experiment_running,
+            "experiment_started_ms": started,
+            "server_now_ms": time.time() * 1000,
+        }
 
     def get_container_stats(self, container_name):
         if container_name not in self.container_stats:
@@ -57,13 +421,44 @@ class DataStorage:
         stats['net_rx'].append(net_rx)
         stats['net_tx'].append(net_tx)
         stats['timestamps'].append(timestamp)
+        self.stats_history.append((stats_name(container_name), cpu, memory, net_rx, net_tx, timestamp.timestamp()))
+        broadcaster.publish_batched("stats", [container_name, cpu, memory, net_rx, net_tx, timestamp.isoformat()])
+
+    def update_sampled_containers(self, names):
+        self.sampled_containers = set(names)
+
+    def _stats_records(self):
+        return np.array(list(self.stats_history), dtype=STATS_DTYPE)
+
+    def get_stats_history(self, start=None, end=None):
+        """{container: {"ts", "cpu", "memory", "net_rx", "net_tx"} arrays} of the samples within [start, end]"""
+        records = self._stats_records()
+        records = records[(records["ts"] >= (start if start is not None else -np.inf))
+                          & (records["ts"] <= (end if end is not None else np.inf))]
+        history = {}
+        for name in np.unique(records["name"]).tolist():
+            rows = records[records["name"] == name]
+            rows = rows[np.argsort(rows["ts"], kind="stable")]
+            history[name.decode(errors="replace")] = {field: rows[field] for field in ("ts", "cpu", "memory", "net_rx", "net_tx")}
+        return history
+
+    def append_terminal(self, text):
+        with self._terminal_lock:
+            self.terminal_output += text
+        broadcaster.publish_batched("terminal", text)
+
+    def get_terminal_output(self):
+        with self._terminal_lock:
+            return self.terminal_output
 
     def start_experiment(self):
         self.experiment_start_time = datetime.now()
         self.experiment_running = True
+        broadcaster.publish("status", self.get_status())
 
     def stop_experiment(self):
         self.experiment_running = False
+        broadcaster.publish("status", self.get_status())
 
     def get_experiment_duration(self):
         if not self.experiment_running or self.experiment_start_time is None:
@@ -75,12 +470,358 @@ class DataStorage:
         minutes = (total_seconds % 3600) // 60
         seconds = total_seconds % 60
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        
 
-data_storage = DataStorage()
+
+class SharedDataStorage(DataStorage):
+    """DataStorage backed by a SharedStore, for the production server where the MQTT ingester
+    and every web worker are separate processes.
+
+    Nothing is published from here, each web worker runs a relay that tails the store and
+    pushes new records to its own event stream clients.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.latency_ring = store.rings["latency"]
+        self.stats_ring = store.rings["stats"]
+        self.terminal_ring = store.rings["terminal"]
+        self.ingest_slot = store.slots["ingest"]
+        self.experiment_slot = store.slots["experiment"]
+        self.metrics_slot = store.slots["metrics"]
+        self.series_slot = store.slots["series"]
+        self.anomaly_slot = store.slots["anomalies"]
+        self.extended_ring = store.rings["extended"]
+        self.extended_keys_slot = store.slots["extended_keys"]
+        # (source, metric) -> key, and per key its [source, metric, first sample time] (None once
+        # retired) and the time it was last written at
+        self._extended_keys = {}
+        self._extended_names = []
+        self._extended_written = {}
+        self._container_stats = (None, {})
+        # Series are only created in the ingester, web workers read their names from the series slot
+        self.series = {}
+        self._routes = {}
+        self._series_lock = threading.Lock()
+        self._summary_thread = None
+        self._summary_published = 0.0
+        self._bottleneck_thread = None
+        self._bottlenecks = (None, [])
+        self._bottleneck_lock = threading.Lock()
+        # The MQTT loop and the stats sampler are two threads writing the ingest slot
+        self._ingest_lock = threading.Lock()
+        self._relay_thread = None
+
+    def _new_series(self, query, sink, index):
+        series = super()._new_series(query, sink, index)
+        series.rollups.on_close = self._store_rollup
+        return series
+
+    def _raw_samples(self):
+        # Zoom queries read the latency ring instead
+        return None
+
+    def _store_anomaly(self, event):
+        # Only the ingester detects, so it is the slot's single writer; seq tells relays what is new
+        events = self.anomaly_slot.get([])
+        event["seq"] = events[-1]["seq"] + 1 if events else 1
+        events = (events + [event])[-MonitoringConfig.MAX_ANOMALIES:]
+        while True:
+            try:
+                self.anomaly_slot.set(events)
+                return
+            except ValueError:
+                # Unusually large events, keep fewer of them
+                events = events[(len(events) + 1) // 2:]
+
+    def get_anomalies(self, start=None, end=None):
+        return [event for event in self.anomaly_slot.get([])
+                if (start is None or event["ts"] >= start) and (end is None or event["ts"] <= end)]
+
+    def _store_rollup(self, resolution, record):
+        self.store.rings[f"rollup_{resolution}s"].append(record)
+
+    def get_raw_range(self, start, end):
+        ring = self.latency_ring
+        oldest = ring.oldest()
+        if ring.seq > ring.capacity and oldest["ts"] > start:
+            return None
+        records = ring.read_range("ts", start, end)
+        return {name: (records["ts"][records["series"] == index], records["latency"][records["series"] == index])
+                for index, name in self.series_names().items()}
+
+    def get_rollups(self, resolution, start=None, end=None):
+        ring = self.store.rings[f"rollup_{resolution}s"]
+        records = select_window(ring.latest(ring.capacity), start, end)
+        names = self.series_names()
+        return {name: records[records["series"] == index] for index, name in names.items()}
+
+    def _publish_series(self):
+        self._summary_published = time.monotonic()
+        # Percentiles over the buffered points are computed here once, not by every reader
+        self.series_slot.set([{**series.summary(), "index": series.index}
+                              for series in list(self.series.values())])
+
+    def add_latency_data(self, timestamp, latency, series=None):
+        series = series or self.series_for(MQTTConfig.TOPICS[0])
+        ts = timestamp.timestamp()
+        series.record(latency, ts * 1000)
+        # Only for the summary percentiles, readers take the points from the ring
+        series.latencies.append(latency)
+        self.latency_ring.append((ts, latency, series.index))
+        # New series right away so readers can name their points, summaries at most once a second
+        if series.count == 1 or time.monotonic() - self._summary_published > 1.0:
+            self._publish_series()
+
+    def add_latency_batch(self, series, received_ms, latencies):
+        if not len(latencies):
+            return
+        new = series.count == 0
+        series.record_batch(received_ms, latencies)
+        series.latencies.extend(latencies[-MonitoringConfig.MAX_LATENCY_POINTS:].tolist())
+        records = np.empty(len(latencies), dtype=self.latency_ring.dtype)
+        records["ts"] = received_ms / 1000
+        records["latency"] = latencies
+        records["series"] = series.index
+        self.latency_ring.append(records)
+        if new or time.monotonic() - self._summary_published > 1.0:
+            self._publish_series()
+
+    def series_names(self):
+        """Series names by index in the latency ring"""
+        return {entry["index"]: entry["name"] for entry in self.series_slot.get([])}
+
+    def _latency_rows(self):
+        records = self.latency_ring.latest(MonitoringConfig.RECENT_LATENCY_RECORDS)
+        return {index: records[records["series"] == index][-MonitoringConfig.MAX_LATENCY_POINTS:]
+                for index in np.unique(records["series"]).tolist()}
+
+    def get_latency_series(self):
+        names = self.series_names()
+        return {names[index]: ([datetime.fromtimestamp(ts) for ts in rows["ts"]], rows["latency"].tolist())
+                for index, rows in self._latency_rows().items() if index in names}
+
+    def get_latency_summaries(self):
+        return [with_throughput(entry) for entry in self.series_slot.get([])]
+
+    def get_throughput(self):
+        return {entry["name"]: entry["throughput"] for entry in self.series_slot.get([])}
+
+    @property
+    def connection_status(self):
+        ingest = self.ingest_slot.get({})
+        return {"connected": ingest.get("connected", False),
+                "last_error": ingest.get("last_error", "Ingester not running")}
+
+    def _update_ingest(self, **values):
+        with self._ingest_lock:
+            ingest = self.ingest_slot.get({})
+            ingest.update(values)
+            self.ingest_slot.set(ingest)
+
+    def update_connection_status(self, connected, error=None):
+        self._update_ingest(connected=connected, last_error=error)
+
+    @property
+    def sampled_containers(self):
+        return set(self.ingest_slot.get({}).get("sampled", []))
+
+    def update_sampled_containers(self, names):
+        self._update_ingest(sampled=sorted(names))
+
+    @property
+    def experiment_running(self):
+        return self.experiment_slot.get({}).get("running", False)
+
+    @property
+    def experiment_start_time(self):
+        started = self.experiment_slot.get({}).get("started")
+        return datetime.fromtimestamp(started) if started else None
+
+    def start_experiment(self):
+        self.experiment_slot.set({"running": True, "started": time.time()})
+
+    def stop_experiment(self):
+        experiment = self.experiment_slot.get({})
+        experiment["running"] = False
+        self.experiment_slot.set(experiment)
+
+    def _stats_by_container(self, records):
+        container_stats = {}
+        for name in dict.fromkeys(records["name"]):
+            rows = records[records["name"] == name][-MonitoringConfig.MAX_STATS_POINTS:]
+            container_stats[name.decode(errors="replace")] = {
+                'cpu': deque(rows["cpu"].tolist(), maxlen=MonitoringConfig.MAX_STATS_POINTS),
+                'memory': deque(rows["memory"].tolist(), maxlen=MonitoringConfig.MAX_STATS_POINTS),
+                'net_rx': deque(rows["net_rx"].tolist(), maxlen=MonitoringConfig.MAX_STATS_POINTS),
+                'net_tx': deque(rows["net_tx"].tolist(), maxlen=MonitoringConfig.MAX_STATS_POINTS),
+                'timestamps': deque([datetime.fromtimestamp(ts) for ts in rows["ts"]],
+                                    maxlen=MonitoringConfig.MAX_STATS_POINTS),
+            }
+        return container_stats
+
+    @property
+    def container_stats(self):
+        # Rebuilt from the ring only when the ingester appended samples since the last access
+        seq, container_stats = self._container_stats
+        if seq != self.stats_ring.seq:
+            seq = self.stats_ring.seq
+            container_stats = self._stats_by_container(self.stats_ring.latest(self.stats_ring.capacity))
+            self._container_stats = (seq, container_stats)
+        return container_stats
+
+    def get_container_stats(self, container_name):
+        records = self.stats_ring.latest(self.stats_ring.capacity)
+        records = records[records["name"] == stats_name(container_name)]
+        # Keyed by the stored name, which is cut short for very long names
+        stats = next(iter(self._stats_by_container(records).values()), None)
+        if stats is None:
+            stats = {key: deque(maxlen=MonitoringConfig.MAX_STATS_POINTS)
+                     for key in ('cpu', 'memory', 'net_rx', 'net_tx', 'timestamps')}
+        return stats
+
+    def add_container_stats(self, container_name, cpu, memory, net_rx, net_tx, timestamp):
+        self.stats_ring.append((stats_name(container_name), cpu, memory, net_rx, net_tx, timestamp.timestamp()))
+
+    def _stats_records(self):
+        return self.stats_ring.latest(self.stats_ring.capacity)
+
+    def add_extended_metrics(self, ts, rows):
+        keys, values = [], []
+        for source, metric, value in rows:
+            key = self._extended_keys.get((source, metric))
+            if key is None:
+                key = self._new_extended_key(source, metric, ts)
+                if key is None:
+                    continue
+            keys.append(key)
+            values.append(value)
+            self._extended_written[key] = ts
+        records = np.empty(len(keys), dtype=EXTENDED_DTYPE)
+        records["ts"] = ts
+        records["key"] = keys
+        records["value"] = values
+        self.extended_ring.append(records)
+
+    def _new_extended_key(self, source, metric, now):
+        """Key for a new metric, reusing the key of one not sampled for EXTENDED_RETIRE_S.
+
+        Readers take a key's records from its first sample time on, the older ones in the ring
+        belong to the metric that had the key before.
+        """
+        for name, key in list(self._extended_keys.items()):
+            if now - self._extended_written[key] > MonitoringConfig.EXTENDED_RETIRE_S:
+                del self._extended_keys[name]
+                self._extended_names[key] = None
+        names = list(self._extended_names)
+        key = next((key for key, name in enumerate(names) if name is None), len(names))
+        if key == len(names):
+            names.append(None)
+        names[key] = [source, metric, now]
+        try:
+            # Names before the records that use them
+            self.extended_keys_slot.set(names)
+        except ValueError as e:
+            print(f"Extended metric {source} {metric} not stored: {e}")
+            return None
+        self._extended_names = names
+        self._extended_keys[(source, metric)] = key
+        return key
+
+    def get_extended_history(self, start, end):
+        names = self.extended_keys_slot.get([])
+        records = self.extended_ring.read_range("ts", start, end)
+        history = {}
+        for key in np.unique(records["key"]).tolist():
+            if key < len(names) and names[key] is not None:
+                source, metric, since = names[key]
+                rows = records[(records["key"] == key) & (records["ts"] >= since)]
+                history.setdefault(source, {})[metric] = (rows["ts"], rows["value"])
+        return history
+
+    def append_terminal(self, text):
+        data = text.encode()
+        size = self.terminal_ring.dtype["text"].itemsize
+        self.terminal_ring.append([(data[i:i + size],) for i in range(0, len(data), size)])
+
+    def get_terminal_output(self):
+        records = self.terminal_ring.latest(self.terminal_ring.capacity)
+        return b"".join(records["text"]).decode(errors="replace")
+
+    def publish_metrics(self, registry, interval=5.0):
+        """Copy the ingester's metrics and series summaries into the store every interval, for the web workers."""
+        def loop():
+            while True:
+                self.metrics_slot.set(registry.snapshot())
+                if self.series:
+                    self._publish_series()
+                # Close rollup buckets of series that went quiet so readers see them
+                now = local_clock.now_ms() / 1000
+                for series in list(self.series.values()):
+                    series.rollups.flush(now)
+                time.sleep(interval)
+        threading.Thread(target=loop, daemon=True).start()
+
+    def ingester_metrics(self):
+        return self.metrics_slot.get([])
+
+    def start_relay(self, broadcaster, interval=None):
+        with self._ingest_lock:
+            if self._relay_thread is not None:
+                return
+            self._relay_thread = threading.Thread(target=self._relay,
+                                                  args=(broadcaster, interval or broadcaster.flush_interval),
+                                                  daemon=True)
+            self._relay_thread.start()
+
+    def _relay(self, broadcaster, interval):
+        latency_cursor = self.latency_ring.seq
+        stats_cursor = self.stats_ring.seq
+        terminal_cursor = self.terminal_ring.seq
+        status_version = None
+        anomaly_version = self.anomaly_slot.version
+        anomaly_seen = max((event["seq"] for event in self.anomaly_slot.get([])), default=0)
+        while True:
+            time.sleep(interval)
+            latency, latency_cursor = self.latency_ring.read_since(latency_cursor)
+            stats, stats_cursor = self.stats_ring.read_since(stats_cursor)
+            terminal, terminal_cursor = self.terminal_ring.read_since(terminal_cursor)
+            version = (self.ingest_slot.version, self.experiment_slot.version)
+            anomalies = []
+            if self.anomaly_slot.version != anomaly_version:
+                anomaly_version = self.anomaly_slot.version
+                anomalies = [event for event in self.anomaly_slot.get([]) if event["seq"] > anomaly_seen]
+                anomaly_seen = max([event["seq"] for event in anomalies] + [anomaly_seen])
+            if not broadcaster.has_subscribers:
+                status_version = version
+                continue
+            if len(latency):
+                names = self.series_names()
+                broadcaster.publish("latency", [[names.get(index, str(index)), datetime.fromtimestamp(ts).isoformat(),
+                                                 latency_ms] for ts, latency_ms, index in latency.tolist()])
+            if len(stats):
+                broadcaster.publish("stats", [[name.decode(), cpu, memory, net_rx, net_tx,
+                                               datetime.fromtimestamp(ts).isoformat()]
+                                              for name, cpu, memory, net_rx, net_tx, ts in stats.tolist()])
+            if len(terminal):
+                broadcaster.publish("terminal", [b"".join(terminal["text"]).decode(errors="replace")])
+            if anomalies:
+                broadcaster.publish("anomaly", anomalies)
+            if version != status_version:
+                status_version = version
+                broadcaster.publish("status", self.get_status())
+
+
+def create_data_storage():
+    """Shared-memory storage when started by the production server, in-process otherwise"""
+    store_name = os.environ.get(STORE_ENV)
+    if store_name:
+        return SharedDataStorage(SharedStore.attach(store_name))
+    return DataStorage()
+
+data_storage = create_data_storage()
 
 class DockerManager:
     @staticmethod
+    @ttl_cache(MonitoringConfig.DOCKER_CHECK_TTL_S)
     def check_permission():
         try:
             result = subprocess.run(["docker", "version"], capture_output=True, text=True)
@@ -94,6 +835,7 @@ class DockerManager:
             return False, str(e)
 
     @staticmethod
+    @ttl_cache(MonitoringConfig.DISCOVERY_TTL_S)
     def get_container_names():
         has_permission, error = DockerManager.check_permission()
         if not has_permission:
@@ -138,6 +880,38 @@ class DockerManager:
         cpu, memory, net_rx, net_tx, error = ProcessManager.get_process_stats(container_name)
         return cpu, memory, net_rx, net_tx, error
     
+    @staticmethod
+    def get_all_container_stats():
+        """Stats for every running container from a single docker stats call"""
+        has_permission, _ = DockerManager.check_permission()
+        if not has_permission:
+            return {}
+        try:
+            result = subprocess.run([
+                "docker", "stats", "--no-stream", "--format",
+                "{{.Name}}|{{.CPUPerc}}|{{.MemPerc}}|{{.NetIO}}"
+            ], capture_output=True, text=True, timeout=15)
+        except Exception as e:
+            print(f"Error getting container stats: {e}")
+            return {}
+        if result.returncode != 0:
+            return {}
+
+        stats = {}
+        for line in result.stdout.splitlines():
+            parts = line.strip().split("|")
+            if len(parts) != 4:
+                continue
+            name, cpu_str, mem_str, net_str = parts
+            try:
+                cpu_val = float(cpu_str.replace('%', ''))
+                mem_val = float(mem_str.replace('%', ''))
+            except ValueError:
+                continue
+            net_rx, net_tx = DockerManager._parse_network_io(net_str)
+            stats[name] = (cpu_val, mem_val, net_rx, net_tx)
+        return stats
+
     @staticmethod
     def _parse_network_io(net_str):
         """Parse network I/O string like '1.2kB / 3.4MB' and return values in bytes"""
@@ -204,6 +978,45 @@ class ProcessManager:
             print(f"Error getting process names: {e}")
             return []
 
+    # {pid: name} handed out by the last get_java_processes call
+    _java_names = {}
+
+    @staticmethod
+    def get_java_processes():
+        """{name: pid} of the running JVMs, read from /proc without starting ps.
+
+        Several workers of the same jar or main class are numbered (name, name#2, ...) rather
+        than named by pid. A JVM keeps its name while it runs, and a new JVM takes the lowest
+        free number, so one restarted in place of an exited worker gets that worker's name.
+        """
+        found = {}
+        for entry in sorted((entry for entry in os.listdir("/proc") if entry.isdigit()), key=int):
+            try:
+                with open(f"/proc/{entry}/cmdline", "rb") as f:
+                    argv = f.read().split(b"\0")
+            except OSError:
+                continue
+            if argv[0].rsplit(b"/", 1)[-1] != b"java":
+                continue
+            cmd = b" ".join(argv).decode(errors="replace")
+            name = ProcessManager._extract_java_name(cmd, entry)
+            found[int(entry)] = "java" if name == f"java-{entry}" else name
+
+        previous = ProcessManager._java_names
+        names = {pid: previous[pid] for pid, base in found.items()
+                 if pid in previous and previous[pid].split("#")[0] == base}
+        taken = set(names.values())
+        for pid, base in found.items():
+            if pid in names:
+                continue
+            number = 1
+            while (base if number == 1 else f"{base}#{number}") in taken:
+                number += 1
+            names[pid] = base if number == 1 else f"{base}#{number}"
+            taken.add(names[pid])
+        ProcessManager._java_names = names
+        return {name: pid for pid, name in sorted(names.items())}
+
     @staticmethod
     def _is_monitorable_process(cmd):
         keywords = ['java', 'python', 'node', 'nginx', 'kafka', 'flink', 'docker', 'container']
@@ -282,7 +1095,12 @@ class ProcessManager:
                 if len(parts) >= 3:
                     cpu = float(parts[1])
                     mem = float(parts[2])
-                    return cpu, mem, 0.0, 0.0, None
+                    # Counters of the process's network namespace, the container's own for a containerized process
+                    try:
+                        net_rx, net_tx = read_process_net(pid)
+                    except OSError:
+                        net_rx, net_tx = 0.0, 0.0
+                    return cpu, mem, net_rx, net_tx, None
             else:
                 return None, None, 0.0, 0.0, f"Process with PID {pid} not found"
                 
@@ -322,17 +1140,82 @@ class ProcessManager:
         except Exception as e:
             return None, None, 0.0, 0.0, f"Error getting process stats: {str(e)}"
 
+class ContainerStatsSampler:
+    """Samples every running container in the background so views can show all of them at once"""
+    def __init__(self, data_storage, interval_s=MonitoringConfig.STATS_INTERVAL_MS / 1000, enabled=True):
+        self.data_storage = data_storage
+        self.interval_s = interval_s
+        # Disabled in web workers of the production server, the ingester process samples instead
+        self.enabled = enabled
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def covers(self, container_name):
+        return container_name in self.data_storage.sampled_containers
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            sweep_start_ms = local_clock.now_ms()
+            with STATS_SAMPLE.time():
+                stats = DockerManager.get_all_container_stats()
+            # docker stats measures over the sweep; stamp its middle on the clock latencies use
+            now = datetime.fromtimestamp((sweep_start_ms + local_clock.now_ms()) / 2000)
+            for name, (cpu, memory, net_rx, net_tx) in stats.items():
+                self.data_storage.add_container_stats(name, cpu, memory, net_rx, net_tx, now)
+            self.data_storage.update_sampled_containers(stats)
+            time.sleep(max(self.interval_s - (time.monotonic() - started), 0.5))
+
+stats_sampler = ContainerStatsSampler(data_storage, enabled=not isinstance(data_storage, SharedDataStorage))
+
+# Sampled by the ingester in the production server, its web workers read what it stores
+extended_metrics = ExtendedMetricsCollector(
+    data_storage.add_extended_metrics, discover=ProcessManager.get_java_processes,
+    interval_s=MonitoringConfig.EXTENDED_INTERVAL_MS / 1000, gc_logs=MonitoringConfig.GC_LOGS,
+    clock=lambda: local_clock.now_ms() / 1000)
+registry.gauge("extended_metrics_cpu_ratio", "CPU time of the extended metrics collector per wall second",
+               fn=lambda: extended_metrics.overhead)
+
+def start_extended_metrics():
+    if MonitoringConfig.EXTENDED_METRICS:
+        extended_metrics.start()
+
 class MQTTClient:
-    def __init__(self, data_storage):
+    def __init__(self, data_storage, topics=None, broker=MQTTConfig.BROKER, port=MQTTConfig.PORT):
         self.data_storage = data_storage
+        self.topics = MQTTConfig.TOPICS if topics is None else topics
+        self.broker = broker
+        self.port = port
         self.client = None
         self.retry_interval = 5
         self.max_retry_interval = 60
+        self._thread = None
+        self._lock = threading.Lock()
+        # Offsets of the publishing nodes' clocks, probed over the same broker
+        self.clock_sync = ClockSync(self._publish, interval_s=MQTTConfig.CLOCK_PROBE_INTERVAL_S)
 
     def start(self):
-        threading.Thread(target=self._run_mqtt_loop, daemon=True).start()
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run_mqtt_loop, daemon=True)
+            self._thread.start()
+
+    def _publish(self, topic, payload):
+        if self.client is not None and self.client.is_connected():
+            self.client.publish(topic, payload)
 
     def _run_mqtt_loop(self):
+        import paho.mqtt.client as mqtt
         self.client = mqtt.Client()
         self.client.on_message = self._on_message
         self.client.on_connect = self._on_connect
@@ -340,7 +1223,7 @@ class MQTTClient:
         
         while True:
             try:
-                self.client.connect(MQTTConfig.BROKER, MQTTConfig.PORT, 60)
+                self.client.connect(self.broker, self.port, 60)
                 self.retry_interval = 5
                 self.client.loop_forever()
             except Exception as e:
@@ -349,19 +1232,41 @@ class MQTTClient:
                 self.retry_interval = min(self.retry_interval * 2, self.max_retry_interval)
 
     def _on_message(self, client, userdata, msg):
+        start = time.perf_counter()
+        # Receive time first, it is t4 for clock probes and the end of the measured latency
+        now_ms = local_clock.now_ms()
+        if msg.topic.startswith(REPLY_TOPIC):
+            try:
+                self.clock_sync.handle_reply(msg.payload, now_ms)
+            except Exception as e:
+                print("Clock probe reply error:", e)
+            return
+        MQTT_MESSAGES.inc()
+        MQTT_PAYLOAD_BYTES.inc(len(msg.payload))
         try:
-            data = json.loads(msg.payload)
-            pub_ts = datetime.fromtimestamp(float(data["bid$timestamp"]) / 1000.0)
-            now = datetime.now()
-            latency_ms = (now - pub_ts).total_seconds() * 1000
-            self.data_storage.add_latency_data(now, latency_ms)
+            for query, sink, event_ms in decode_results(msg.payload, msg.topic, MQTTConfig.QUERY_FIELD,
+                                                        MQTTConfig.SOURCE_FIELD):
+                # The events were stamped on the source's clock, move them onto ours before subtracting
+                latencies = now_ms - self.clock_sync.to_local_ms(sink or msg.topic, event_ms)
+                series = self.data_storage.series_for(query, sink)
+                MQTT_RESULTS.inc(len(latencies))
+                if len(latencies) == 1:
+                    self.data_storage.add_latency_data(datetime.fromtimestamp(now_ms / 1000.0),
+                                                       float(latencies[0]), series)
+                else:
+                    self.data_storage.add_latency_batch(series, np.full(len(latencies), now_ms), latencies)
         except Exception as e:
+            MQTT_ERRORS.inc()
             print("MQTT message processing error:", e)
+        MQTT_ON_MESSAGE.observe(time.perf_counter() - start)
 
     def _on_connect(self, client, userdata, flags, rc):
         if rc == 0:
             self.data_storage.update_connection_status(True)
-            client.subscribe(MQTTConfig.TOPIC)
+            if self.topics:
+                client.subscribe([(topic, 0) for topic in self.topics])
+            client.subscribe(self.clock_sync.reply_topic)
+            self.clock_sync.start()
         else:
             self.data_storage.update_connection_status(False, f"Connection failed with code {rc}")
 
@@ -369,6 +1274,145 @@ class MQTTClient:
         error_msg = f"Disconnected with error code {rc}" if rc != 0 else "Disconnected"
         self.data_storage.update_connection_status(False, error_msg)
 
+INGEST_BATCH = registry.histogram("ingest_batch_seconds", "Time to store one merged batch from the ingest shards")
+
+class ShardedMQTTIngest:
+    """Ingest with several subscriber processes (utils/ingest_shards.py) instead of one thread.
+
+    The shards share the result topics through an MQTT shared subscription ($share/<group>/...)
+    or split them between themselves, decode the payloads and send compact numpy batches over pipes.
+    This process merges the batches in receive order up to the oldest shard watermark, applies
+    the clock offsets and stores each series' samples with one add_latency_batch call. Clock
+    probes and the connection status still go through a plain MQTTClient without result topics.
+    A shard that exits is restarted up to max_restarts times.
+    """
+    def __init__(self, data_storage, shards, group=MQTTConfig.INGEST_GROUP, topics=None,
+                 broker=MQTTConfig.BROKER, port=MQTTConfig.PORT, flush_s=0.05, max_restarts=5):
+        self.data_storage = data_storage
+        self.shards = shards
+        self.group = group
+        self.topics = MQTTConfig.TOPICS if topics is None else topics
+        self.broker = broker
+        self.port = port
+        self.flush_s = flush_s
+        self.max_restarts = max_restarts
+        self.restarts = {}
+        self._stopping = False
+        self.control = MQTTClient(data_storage, topics=(), broker=broker, port=port)
+        self.clock_sync = self.control.clock_sync
+        self.processes = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.control.start()
+            connections = {self._spawn(shard): shard for shard in range(self.shards)}
+            self._thread = threading.Thread(target=self._run, args=(connections,), daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the shard processes without restarting them"""
+        self._stopping = True
+        for process in self.processes:
+            process.terminate()
+
+    def _spawn(self, shard):
+        """Start the subscriber process of shard; returns the receiving end of its pipe"""
+        import multiprocessing
+        from utils.ingest_shards import run_shard, shard_topics
+        # Spawned, forking a process that already runs threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=run_shard, daemon=True,
+            args=(sender, shard, self.broker, self.port,
+                  shard_topics(self.topics, shard, self.shards, self.group),
+                  MQTTConfig.QUERY_FIELD, MQTTConfig.SOURCE_FIELD, self.flush_s))
+        process.start()
+        sender.close()
+        if shard < len(self.processes):
+            self.processes[shard] = process
+        else:
+            self.processes.append(process)
+        return receiver
+
+    def _run(self, connections):
+        from multiprocessing.connection import wait
+        from utils.ingest_shards import SHARD_DTYPE
+        # Per shard: its local series ids -> (series, clock source)
+        tables = {shard: [] for shard in connections.values()}
+        watermarks = {}
+        pending = []
+        while connections:
+            for conn in wait(list(connections), timeout=self.flush_s):
+                try:
+                    _, shard, names, data, watermark, counts = conn.recv()
+                except (EOFError, OSError):
+                    shard = connections.pop(conn)
+                    # Merging waits for the watermarks of live shards only
+                    watermarks.pop(shard, None)
+                    conn.close()
+                    if self._stopping:
+                        continue
+                    self.restarts[shard] = self.restarts.get(shard, 0) + 1
+                    if self.restarts[shard] > self.max_restarts:
+                        print(f"Ingest shard {shard} exited {self.max_restarts} times, continuing without it")
+                        continue
+                    print(f"Ingest shard {shard} exited, restarting it")
+                    # The new process numbers its series from scratch
+                    tables[shard] = []
+                    connections[self._spawn(shard)] = shard
+                    continue
+                table = tables[shard]
+                for local in sorted(names):
+                    query, sink, clock_source = names[local]
+                    table.append((self.data_storage.series_for(query, sink), clock_source))
+                MQTT_MESSAGES.inc(counts["messages"])
+                MQTT_RESULTS.inc(counts["results"])
+                MQTT_PAYLOAD_BYTES.inc(counts["bytes"])
+                MQTT_ERRORS.inc(counts["errors"])
+                records = np.frombuffer(data, dtype=SHARD_DTYPE)
+                if len(records):
+                    offsets = np.array([self.clock_sync.offset_ms(source) for _, source in table])
+                    series = np.array([s.index for s, _ in table])
+                    # Event times moved onto this host's clock
+                    pending.append((records["received_ms"], records["event_ms"] - offsets[records["series"]],
+                                    series[records["series"]]))
+                watermarks[shard] = watermark
+            if pending and watermarks and len(watermarks) == len(connections):
+                try:
+                    pending = self._store_ready(pending, min(watermarks.values()))
+                except Exception as e:
+                    # Drop the batch rather than stop merging
+                    pending = []
+                    print("Ingest batch storing error:", e)
+
+    def _store_ready(self, pending, watermark):
+        """Store what every shard has sent up to watermark, in receive order; returns the rest"""
+        with INGEST_BATCH.time():
+            received, event, index = (np.concatenate(column) for column in zip(*pending))
+            order = np.argsort(received, kind="stable")
+            received, event, index = received[order], event[order], index[order]
+            ready = int(np.searchsorted(received, watermark, "right"))
+            by_index = {series.index: series for series in list(self.data_storage.series.values())}
+            for i in np.unique(index[:ready]).tolist():
+                mask = index[:ready] == i
+                self.data_storage.add_latency_batch(by_index[i], received[:ready][mask],
+                                                    received[:ready][mask] - event[:ready][mask])
+        if ready == len(received):
+            return []
+        return [(received[ready:], event[ready:], index[ready:])]
+
+def create_ingest_client(data_storage):
+    """Sharded ingest when MQTTConfig.INGEST_SHARDS is set, a single MQTTClient otherwise"""
+    if MQTTConfig.INGEST_SHARDS > 0:
+        return ShardedMQTTIngest(data_storage, MQTTConfig.INGEST_SHARDS)
+    return MQTTClient(data_storage)
+
 class UIComponents:
     @staticmethod
     def create_docker_status_alert():
@@ -393,9 +1437,7 @@ class UIComponents:
         ], color="warning", className="mb-3")
 
     @staticmethod
-    def create_process_dropdown():
-        names = DockerManager.get_container_names()
-        
+    def create_process_dropdown(names=()):
         return dbc.Row(
             dbc.Col(
                 dbc.InputGroup([
@@ -445,23 +1487,103 @@ class UIComponents:
 
 class GraphCreator:
     @staticmethod
-    def create_latency_graph(timestamps, latencies):
-        if not timestamps:
-            fig = px.line(title="End-to-End Event Latency")
+    def create_latency_graph(series):
+        """One trace per query/sink series, overlaid on the same axes"""
+        fig = go.Figure()
+        fig.update_layout(title="End-to-End Event Latency", xaxis_title="Time", yaxis_title="Latency (ms)",
+                          showlegend=True, legend={"orientation": "h", "y": -0.2})
+        if not series:
             fig.update_layout(annotations=[{
                 "text": "Waiting for data...",
                 "xref": "paper", "yref": "paper",
                 "showarrow": False, "font": {"size": 20}
             }])
             return fig
-        
-        fig = px.line(
-            x=list(timestamps), 
-            y=list(latencies), 
-            labels={"x": "Time", "y": "Latency (ms)"}, 
-            title="End-to-End Event Latency"
-        )
-        fig.update_traces(mode="markers+lines")
+
+        for name, (timestamps, latencies) in series.items():
+            fig.add_trace(go.Scatter(x=list(timestamps), y=list(latencies), mode="markers+lines", name=name))
+        return fig
+
+    @staticmethod
+    def create_rollup_graph(rollups, resolution):
+        """Mean latency per rollup bucket of each series, with its p95 dotted"""
+        fig = go.Figure()
+        label = f"{resolution} s" if resolution < 60 else f"{resolution // 60} min"
+        fig.update_layout(title=f"End-to-End Event Latency ({label} rollups)", xaxis_title="Time",
+                          yaxis_title="Latency (ms)", showlegend=True, legend={"orientation": "h", "y": -0.2})
+        rollups = {name: records for name, records in rollups.items() if len(records)}
+        if not rollups:
+            fig.update_layout(annotations=[{
+                "text": "No rollups for this time span yet",
+                "xref": "paper", "yref": "paper",
+                "showarrow": False, "font": {"size": 20}
+            }])
+            return fig
+
+        for name, records in rollups.items():
+            x = [datetime.fromtimestamp(start) for start in records["start"].tolist()]
+            fig.add_trace(go.Scatter(x=x, y=records["mean"], mode="lines", name=name, legendgroup=name,
+                                     customdata=np.stack([records["count"], records["min"], records["max"],
+                                                          records["p50"]], axis=-1),
+                                     hovertemplate="mean %{y:.1f} ms, p50 %{customdata[3]:.1f}, "
+                                                   "min %{customdata[1]:.1f}, max %{customdata[2]:.1f} "
+                                                   "(%{customdata[0]} events)"))
+            fig.add_trace(go.Scatter(x=x, y=records["p95"], mode="lines", name=f"{name} p95", legendgroup=name,
+                                     line={"dash": "dot"}))
+        return fig
+
+    @staticmethod
+    def add_anomaly_markers(fig, events):
+        """A dotted line and a label per detected latency event, named so live updates keep them"""
+        colors = {"increase": "crimson", "spike": "darkorange", "decrease": "seagreen"}
+        for event in events[-MonitoringConfig.MAX_ANOMALIES:]:
+            x = datetime.fromtimestamp(event["ts"])
+            color = colors.get(event["kind"], "gray")
+            moved = "<br>".join(f"{c['container']} {c['metric']}: {c['before']:.1f} -> {c['after']:.1f}"
+                                for c in event.get("containers", []))
+            fig.add_shape(type="line", x0=x, x1=x, y0=0, y1=1, xref="x", yref="paper", name="anomaly",
+                          line={"color": color, "width": 1, "dash": "dot"})
+            fig.add_annotation(x=x, y=1, xref="x", yref="paper", yanchor="bottom", showarrow=False,
+                               text=event["kind"], font={"color": color, "size": 10}, name="anomaly",
+                               hovertext=f"{event['series']}: {event['value']:.1f} ms, baseline "
+                                         f"{event['baseline']:.1f} ms" + (f"<br>{moved}" if moved else ""))
+        return fig
+
+    @staticmethod
+    def create_latency_summary_table(summaries):
+        if not summaries:
+            return html.Div()
+        columns = ("Series", "Messages", "Events/s", "Event-time lag ms",
+                   "Last ms", "Mean ms", "p50 ms", "p95 ms", "Min ms", "Max ms")
+        fmt = lambda value: "–" if value is None else f"{value:.1f}"
+        rows = [html.Tr([html.Td(s["name"]), html.Td(s["count"]), html.Td(s["rate"]), html.Td(fmt(s["lag_ms"]))] +
+                        [html.Td(fmt(s[key])) for key in ("last", "mean", "p50", "p95", "min", "max")])
+                for s in summaries]
+        return dbc.Table([html.Thead(html.Tr([html.Th(c) for c in columns])), html.Tbody(rows)],
+                         bordered=True, hover=True, size="sm", responsive=True)
+
+    @staticmethod
+    def create_bottleneck_table(rows):
+        """Container metrics ranked by correlation with latency, from DataStorage.get_bottlenecks"""
+        if not rows:
+            return html.Div("Not enough container stats and latency samples yet", className="text-muted")
+        columns = ("Container", "Metric", "Correlation", "Lag s", "Correlation at 0 s", "Samples")
+        body = [html.Tr([html.Td(r["container"]), html.Td(r["metric"]), html.Td(f"{r['score']:.2f}"),
+                         html.Td(f"{r['lag_s']:g}"), html.Td(f"{r['corr_0']:.2f}"), html.Td(r["samples"])])
+                for r in rows]
+        return dbc.Table([html.Thead(html.Tr([html.Th(c) for c in columns])), html.Tbody(body)],
+                         bordered=True, hover=True, size="sm", responsive=True)
+
+    @staticmethod
+    def create_throughput_graph(snapshots, now_ms=None):
+        """Events per second delivered by each series over the last minute"""
+        fig = go.Figure()
+        for name, snapshot in snapshots.items():
+            history = throughput_stats(snapshot, now_ms)["history"]
+            fig.add_trace(go.Scatter(x=[datetime.fromtimestamp(second) for second, _ in history],
+                                     y=[count for _, count in history], mode="lines", name=name))
+        fig.update_layout(title="Sink Throughput", yaxis_title="Events/s", showlegend=True,
+                          legend={"orientation": "h", "y": -0.2}, margin=dict(l=40, r=20, t=40, b=30))
         return fig
 
     @staticmethod
@@ -485,6 +1607,8 @@ class GraphCreator:
             return fig
         else:
             fig = go.Figure()
+            # An empty trace for pushed samples to extend
+            fig.add_trace(go.Scatter(x=[], y=[], mode='lines+markers', line=dict(color=color), marker=dict(size=4)))
             fig.update_layout(
                 title=title,
                 showlegend=False,
@@ -533,42 +1657,110 @@ class NetworkUtils:
         else:
             return f"{value:.1f} {units[unit_index]}"
 
-mqtt_client = MQTTClient(data_storage)
-mqtt_client.start()
-
-live_results_panel = dbc.Card(
-    dbc.CardBody([
-        html.Div([
-            html.H5("Live Sink Latency", className="card-title d-inline"),
-            html.Div(id="mqtt-connection-status", className="float-right")
-        ], className="d-flex justify-content-between align-items-center"),
-        html.Div([
-            html.H6("Experiment Duration:", className="mb-1"),
-            html.Div(id="experiment-duration", className="h4 text-info mb-3", children="00:00:00")
+mqtt_client = create_ingest_client(data_storage)
+
+def live_results_panel():
+    """Layout of the Live Results page, built on every visit with the current processes."""
+    names = DockerManager.get_container_names()
+    return dbc.Card(
+        dbc.CardBody([
+            html.Div([
+                html.H5("Live Sink Latency", className="card-title d-inline"),
+                html.Div(id="mqtt-connection-status", className="float-right")
+            ], className="d-flex justify-content-between align-items-center"),
+            html.Div([
+                html.H6("Experiment Duration:", className="mb-1"),
+                html.Div(id="experiment-duration", className="h4 text-info mb-3", children="00:00:00")
+            ]),
+            dbc.RadioItems(
+                id="latency-span",
+                options=[{"label": label, "value": span} for span, label in MonitoringConfig.LATENCY_SPANS_S],
+                value=0,
+                inline=True,
+            ),
+            dcc.Graph(id="live-results-graph"),
+            # [start, end] (epoch s) while the graph is zoomed in
+            dcc.Store(id="latency-zoom"),
+            html.Div(id="latency-summary"),
+            dcc.Graph(id="live-throughput-graph", style={"height": "250px"}),
+            # Redraws the rollup view of a selected span, disabled in the browser otherwise
+            dcc.Interval(id="latency-summary-interval", interval=MonitoringConfig.UPDATE_INTERVAL_MS, n_intervals=0,
+                         disabled=True),
+            # Live updates are pushed over /events (assets/event_stream.js) into these stores
+            dcc.Store(id="push-latency"),
+            dcc.Store(id="push-summary"),
+            dcc.Store(id="push-anomaly"),
+            dcc.Store(id="push-status"),
+            dcc.Store(id="push-stats"),
+            dcc.Store(id="push-config", data={
+                "maxLatencyPoints": MonitoringConfig.MAX_LATENCY_POINTS,
+                "maxStatsPoints": MonitoringConfig.MAX_STATS_POINTS,
+                "maxAnomalies": MonitoringConfig.MAX_ANOMALIES,
+            }),
+            # Only ticks the duration display in the browser, never reaches the server
+            dcc.Interval(id="duration-interval", interval=MonitoringConfig.DURATION_INTERVAL_MS, n_intervals=0),
+            html.Hr(),
+            html.H5("Container Stats", className="card-title"),
+            UIComponents.create_docker_status_alert(),
+            UIComponents.create_process_dropdown(names),
+            UIComponents.create_monitoring_graphs(),
+            html.Hr(),
+            html.H5("Network I/O", className="card-title"),
+            UIComponents.create_network_monitoring_graphs(),
+            dcc.Interval(id="container-stats-interval", interval=MonitoringConfig.STATS_INTERVAL_MS, n_intervals=0),
+            html.Hr(),
+            html.H5("Likely Bottlenecks", className="card-title"),
+            html.Div(id="bottleneck-table"),
+            # Ranked every BOTTLENECK_INTERVAL_MS per server process and pushed over /events
+            dcc.Store(id="push-bottlenecks"),
         ]),
-        dcc.Graph(id="live-results-graph"),
-        dcc.Interval(id="live-results-interval", interval=MonitoringConfig.UPDATE_INTERVAL_MS, n_intervals=0),
-        html.Hr(),
-        html.H5("Container Stats", className="card-title"),
-        UIComponents.create_docker_status_alert(),
-        UIComponents.create_process_dropdown(),
-        UIComponents.create_monitoring_graphs(),
-        html.Hr(),
-        html.H5("Network I/O", className="card-title"),
-        UIComponents.create_network_monitoring_graphs(),
-        dcc.Interval(id="container-stats-interval", interval=MonitoringConfig.STATS_INTERVAL_MS, n_intervals=0),
-    ]),
-    style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0,0,0,0.1)"}
-)
+        style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0,0,0,0.1)"}
+    )
+
+def zoomed_latency_graph(start, end):
+    """The latency graph of [start, end] (epoch s) at the finest resolution still stored.
+
+    Raw samples when they reach back far enough, min/max-decimated if there are too many,
+    otherwise the finest rollup that fits the window.
+    """
+    raw = data_storage.get_raw_range(start, end)
+    if raw is not None:
+        series = {}
+        for name, (ts, latencies) in raw.items():
+            ts, latencies = decimate_minmax(ts, latencies, MonitoringConfig.MAX_ZOOM_POINTS)
+            series[name] = ([datetime.fromtimestamp(t) for t in ts.tolist()], latencies.tolist())
+        fig = GraphCreator.create_latency_graph({name: points for name, points in series.items() if points[0]})
+    else:
+        resolution = pick_resolution(end - start, MonitoringConfig.MAX_ZOOM_POINTS)
+        fig = GraphCreator.create_rollup_graph(data_storage.get_rollups(resolution, start - resolution, end),
+                                               resolution)
+    fig.update_layout(xaxis_range=[datetime.fromtimestamp(start), datetime.fromtimestamp(end)])
+    return GraphCreator.add_anomaly_markers(fig, data_storage.get_anomalies(start, end))
+
+def start_ingest():
+    """Start collecting live data, on the first request rather than at import.
+
+    Web workers of the production server only relay what the ingester process writes.
+    """
+    if isinstance(data_storage, SharedDataStorage):
+        data_storage.start_relay(broadcaster)
+    else:
+        mqtt_client.start()
+        start_extended_metrics()
+    data_storage.start_summary_push(broadcaster)
+    data_storage.start_bottleneck_push(broadcaster)
 
 def register_live_results_callbacks(app):
+
     @app.callback(
         [Output("live-results-graph", "figure"), 
          Output("mqtt-connection-status", "children"),
-         Output("experiment-duration", "children")],
-        Input("live-results-interval", "n_intervals"),
+         Output("experiment-duration", "children"),
+         Output("push-status", "data")],
+        Input("live-results-graph", "id"),
     )
-    def update_live_results(n):
+    def update_live_results(_):
+        # Initial snapshot on page load, later points arrive over the event stream
         status = data_storage.connection_status
         if status["connected"]:
             status_badge = dbc.Badge("Connected", color="success", className="ml-2")
@@ -576,9 +1768,133 @@ def register_live_results_callbacks(app):
             err = status["last_error"] or "Connection error"
             status_badge = dbc.Badge(f"Disconnected: {err}", color="danger", className="ml-2")
         
-        fig = GraphCreator.create_latency_graph(data_storage.timestamps, data_storage.latencies)
+        fig = GraphCreator.add_anomaly_markers(GraphCreator.create_latency_graph(data_storage.get_latency_series()),
+                                               data_storage.get_anomalies())
         duration = data_storage.get_experiment_duration()
-        return fig, status_badge, duration
+        return fig, status_badge, duration, data_storage.get_status()
+
+    @app.callback(
+        [Output("latency-summary", "children"),
+         Output("live-throughput-graph", "figure")],
+        Input("push-summary", "data"),
+    )
+    def update_latency_summary(pushed):
+        # Rendered on page load, then from the summaries pushed every UPDATE_INTERVAL_MS
+        if pushed is None:
+            pushed = {"summaries": data_storage.get_latency_summaries(), "now_ms": time.time() * 1000}
+        summaries = pushed["summaries"]
+        return (GraphCreator.create_latency_summary_table(summaries),
+                GraphCreator.create_throughput_graph({s["name"]: s["throughput"] for s in summaries},
+                                                     pushed["now_ms"]))
+
+    @app.callback(
+        Output("bottleneck-table", "children"),
+        Input("push-bottlenecks", "data"),
+    )
+    def update_bottlenecks(pushed):
+        # Rendered on page load from the last ranking, then from the pushed ones
+        rows = pushed if pushed is not None else data_storage.get_current_bottlenecks()
+        return GraphCreator.create_bottleneck_table(rows)
+
+    @app.callback(
+        [Output("live-results-graph", "figure", allow_duplicate=True),
+         Output("latency-zoom", "data")],
+        [Input("latency-span", "value"),
+         Input("latency-summary-interval", "n_intervals"),
+         Input("live-results-graph", "relayoutData")],
+        State("latency-zoom", "data"),
+        prevent_initial_call=True
+    )
+    def update_latency_view(span, n, relayout, zoom):
+        trigger = ctx.triggered_id
+        if trigger == "live-results-graph":
+            window = parse_relayout_range(relayout)
+            if window is None:
+                return no_update, no_update
+            if window:
+                return zoomed_latency_graph(*window), list(window)
+            # Zoomed back out: fall through to the selected span
+        elif trigger == "latency-summary-interval" and (zoom or not span):
+            # A zoomed window stays put, live points are pushed
+            return no_update, no_update
+        if not span:
+            return GraphCreator.add_anomaly_markers(GraphCreator.create_latency_graph(data_storage.get_latency_series()),
+                                                    data_storage.get_anomalies()), None
+        resolution = pick_resolution(span, MonitoringConfig.MAX_ROLLUP_POINTS)
+        start = time.time() - span
+        fig = GraphCreator.create_rollup_graph(data_storage.get_rollups(resolution, start), resolution)
+        return GraphCreator.add_anomaly_markers(fig, data_storage.get_anomalies(start)), None
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="spanRefreshDisabled"),
+        Output("latency-summary-interval", "disabled"),
+        [Input("latency-span", "value"),
+         Input("latency-zoom", "data")]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="appendLatency"),
+        [Output("live-results-graph", "extendData"),
+         Output("live-results-graph", "figure", allow_duplicate=True)],
+        Input("push-latency", "data"),
+        [State("live-results-graph", "figure"),
+         State("push-config", "data"),
+         State("latency-span", "value"),
+         State("latency-zoom", "data")],
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="markAnomalies"),
+        Output("live-results-graph", "figure", allow_duplicate=True),
+        Input("push-anomaly", "data"),
+        [State("live-results-graph", "figure"),
+         State("push-config", "data")],
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="updateStatus"),
+        [Output("mqtt-connection-status", "children", allow_duplicate=True),
+         Output("experiment-duration", "children", allow_duplicate=True)],
+        [Input("push-status", "data"),
+         Input("duration-interval", "n_intervals")],
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="appendStats"),
+        [Output("cpu-live-value", "children", allow_duplicate=True),
+         Output("mem-live-value", "children", allow_duplicate=True),
+         Output("net-rx-live-value", "children", allow_duplicate=True),
+         Output("net-tx-live-value", "children", allow_duplicate=True),
+         Output("cpu-live-graph", "extendData"),
+         Output("mem-live-graph", "extendData"),
+         Output("net-rx-live-graph", "extendData"),
+         Output("net-tx-live-graph", "extendData"),
+         Output("cpu-live-graph", "figure", allow_duplicate=True),
+         Output("mem-live-graph", "figure", allow_duplicate=True),
+         Output("net-rx-live-graph", "figure", allow_duplicate=True),
+         Output("net-tx-live-graph", "figure", allow_duplicate=True)],
+        Input("push-stats", "data"),
+        [State("container-dropdown", "value"),
+         State("cpu-live-graph", "figure"),
+         State("mem-live-graph", "figure"),
+         State("net-rx-live-graph", "figure"),
+         State("net-tx-live-graph", "figure"),
+         State("push-config", "data")],
+        prevent_initial_call=True
+    )
+
+    @app.callback(
+        Output("container-stats-interval", "disabled"),
+        [Input("container-dropdown", "value"),
+         Input("container-stats-interval", "n_intervals")],
+    )
+    def toggle_stats_polling(selected, n):
+        # Containers sampled in the background are pushed, only the process fallback polls
+        stats_sampler.start()
+        return bool(selected) and stats_sampler.covers(selected)
 
     @app.callback(
         [Output("cpu-live-value", "children"), 
@@ -592,13 +1908,20 @@ def register_live_results_callbacks(app):
             empty_fig = GraphCreator.create_empty_graph("No Process Selected")
             return "N/A", "N/A", empty_fig, empty_fig
         
-        cpu, memory, net_rx, net_tx, error = DockerManager.get_container_stats(selected)
-        
-        if n % 5 == 0:
-            print(f"Monitoring {selected}: CPU={cpu}, Memory={memory}, NetRX={net_rx}, NetTX={net_tx}, Error={error}")
+        if stats_sampler.covers(selected):
+            # Already sampled in the background, no need to spawn another docker stats
+            stats = data_storage.get_container_stats(selected)
+            cpu, memory, error = stats['cpu'][-1], stats['memory'][-1], None
+        else:
+            cpu, memory, net_rx, net_tx, error = DockerManager.get_container_stats(selected)
+
+            if n % 5 == 0:
+                print(f"Monitoring {selected}: CPU={cpu}, Memory={memory}, NetRX={net_rx}, NetTX={net_tx}, Error={error}")
+
+            if error is None and cpu is not None and memory is not None:
+                data_storage.add_container_stats(selected, cpu, memory, net_rx, net_tx, datetime.fromtimestamp(local_clock.now_ms() / 1000))
         
         if error is None and cpu is not None and memory is not None:
-            data_storage.add_container_stats(selected, cpu, memory, net_rx, net_tx, datetime.now())
             cpu_display = f"{cpu:.1f}%"
             mem_display = f"{memory:.1f}%"
         else:
@@ -627,7 +1950,11 @@ def register_live_results_callbacks(app):
             empty_fig = GraphCreator.create_empty_graph("No Process Selected")
             return "N/A", "N/A", empty_fig, empty_fig
         
-        _, _, net_rx, net_tx, error = DockerManager.get_container_stats(selected)
+        if stats_sampler.covers(selected):
+            stats = data_storage.get_container_stats(selected)
+            net_rx, net_tx, error = stats['net_rx'][-1], stats['net_tx'][-1], None
+        else:
+            _, _, net_rx, net_tx, error = DockerManager.get_container_stats(selected)
         
         if error is None and net_rx is not None and net_tx is not None:
             net_rx_display = NetworkUtils.format_bytes(net_rx)
@@ -2,11 +2,23 @@ from dash import html, dcc, Input, Output, State, ctx, no_update
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import os, base64
-import pandas as pd
-import matplotlib.pyplot as plt
 from io import BytesIO
+import pandas as pd
+from utils.result_stats import summarize_frame, PERCENTILES
+
+def get_pyplot():
+    # Imported on first plot, matplotlib alone takes longer to import than the rest of the app
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+def read_uploaded_csv(contents):
+    content_type, content_string = contents.split(',')
+    return pd.read_csv(BytesIO(base64.b64decode(content_string)))
 
 def generate_default_plot(df):
+    plt = get_pyplot()
     x_column = df.columns[0]
     y_column = df.columns[1]
     plt.figure(figsize=(8, 5))
@@ -22,63 +34,92 @@ def generate_default_plot(df):
     encoded_image = base64.b64encode(buf.getvalue()).decode("utf-8")
     return f"data:image/png;base64,{encoded_image}"
 
-results_panel = dbc.Card(
-    dbc.CardBody(
-        [
-            html.Div(
-                dcc.Upload(
-                    id="upload-csv",
-                    children=dbc.Button("Open CSV File", color="primary"),
-                    accept=".csv",
-                    style={
-                        "width": "100%",
-                        "textAlign": "center",
-                        "padding": "20px"
-                    }
-                ),
-                id="upload-container",
-                n_clicks=0,
-                style={"cursor": "pointer"}
-            ),
-            dcc.Store(id="uploaded-csv-store"),
-            dbc.Modal(
-                [
-                    dbc.ModalHeader(
-                        [
-                            dbc.ModalTitle("CSV Plot"),
-                            dbc.ButtonGroup(
-                                [
-                                    dbc.Button("Line Graph", id="plot-style-default", color="secondary", n_clicks=0),
-                                    dbc.Button("Box Plot", id="plot-style-box", color="secondary", n_clicks=0),
-                                    dbc.Button("Bar Chart", id="plot-style-bar", color="secondary", n_clicks=0),
-                                ],
-                                size="sm",
-                                style={"marginLeft": "20px"}
-                            )
-                        ]
-                    ),
-                    dbc.ModalBody(html.Img(id="csv-plot-img", style={"width": "100%"})),
-                    dbc.ModalFooter(
-                        dbc.Button("Close", id="close-plot-modal", className="ms-auto", n_clicks=0)
+def generate_stats_summary(df):
+    summary = summarize_frame(df)
+    stat_keys = ["count", "mean", "std", "min", "max"] + [f"p{p}" for p in PERCENTILES]
+    header = html.Thead(html.Tr([html.Th("Column")] + [html.Th(key) for key in stat_keys]))
+    rows = []
+    for column, stats in summary["columns"].items():
+        cells = [html.Td(column)]
+        for key in stat_keys:
+            value = stats[key]
+            cells.append(html.Td("–" if value is None else (str(value) if key == "count" else f"{value:.3f}")))
+        rows.append(html.Tr(cells))
+    children = [
+        html.H6("Summary Statistics", className="mt-3"),
+        dbc.Table([header, html.Tbody(rows)], bordered=True, size="sm", responsive=True),
+    ]
+    throughput = summary["throughput"]
+    if throughput:
+        children.append(html.P(
+            f"Throughput ({summary['time_column']}, {throughput['window']:g}s windows): "
+            f"mean {throughput['mean_rate']:.2f}/s, peak {throughput['peak_rate']:.2f}/s"
+        ))
+    return children
+
+def results_panel():
+    """Layout of the Results page, built on every visit."""
+    return dbc.Card(
+        dbc.CardBody(
+            [
+                html.Div(
+                    dcc.Upload(
+                        id="upload-csv",
+                        children=dbc.Button("Open CSV File", color="primary"),
+                        accept=".csv",
+                        style={
+                            "width": "100%",
+                            "textAlign": "center",
+                            "padding": "20px"
+                        }
                     ),
-                ],
-                id="csv-plot-modal",
-                is_open=False,
-                centered=True,
-                backdrop=True,
-                size="lg"
-            )
-        ]
-    ),
-    style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0, 0, 0, 0.1)"}
-)
+                    id="upload-container",
+                    n_clicks=0,
+                    style={"cursor": "pointer"}
+                ),
+                dcc.Store(id="uploaded-csv-store"),
+                dbc.Modal(
+                    [
+                        dbc.ModalHeader(
+                            [
+                                dbc.ModalTitle("CSV Plot"),
+                                dbc.ButtonGroup(
+                                    [
+                                        dbc.Button("Line Graph", id="plot-style-default", color="secondary", n_clicks=0),
+                                        dbc.Button("Box Plot", id="plot-style-box", color="secondary", n_clicks=0),
+                                        dbc.Button("Bar Chart", id="plot-style-bar", color="secondary", n_clicks=0),
+                                    ],
+                                    size="sm",
+                                    style={"marginLeft": "20px"}
+                                )
+                            ]
+                        ),
+                        dbc.ModalBody([
+                            html.Img(id="csv-plot-img", style={"width": "100%"}),
+                            html.Div(id="csv-stats-summary"),
+                        ]),
+                        dbc.ModalFooter(
+                            dbc.Button("Close", id="close-plot-modal", className="ms-auto", n_clicks=0)
+                        ),
+                    ],
+                    id="csv-plot-modal",
+                    is_open=False,
+                    centered=True,
+                    backdrop=True,
+                    size="lg"
+                )
+            ]
+        ),
+        style={"padding": "20px", "box-shadow": "0px 4px 8px rgba(0, 0, 0, 0.1)"}
+    )
 
 def register_results_callbacks(app):
 
     @app.callback(
         [Output("csv-plot-modal", "is_open"),
          Output("csv-plot-img", "src"),
-         Output("uploaded-csv-store", "data")],
+         Output("uploaded-csv-store", "data"),
+         Output("csv-stats-summary", "children")],
         [Input("upload-csv", "contents"),
          Input("upload-container", "n_clicks"),
          Input("close-plot-modal", "n_clicks")],
@@ -91,43 +132,39 @@ def register_results_callbacks(app):
         prop_id = triggered[0]["prop_id"]
 
         if "close-plot-modal" in prop_id:
-            return False, no_update, stored_data
+            return False, no_update, stored_data, no_update
 
         if "upload-csv.contents" in prop_id:
             if upload_contents:
                 try:
-                    content_type, content_string = upload_contents.split(',')
-                    decoded = base64.b64decode(content_string)
-                    df = pd.read_csv(BytesIO(decoded))
+                    df = read_uploaded_csv(upload_contents)
                     if len(df.columns) < 2:
                         print("[ERROR] CSV must have at least two columns for plotting.")
-                        return no_update, no_update, no_update
+                        return no_update, no_update, no_update, no_update
                     image_src = generate_default_plot(df)
-                    return True, image_src, upload_contents
+                    return True, image_src, upload_contents, generate_stats_summary(df)
                 except Exception as e:
                     print(f"[ERROR] Failed to generate plot: {e}")
-                    return no_update, no_update, no_update
+                    return no_update, no_update, no_update, no_update
             else:
-                return no_update, no_update, stored_data
+                return no_update, no_update, stored_data, no_update
 
         if "upload-container.n_clicks" in prop_id:
             if stored_data:
                 try:
-                    content_type, content_string = stored_data.split(',')
-                    decoded = base64.b64decode(content_string)
-                    df = pd.read_csv(BytesIO(decoded))
+                    df = read_uploaded_csv(stored_data)
                     if len(df.columns) < 2:
                         print("[ERROR] CSV must have at least two columns for plotting.")
-                        return no_update, no_update, stored_data
+                        return no_update, no_update, stored_data, no_update
                     image_src = generate_default_plot(df)
-                    return True, image_src, stored_data
+                    return True, image_src, stored_data, generate_stats_summary(df)
                 except Exception as e:
                     print(f"[ERROR] Failed to re-generate plot: {e}")
-                    return no_update, no_update, stored_data
+                    return no_update, no_update, stored_data, no_update
             else:
-                return no_update, no_update, stored_data
+                return no_update, no_update, stored_data, no_update
 
-        return no_update, no_update, stored_data
+        return no_update, no_update, stored_data, no_update
 
     @app.callback(
         Output("csv-plot-img", "src", allow_duplicate=True),
@@ -142,14 +179,13 @@ def register_results_callbacks(app):
             return no_update
         trigger = ctx.triggered[0]["prop_id"]
         try:
-            content_type, content_string = stored_contents.split(',')
-            decoded = base64.b64decode(content_string)
-            df = pd.read_csv(BytesIO(decoded))
+            df = read_uploaded_csv(stored_contents)
             if len(df.columns) < 2:
                 print("[ERROR] CSV must have at least two columns for plotting.")
                 return no_update
             x_column = df.columns[0]
             y_column = df.columns[1]
+            plt = get_pyplot()
             plt.figure(figsize=(8, 5))
             if "plot-style-default" in trigger:
                 plt.plot(df[x_column], df[y_column], marker="o", linestyle="-", color="blue")
@@ -0,0 +1,44 @@
+# Production server: gunicorn -c gunicorn.conf.py app:server
+#
+# The master creates the shared store and starts ingester.py as its single MQTT consumer;
+# every worker attaches to the store and relays new data to its own event stream clients.
+import multiprocessing
+import os
+import subprocess
+import sys
+
+from utils.shared_store import SharedStore, STORE_ENV
+
+bind = os.environ.get("STREAM_UI_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("STREAM_UI_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+# Every open browser tab holds one /events connection, so workers need threads
+worker_class = "gthread"
+threads = int(os.environ.get("STREAM_UI_THREADS", 16))
+# Event streams are long-lived requests
+timeout = 0
+graceful_timeout = 10
+
+store = None
+ingester = None
+
+
+def on_starting(server):
+    global store, ingester
+    store_name = f"stream-ui-{os.getpid()}"
+    store = SharedStore.create(store_name)
+    # Inherited by the workers forked after this
+    os.environ[STORE_ENV] = store_name
+    ingester = subprocess.Popen([sys.executable, "ingester.py", "--store", store_name])
+    server.log.info("Shared store %s created, ingester pid %s", store_name, ingester.pid)
+
+
+def on_exit(server):
+    if ingester is not None:
+        ingester.terminate()
+        try:
+            ingester.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            ingester.kill()
+    if store is not None:
+        store.close()
+        store.unlink()
@@ -0,0 +1,40 @@
+import argparse
+import os
+import signal
+import threading
+
+from utils.shared_store import STORE_ENV
+from utils.metrics import registry, process_metrics, count_subprocesses
+
+
+def run_ingester(store_name):
+    """Run the MQTT client, the container stats sampler and the extended metrics collector, writing into the
+    shared store."""
+    # Attach before importing the panel so its module-level storage is the shared one
+    os.environ[STORE_ENV] = store_name
+    from components.live_results_panel import (data_storage, create_ingest_client, ContainerStatsSampler,
+                                               start_extended_metrics)
+
+    process_metrics(registry)
+    count_subprocesses(registry)
+    create_ingest_client(data_storage).start()
+    ContainerStatsSampler(data_storage).start()
+    start_extended_metrics()
+    # Served by the web workers' /metrics and the Tool Health page
+    data_storage.publish_metrics(registry)
+    print(f"Ingester attached to shared store '{store_name}'")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    stop.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MQTT ingester for the production server")
+    parser.add_argument("--store", default=os.environ.get(STORE_ENV),
+                        help="Name of the shared store created by the server")
+    args = parser.parse_args()
+    if not args.store:
+        parser.error(f"--store or {STORE_ENV} is required")
+    run_ingester(args.store)
@@ -1,18 +1,14 @@
 import argparse
 import time
 import csv
-import os
-from datetime import datetime
-
-def generate_unique_filename(base_name):
-    counter = 1
-    unique_filename = base_name
-    while os.path.exists(unique_filename):
-        unique_filename = base_name.replace(".csv", f"({counter}).csv")
-        counter += 1
-    return unique_filename
-
-def run_benchmark(data_set, query, heterogeneity, topology, nodes):
+from utils.run_catalog import run_catalog
+from utils.result_stats import load_or_compute, summary_metrics
+from utils.topology import TOPOLOGY_TYPES, generate_topology, load_topology
+from utils.hardware import ResourceLimiter
+from collections import Counter
+
+def run_benchmark(data_set, query, heterogeneity, topology, nodes, degree=None, topology_file=None,
+                  enforce_hardware=False):
     print("Starting Experiment...")
     print("Running Benchmark with the following parameters:")
     print(f"Data Set: {data_set}")
@@ -21,23 +17,56 @@ def run_benchmark(data_set, query, heterogeneity, topology, nodes):
     print(f"Network Topology: {topology}")
     print(f"Number of Nodes: {nodes}")
 
-    # Simulate experiment execution
-    time.sleep(3)
-    print("Experiment Completed! Results will be saved to a CSV file.")
+    if topology_file:
+        topology_config = load_topology(topology_file)
+    else:
+        topology_config = generate_topology(topology, nodes, degree, heterogeneity)
+    print(f"Topology: {topology_config['type']} with {topology_config['num_nodes']} nodes "
+          f"and {len(topology_config['edges'])} links")
+    node_mix = Counter(node["profile"] for node in topology_config["nodes"])
+    link_mix = Counter(link["link"] for link in topology_config["links"])
+    print(f"Hardware profiles: {dict(node_mix)}, link models: {dict(link_mix)}")
+
+    if enforce_hardware:
+        applied, errors = ResourceLimiter.apply_topology(topology_config)
+        print(f"Hardware limits applied to {len(applied)} bound nodes")
+        for error in errors:
+            print(f"Hardware limit error: {error}")
+
+    run_id, data_path = run_catalog.begin_run({
+        "data_set": data_set,
+        "query": query,
+        "heterogeneity": heterogeneity,
+        "topology": topology,
+        "nodes": nodes,
+        "degree": topology_config.get("degree"),
+        "links": len(topology_config["edges"]),
+        "topology_file": topology_file,
+    })
+    print(f"Run ID: {run_id}")
 
-    timestamp = datetime.now().strftime("%d-%m-%y_%H_%M")
-    base_filename = f"results/experiment_results_{timestamp}.csv"
-    unique_filename = generate_unique_filename(base_filename)   
-    
-    with open(unique_filename, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["A", "B"])
-        writer.writerow([12, 14])
-        writer.writerow([13, 16])
-        writer.writerow([14, 18])
+    try:
+        # Simulate experiment execution
+        time.sleep(3)
+        print("Experiment Completed! Results will be saved to a CSV file.")
 
+        rows = [[12, 14], [13, 16], [14, 18]]
+        # The run ID makes the name unique, "x" guards against anything else writing it
+        with open(data_path, mode="x", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["A", "B"])
+            writer.writerows(rows)
+    except BaseException:
+        run_catalog.finish_run(run_id, status="failed")
+        raise
 
-    print(f"Experiment results appended to {unique_filename}")
+    try:
+        metrics = summary_metrics(load_or_compute(data_path))
+    except Exception as e:
+        print(f"Could not compute result statistics: {e}")
+        metrics = {"rows": len(rows)}
+    run_catalog.finish_run(run_id, metrics=metrics)
+    print(f"Experiment results appended to {data_path}")
     print("-" * 50)
 
 
@@ -46,9 +75,14 @@ if __name__ == "__main__":
     parser.add_argument("--dataset", required=True, help="Specify the dataset to use")
     parser.add_argument("--query", required=True, help="Specify the query to run")
     parser.add_argument("--heterogeneity", required=True, help="Specify the hardware heterogeneity")
-    parser.add_argument("--topology", required=True, help="Specify the network topology")
+    parser.add_argument("--topology", required=True, choices=TOPOLOGY_TYPES, help="Specify the network topology")
     parser.add_argument("--nodes", required=True, type=int, help="Specify the number of nodes")
+    parser.add_argument("--degree", type=int, help="Tree fan-out or mesh neighbours per node (a mesh has at least 2)")
+    parser.add_argument("--topology-file", help="Topology config generated by the experiment panel")
+    parser.add_argument("--enforce-hardware", action="store_true",
+                        help="Apply cgroup/docker limits and tc netem shaping to nodes bound to a pid or container")
 
     args = parser.parse_args()
 
-    run_benchmark(args.dataset, args.query, args.heterogeneity, args.topology, args.nodes)
+    run_benchmark(args.dataset, args.query, args.heterogeneity, args.topology, args.nodes,
+                  args.degree, args.topology_file, args.enforce_hardware)
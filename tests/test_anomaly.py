@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import numpy as np
+
+from utils.anomaly import ChangeDetector, correlate_containers
+
+
+def noisy(level, n, seed):
+    return (level + np.random.default_rng(seed).normal(0, level * 0.05, n)).tolist()
+
+
+def test_stable_series_raises_no_events():
+    detector = ChangeDetector()
+    values = noisy(50, 5000, 0)
+    assert detector.update_many(list(range(5000)), values) == []
+
+
+def test_level_shift_is_an_increase_then_a_decrease():
+    detector = ChangeDetector()
+    values = noisy(50, 1000, 1) + noisy(80, 1000, 2) + noisy(50, 1000, 3)
+    events = detector.update_many(np.arange(len(values), dtype=float), np.array(values))
+    # The first sample of a large jump also counts as a spike
+    events = [event for event in events if event["kind"] != "spike"]
+    assert [event["kind"] for event in events] == ["increase", "decrease"]
+    # Detected within a few samples of each shift
+    assert 1000 <= events[0]["ts"] < 1030
+    assert 2000 <= events[1]["ts"] < 2030
+
+
+def test_single_outlier_is_a_spike_with_cooldown():
+    detector = ChangeDetector(cooldown_s=10)
+    values = noisy(50, 500, 4)
+    values[300] = values[301] = 500.0
+    events = detector.update_many(list(range(500)), values)
+    assert [(event["kind"], event["ts"]) for event in events] == [("spike", 300)]
+    assert events[0]["baseline"] < 60
+
+
+def test_no_events_during_warmup():
+    detector = ChangeDetector(warmup=100)
+    assert detector.update_many(list(range(100)), [1.0] * 50 + [1000.0] * 50) == []
+
+
+def test_failing_handler_does_not_stop_detection():
+    seen = []
+
+    def handler(event):
+        seen.append(event)
+        raise RuntimeError("store full")
+
+    detector = ChangeDetector(on_event=handler)
+    values = noisy(50, 500, 5) + noisy(100, 500, 6)
+    events = detector.update_many(list(range(1000)), values)
+    assert events and seen == events
+
+
+def test_correlate_containers_finds_the_metric_that_moved():
+    times = [datetime.fromtimestamp(t) for t in range(1000, 1120)]
+    stats = {
+        "worker": {"timestamps": times, "cpu": [20.0 + (t % 2) for t in range(90)] + [80.0] * 30,
+                   "memory": [40.0] * 120},
+        "idle": {"timestamps": times, "cpu": [5.0] * 120, "memory": [10.0] * 120},
+    }
+    moves = correlate_containers(stats, ts=1119)
+    assert [(move["container"], move["metric"]) for move in moves] == [("worker", "cpu")]
+    assert moves[0]["after"] == 80.0
@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from utils.csv_follower import CSVFollower
+
+
+def write(path, text, mode="a"):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_appended_rows_match_full_read(tmp_path):
+    path = str(tmp_path / "results.csv")
+    write(path, "ts,latency,source\n" + "".join(f"{i},{i % 7},node-{i % 3}\n" for i in range(100)), "w")
+    follower = CSVFollower()
+    df, changed = follower.read(path)
+    assert changed and len(df) == 100
+
+    for i in range(100, 2100, 100):
+        write(path, "".join(f"{j},{j % 7},node-{j % 3}\n" for j in range(i, i + 100)))
+        df, changed = follower.read(path)
+        assert changed
+
+    expected = pd.read_csv(path)
+    assert list(df.columns) == list(expected.columns)
+    assert (df.values == expected.values).all()
+
+
+def test_unchanged_file_is_not_reparsed(tmp_path):
+    path = str(tmp_path / "results.csv")
+    write(path, "ts,latency\n1,2\n", "w")
+    follower = CSVFollower()
+    first, _ = follower.read(path)
+    second, changed = follower.read(path)
+    assert not changed
+    assert second is first
+
+
+def test_partial_row_waits_for_newline(tmp_path):
+    path = str(tmp_path / "results.csv")
+    write(path, "ts,latency\n1,2\n", "w")
+    follower = CSVFollower()
+    follower.read(path)
+
+    write(path, "2,")
+    df, changed = follower.read(path)
+    assert not changed and len(df) == 1
+
+    write(path, "3\n")
+    df, changed = follower.read(path)
+    assert changed
+    assert df["latency"].tolist() == [2, 3]
+
+
+def test_header_only_file_takes_types_of_first_rows(tmp_path):
+    path = str(tmp_path / "results.csv")
+    write(path, "ts,latency,source\n", "w")
+    follower = CSVFollower()
+    df, _ = follower.read(path)
+    assert len(df) == 0
+
+    write(path, "1,2.5,node-1\n")
+    df, changed = follower.read(path)
+    assert changed
+    assert is_numeric_dtype(df["ts"]) and is_numeric_dtype(df["latency"])
+    assert df["latency"].tolist() == [2.5]
+
+
+def test_column_is_widened_when_rows_stop_fitting(tmp_path):
+    path = str(tmp_path / "results.csv")
+    write(path, "ts,latency\n1,2\n", "w")
+    follower = CSVFollower()
+    follower.read(path)
+
+    write(path, "2,2.5\n")
+    df, _ = follower.read(path)
+    assert df["latency"].dtype.kind == "f"
+    assert df["latency"].tolist() == [2.0, 2.5]
+
+
+def test_rewritten_file_is_reloaded(tmp_path):
+    path = str(tmp_path / "results.csv")
+    write(path, "ts,latency\n1,2\n2,3\n", "w")
+    follower = CSVFollower()
+    follower.read(path)
+
+    write(path, "a,b\n5,6\n", "w")
+    os.utime(path, ns=(1, 1))
+    df, changed = follower.read(path)
+    assert changed
+    assert list(df.columns) == ["a", "b"]
+    assert df["a"].tolist() == [5]
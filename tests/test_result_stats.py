@@ -0,0 +1,92 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.result_stats import (column_stats, latency_histogram, load_or_compute, stats_path, summarize_frame,
+                                summary_metrics, throughput_windows, to_seconds)
+
+
+def test_column_stats_match_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"ts": np.arange(1000), "latency": rng.exponential(10, 1000), "source": "node-1"})
+    df.loc[5, "latency"] = np.nan
+    stats = column_stats(df)
+    assert set(stats) == {"ts", "latency"}
+    latency = stats["latency"]
+    assert latency["count"] == 999
+    assert latency["mean"] == pytest.approx(df["latency"].mean())
+    assert latency["std"] == pytest.approx(df["latency"].std())
+    assert latency["p95"] == pytest.approx(df["latency"].quantile(0.95))
+
+
+def test_column_stats_of_a_text_only_frame():
+    assert column_stats(pd.DataFrame({"source": ["a", "b"]})) == {}
+
+
+def test_to_seconds_epoch_units():
+    assert to_seconds(pd.Series([1.7e9, 1.7e9 + 1])).tolist() == [1.7e9, 1.7e9 + 1]
+    assert to_seconds(pd.Series([1.7e12, 1.7e12 + 1000])).tolist() == [1.7e9, 1.7e9 + 1]
+
+
+@pytest.mark.filterwarnings("ignore:Could not infer format")
+def test_to_seconds_unparseable_times_are_nan():
+    seconds = to_seconds(pd.Series(["2024-01-01 00:00:00", "not a time", "2024-01-01 00:00:02"]))
+    assert seconds[0] == pytest.approx(pd.Timestamp("2024-01-01").timestamp())
+    assert np.isnan(seconds[1])
+    assert seconds[2] - seconds[0] == pytest.approx(2)
+    assert to_seconds(pd.Series(["x", "y"])) is None
+
+
+def test_throughput_windows_count_events_per_second():
+    result = throughput_windows(np.array([0.1, 0.5, 0.9, 1.2, 3.5, np.nan]))
+    assert result["counts"] == [3, 1, 0, 1]
+    assert result["peak_rate"] == 3
+    assert throughput_windows(np.array([np.nan])) is None
+
+
+def test_throughput_windows_widen_for_long_spans():
+    result = throughput_windows(np.array([0.0, 1e6]), max_windows=100)
+    assert result["window"] == pytest.approx(1e4)
+    assert len(result["counts"]) == 101
+
+
+def test_latency_histogram_ignores_nan():
+    histogram = latency_histogram(np.array([1.0, 2.0, np.nan, 3.0]), bins=2)
+    assert sum(histogram["counts"]) == 3
+    assert latency_histogram(np.array([np.nan])) is None
+
+
+def test_summarize_frame_and_metrics():
+    df = pd.DataFrame({"ts": [1.7e12 + i * 100 for i in range(50)], "latency": np.arange(50.0)})
+    summary = summarize_frame(df, bins=10)
+    assert summary["rows"] == 50
+    assert summary["time_column"] == "ts" and summary["latency_column"] == "latency"
+    assert summary["throughput"]["counts"] == [10] * 5
+    metrics = summary_metrics(summary)
+    assert metrics["latency_max"] == 49
+    assert metrics["throughput_mean"] == 10
+
+
+def test_load_or_compute_caches_until_the_file_changes(tmp_path):
+    path = str(tmp_path / "run.csv")
+    with open(path, "w") as f:
+        f.write("ts,latency\n1,5\n2,7\n")
+    first = load_or_compute(path)
+    assert os.path.exists(stats_path(path))
+    assert load_or_compute(path) == first
+
+    # A stale cache entry is recomputed
+    with open(stats_path(path)) as f:
+        cached = json.load(f)
+    cached["key"]["version"] -= 1
+    cached["summary"]["rows"] = -1
+    with open(stats_path(path), "w") as f:
+        json.dump(cached, f)
+    assert load_or_compute(path)["rows"] == 2
+
+    with open(path, "a") as f:
+        f.write("3,9\n")
+    assert load_or_compute(path)["columns"]["latency"]["max"] == 9
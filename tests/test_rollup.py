@@ -0,0 +1,98 @@
+import numpy as np
+
+from utils.rollup import LogSketch, RollupStore, pick_resolution, select_window
+
+LEVELS = ((1, 100), (10, 100))
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(3, 1, 20_000)
+    sketch = LogSketch(0.01)
+    sketch.add_keys(np.array([sketch.key(value) for value in values]))
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert abs(sketch.quantile(q) - exact) <= 0.02 * exact
+
+
+def test_empty_sketch_has_no_quantile():
+    assert LogSketch().quantile(0.5) is None
+
+
+def test_buckets_close_as_samples_move_on():
+    closed = []
+    store = RollupStore(series=3, levels=LEVELS, on_close=lambda resolution, record: closed.append((resolution, record)))
+    for ts, value in ((100.1, 1.0), (100.5, 3.0), (101.2, 5.0)):
+        store.add(ts, value)
+
+    assert len(closed) == 1
+    resolution, record = closed[0]
+    assert resolution == 1
+    assert record[:6] == (100.0, 3, 2, 1.0, 3.0, 2.0)
+
+    records = store.records(1)
+    assert records["start"].tolist() == [100.0]
+    assert records["series"].tolist() == [3]
+
+
+def test_batch_matches_single_samples():
+    ts = np.sort(np.random.default_rng(2).uniform(0, 30, 500))
+    values = np.random.default_rng(3).uniform(1, 50, 500)
+    single, batch = RollupStore(levels=LEVELS), RollupStore(levels=LEVELS)
+    for t, v in zip(ts.tolist(), values.tolist()):
+        single.add(t, v)
+    batch.add_batch(ts, values)
+    single.flush(1000)
+    batch.flush(1000)
+    for resolution, _ in LEVELS:
+        a, b = single.records(resolution), batch.records(resolution)
+        assert a["start"].tolist() == b["start"].tolist()
+        assert a["count"].tolist() == b["count"].tolist()
+        np.testing.assert_allclose(a["mean"], b["mean"])
+        np.testing.assert_allclose(a["p95"], b["p95"])
+
+
+def test_flush_closes_quiet_buckets_only_once_passed():
+    store = RollupStore(levels=LEVELS)
+    store.add(100.2, 1.0)
+    store.flush(100.9)
+    assert len(store.records(1)) == 0
+    store.flush(101.0)
+    assert store.records(1)["start"].tolist() == [100.0]
+    assert len(store.records(10)) == 0
+
+
+def test_late_sample_after_flush_does_not_reopen_bucket():
+    store = RollupStore(levels=LEVELS)
+    store.add(100.2, 1.0)
+    store.flush(101.01)
+    # Another shard's sample for the flushed second arrives a few ms later
+    store.add(100.99, 2.0)
+    store.add_batch(np.array([100.995]), np.array([4.0]))
+    store.add(101.5, 3.0)
+    store.flush(103)
+
+    records = store.records(1)
+    assert records["start"].tolist() == [100.0, 101.0]
+    assert records["count"].tolist() == [1, 1]
+    assert store.levels[0].late == 2
+    # The 10 s bucket was still open and takes the stragglers
+    store.flush(200)
+    assert store.records(10)["count"].tolist() == [4]
+
+
+def test_slightly_older_sample_joins_open_bucket():
+    store = RollupStore(levels=LEVELS)
+    store.add(101.1, 1.0)
+    store.add(100.9, 2.0)
+    store.flush(103)
+    assert store.records(1)["count"].tolist() == [2]
+
+
+def test_select_window_and_pick_resolution():
+    records = np.zeros(5, dtype=[("start", "f8")])
+    records["start"] = [0, 10, 20, 30, 40]
+    assert select_window(records, 10, 30)["start"].tolist() == [10, 20, 30]
+    assert pick_resolution(100, 200) == 1
+    assert pick_resolution(1000, 200) == 10
+    assert pick_resolution(10 ** 6, 200) == 60
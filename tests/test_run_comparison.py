@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pytest
+
+from utils.run_comparison import (RunLoader, bootstrap_median_delta, compare_runs, mann_whitney,
+                                  quantile_profile)
+
+
+def test_mann_whitney_matches_scipy_with_ties():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 20, 300).astype(float)
+    b = rng.integers(2, 22, 200).astype(float)
+    u, p = mann_whitney(a, b)
+    expected = stats.mannwhitneyu(a, b, alternative="two-sided", use_continuity=False, method="asymptotic")
+    assert u == pytest.approx(expected.statistic)
+    assert p == pytest.approx(expected.pvalue, rel=1e-9)
+
+
+def test_mann_whitney_edge_cases():
+    assert all(math.isnan(x) for x in mann_whitney(np.array([]), np.array([1.0])))
+    # All values tied: no evidence of a difference
+    assert mann_whitney(np.ones(5), np.ones(5))[1] == 1.0
+
+
+def test_bootstrap_ci_covers_point_and_excludes_zero_for_a_shift():
+    rng = np.random.default_rng(1)
+    a = rng.normal(100, 5, 2000)
+    b = rng.normal(110, 5, 2000)
+    point, low, high = bootstrap_median_delta(a, b, n_boot=400)
+    assert low <= point <= high
+    assert low > 5 and high < 15
+
+
+def test_bootstrap_ci_width_does_not_depend_on_the_subsample_size():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(100, 5, 20_000), rng.normal(100, 5, 20_000)
+    _, low_full, high_full = bootstrap_median_delta(a, b, n_boot=300, max_samples=20_000)
+    _, low_sub, high_sub = bootstrap_median_delta(a, b, n_boot=300, max_samples=2_000)
+    assert (high_sub - low_sub) == pytest.approx(high_full - low_full, rel=0.25)
+
+
+def test_bootstrap_unequal_run_sizes_keep_nominal_coverage():
+    # 1k against 100k samples of the same distribution: zero should be outside the 90% CI
+    # about 10% of the time, not far more
+    misses = 0
+    for seed in range(40):
+        rng = np.random.default_rng(100 + seed)
+        a, b = rng.exponential(10, 1_000), rng.exponential(10, 100_000)
+        _, low, high = bootstrap_median_delta(a, b, n_boot=200, confidence=0.9, seed=seed)
+        misses += not low <= 0 <= high
+    assert misses <= 10
+
+
+def test_quantile_profile():
+    profile = quantile_profile(np.arange(101.0))
+    assert profile[0] == 0 and profile[50] == 50 and profile[-1] == 100
+    assert np.isnan(quantile_profile(np.array([]))).all()
+
+
+def test_compare_runs_flags_only_the_slower_run():
+    rng = np.random.default_rng(3)
+    runs = {
+        "base": rng.normal(100, 5, 3000),
+        "same": rng.normal(100, 5, 3000),
+        "slower": rng.normal(120, 5, 3000),
+        "empty": np.array([]),
+    }
+    rows = {row["run"]: row for row in compare_runs("base", runs)}
+    assert rows["base"]["baseline"] and not rows["base"]["regression"]
+    assert not rows["same"]["regression"]
+    assert rows["slower"]["regression"]
+    assert rows["slower"]["p50_delta_pct"] == pytest.approx(20, abs=2)
+    assert not rows["empty"]["regression"] and rows["empty"]["samples"] == 0
+
+    # Higher throughput is better, so the same shift is not a regression
+    rows = {row["run"]: row for row in compare_runs("base", runs, higher_is_better=True)}
+    assert not rows["slower"]["regression"]
+
+
+def test_run_loader_reads_second_column_and_caches(tmp_path):
+    path = tmp_path / "run.csv"
+    path.write_text("ts,latency\n1,5\n2,x\n3,7\n")
+    loader = RunLoader()
+    values = loader.load(str(path))
+    assert values.tolist() == [5.0, 7.0]
+    assert loader.load(str(path)) is values
+
+    path.write_text("ts\n1\n")
+    with pytest.raises(ValueError):
+        loader.load(str(path))
@@ -0,0 +1,133 @@
+import threading
+import uuid
+
+import numpy as np
+import pytest
+
+from utils.shared_store import STATS_DTYPE, SharedRing, SharedSlot, SharedStore, stats_name
+
+DTYPE = np.dtype([("ts", "f8"), ("value", "u4")])
+
+
+@pytest.fixture
+def name():
+    return f"test-{uuid.uuid4().hex}"
+
+
+@pytest.fixture
+def ring(name):
+    ring = SharedRing.create(name, DTYPE, 8)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def records(start, stop):
+    out = np.zeros(stop - start, dtype=DTYPE)
+    out["ts"] = np.arange(start, stop)
+    out["value"] = np.arange(start, stop)
+    return out
+
+
+def test_ring_read_since_follows_the_cursor(ring):
+    ring.append(records(0, 3))
+    got, cursor = ring.read_since(0)
+    assert got["value"].tolist() == [0, 1, 2] and cursor == 3
+    ring.append(records(3, 5))
+    got, cursor = ring.read_since(cursor)
+    assert got["value"].tolist() == [3, 4] and cursor == 5
+    assert len(ring.read_since(cursor)[0]) == 0
+
+
+def test_ring_wraps_and_keeps_the_newest(ring):
+    ring.append(records(0, 5))
+    ring.append(records(5, 11))
+    assert ring.seq == 11
+    # A reader left behind only gets what is still in the ring
+    got, _ = ring.read_since(0)
+    assert got["value"].tolist() == list(range(3, 11))
+    assert ring.latest(2)["value"].tolist() == [9, 10]
+    assert int(ring.oldest()["value"]) == 3
+
+
+def test_ring_oversized_batch_keeps_its_tail(ring):
+    ring.append(records(0, 20))
+    assert ring.read_since(0)[0]["value"].tolist() == list(range(12, 20))
+
+
+def test_ring_read_range_across_the_wrap(ring):
+    assert len(ring.read_range("ts", 0, 100)) == 0
+    assert ring.oldest() is None
+    ring.append(records(0, 13))
+    assert ring.read_range("ts", 6, 9)["value"].tolist() == [6, 7, 8, 9]
+    assert ring.read_range("ts", 0, 5.5)["value"].tolist() == [5]
+    assert len(ring.read_range("ts", 20, 30)) == 0
+
+
+def test_ring_is_shared_with_an_attached_reader(ring, name):
+    reader = SharedRing.attach(name, DTYPE)
+    ring.append(records(0, 4))
+    assert reader.capacity == 8
+    assert reader.read_since(0)[0]["value"].tolist() == [0, 1, 2, 3]
+    reader.close()
+
+
+def test_slot_round_trip_and_overflow(name):
+    slot = SharedSlot.create(name, 64)
+    try:
+        assert slot.get(default="empty") == "empty"
+        slot.set({"a": [1, 2]})
+        assert SharedSlot.attach(name).get() == {"a": [1, 2]}
+        version = slot.version
+        with pytest.raises(ValueError):
+            slot.set({"a": "x" * 100})
+        # A rejected value leaves the previous one in place
+        assert slot.get() == {"a": [1, 2]} and slot.version == version
+    finally:
+        slot.close()
+        slot.unlink()
+
+
+def test_slot_readers_never_see_a_torn_write(name):
+    slot = SharedSlot.create(name, 64 * 1024)
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            slot.set({"first": i, "pad": "x" * (i % 5000), "last": i})
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(2000):
+            value = slot.get()
+            if value is not None:
+                assert value["first"] == value["last"]
+    finally:
+        stop.set()
+        writer.join()
+        slot.close()
+        slot.unlink()
+
+
+def test_store_create_and_attach(name):
+    store = SharedStore.create(name)
+    try:
+        other = SharedStore.attach(name)
+        store.slots["experiment"].set({"running": True})
+        assert other.slots["experiment"].get() == {"running": True}
+        # Rings written by any worker take the lock file, single-writer ones do not
+        assert other.rings["stats"].lock_path == SharedStore.lock_path(name)
+        assert other.rings["latency"].lock_path is None
+        other.close()
+    finally:
+        store.close()
+        store.unlink()
+
+
+def test_stats_name_is_cut_to_the_field_size():
+    size = STATS_DTYPE["name"].itemsize
+    assert stats_name("worker-1") == b"worker-1"
+    assert len(stats_name("x" * (size + 10))) == size
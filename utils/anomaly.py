@@ -0,0 +1,119 @@
+import math
+
+# Container metrics an anomaly is correlated with, keys of the stats kept per container
+CORRELATED_METRICS = ("cpu", "memory")
+
+
+class ChangeDetector:
+    """Online change-point and spike detection on one latency series, O(1) per sample.
+
+    The baseline is an exponentially weighted mean and variance, learnt from the first warmup
+    samples and then tracked with weight alpha. Each sample's residual is standardized against
+    it and fed, clipped to 3 sigma, to a two-sided CUSUM; when either sum exceeds h the latency
+    level has shifted, an "increase" or "decrease" event is emitted and the baseline is learnt
+    again from the new level. A single sample more than spike_z deviations above the baseline is
+    a "spike"; spikes come at least cooldown_s after the previous event. on_event(event) is
+    called with every event.
+    """
+
+    def __init__(self, alpha=0.01, k=1.0, h=10.0, spike_z=8.0, warmup=100, cooldown_s=10.0, on_event=None):
+        self.alpha = alpha
+        self.k = k
+        self.h = h
+        self.spike_z = spike_z
+        self.warmup = warmup
+        self.cooldown_s = cooldown_s
+        self.on_event = on_event
+        self.last_event_ts = -math.inf
+        self._reset()
+
+    def _reset(self):
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.high = 0.0
+        self.low = 0.0
+
+    def update(self, ts, value):
+        """Feed one sample (epoch s, latency ms); returns the event it triggered, if any"""
+        if self.n < self.warmup:
+            # Welford's running mean and variance while learning the baseline
+            self.n += 1
+            delta = value - self.mean
+            self.mean += delta / self.n
+            self.var += (delta * (value - self.mean) - self.var) / self.n
+            return None
+        # Latencies can be very stable, the floor keeps jitter of a few percent from alarming
+        std = math.sqrt(max(self.var, (0.02 * self.mean) ** 2, 1e-6))
+        z = (value - self.mean) / std
+        # Clipped so one outlier cannot trip the CUSUM on its own, that is what spikes are for
+        clipped = max(-3.0, min(z, 3.0))
+        self.high = max(0.0, self.high + clipped - self.k)
+        self.low = max(0.0, self.low - clipped - self.k)
+        if self.high > self.h or self.low > self.h:
+            kind = "increase" if self.high > self.h else "decrease"
+            event = self._event(ts, kind, value, max(self.high, self.low))
+            # Learn the new level from scratch, the warmup also spaces change events out
+            self._reset()
+            return self._emit(event)
+        event = None
+        if z > self.spike_z and ts - self.last_event_ts >= self.cooldown_s:
+            event = self._event(ts, "spike", value, z)
+        # Outliers move the baseline no more than a 3 sigma sample would
+        delta = clipped * std
+        self.mean += self.alpha * delta
+        self.var = (1 - self.alpha) * (self.var + self.alpha * delta * delta)
+        return self._emit(event)
+
+    def update_many(self, ts, values):
+        """Feed samples in time order, lists or numpy arrays; returns the events triggered"""
+        events = []
+        for t, value in zip(ts.tolist() if hasattr(ts, "tolist") else ts,
+                            values.tolist() if hasattr(values, "tolist") else values):
+            event = self.update(t, value)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _event(self, ts, kind, value, score):
+        return {"ts": ts, "kind": kind, "value": value, "baseline": self.mean, "score": round(score, 2)}
+
+    def _emit(self, event):
+        if event is None:
+            return None
+        self.last_event_ts = event["ts"]
+        if self.on_event is not None:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                # Detection must never stop the samples from being stored
+                print("Anomaly handler error:", e)
+        return event
+
+
+def correlate_containers(container_stats, ts, window_s=30, baseline_s=90, limit=3):
+    """Containers whose CPU or memory moved when a latency event at ts (epoch s) happened.
+
+    container_stats maps container names to {"cpu": [...], "memory": [...], "timestamps":
+    [datetime...]} as kept by DataStorage. The mean over the window_s before ts is compared with
+    the mean over the baseline_s before that, in units of the baseline's standard deviation
+    (at least one percentage point). Returns up to limit moves, the largest first.
+    """
+    moves = []
+    for name, stats in list(container_stats.items()):
+        times = [t.timestamp() for t in list(stats["timestamps"])]
+        for metric in CORRELATED_METRICS:
+            values = list(stats[metric])[-len(times):]
+            before = [v for t, v in zip(times, values) if ts - window_s - baseline_s < t <= ts - window_s]
+            after = [v for t, v in zip(times, values) if ts - window_s < t <= ts + 1]
+            if len(before) < 2 or not after:
+                continue
+            mean_before = sum(before) / len(before)
+            mean_after = sum(after) / len(after)
+            std = math.sqrt(sum((v - mean_before) ** 2 for v in before) / len(before))
+            score = abs(mean_after - mean_before) / max(std, 1.0)
+            if score >= 2.0:
+                moves.append({"container": name, "metric": metric, "before": round(mean_before, 2),
+                              "after": round(mean_after, 2), "score": round(score, 2)})
+    moves.sort(key=lambda move: move["score"], reverse=True)
+    return moves[:limit]
@@ -0,0 +1,114 @@
+import json
+import queue
+import threading
+import time
+
+from flask import Response, stream_with_context
+
+from utils.metrics import registry
+
+
+class Broadcaster:
+    """Fan out live events from one producer to every connected Server-Sent Events client.
+
+    High-rate channels go through publish_batched, which coalesces items for flush_interval
+    seconds and sends them as one event. Nothing is queued while no client is connected.
+    """
+
+    def __init__(self, flush_interval=0.25, max_queue=256, keepalive_s=15):
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.keepalive_s = keepalive_s
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._flusher = None
+        registry.gauge("sse_subscribers", "Connected event stream clients", fn=lambda: len(self._subscribers))
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, channel, payload):
+        if not self._subscribers:
+            return
+        # Serialized once, shared by every subscriber
+        message = f"event: {channel}\ndata: {json.dumps(payload, default=str)}\n\n"
+        labels = {"channel": channel}
+        registry.counter("sse_events_total", "Events sent to event stream clients", labels).inc()
+        registry.counter("sse_event_bytes_total", "Bytes of events sent, per client", labels).inc(
+            len(message) * len(self._subscribers))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # A stalled client loses events rather than slowing the producer down,
+                # it gets a fresh snapshot on its next page load
+                pass
+
+    def publish_batched(self, channel, item):
+        if not self._subscribers:
+            return
+        with self._cond:
+            self._pending.setdefault(channel, []).append(item)
+            self._cond.notify()
+        if self._flusher is None:
+            self._start_flusher()
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let a batch build up before sending
+            time.sleep(self.flush_interval)
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            for channel, items in pending.items():
+                self.publish(channel, items)
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def stream(self):
+        q = self.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield q.get(timeout=self.keepalive_s)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(q)
+
+
+def register_event_stream(server, broadcaster, route="/events"):
+    @server.route(route)
+    def event_stream():
+        return Response(
+            stream_with_context(broadcaster.stream()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return event_stream
+
+
+broadcaster = Broadcaster()
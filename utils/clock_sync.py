@@ -0,0 +1,180 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from utils.metrics import registry
+
+PROBE_TOPIC = "clock/probe"
+REPLY_TOPIC = "clock/reply/"
+
+
+class MonotonicClock:
+    """Wall-clock milliseconds that advance with the monotonic clock.
+
+    Anchored to the wall clock once, so NTP steps on this host during a run do not show up
+    as latency jumps.
+    """
+
+    def __init__(self):
+        self.anchor()
+
+    def anchor(self):
+        self._wall_ns = time.time_ns()
+        self._mono_ns = time.monotonic_ns()
+
+    def now_ms(self):
+        return (self._wall_ns + time.monotonic_ns() - self._mono_ns) / 1e6
+
+
+local_clock = MonotonicClock()
+
+
+class WallClock:
+    """The system wall clock in milliseconds, steps and all"""
+
+    def now_ms(self):
+        return time.time_ns() / 1e6
+
+
+wall_clock = WallClock()
+
+
+class OffsetEstimator:
+    """Per-source clock offset from NTP-style probe samples.
+
+    Each sample gives offset = ((t2 - t1) + (t3 - t4)) / 2 and round-trip delay
+    (t4 - t1) - (t3 - t2). Queueing only ever adds delay, so the sample with the smallest
+    delay in the window is the most accurate one; its error is bounded by delay / 2.
+    """
+
+    def __init__(self, window=16):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add_sample(self, source, t1, t2, t3, t4):
+        delay = (t4 - t1) - (t3 - t2)
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        with self._lock:
+            samples = self._samples.setdefault(source, deque(maxlen=self.window))
+            samples.append((delay, offset))
+        registry.gauge("clock_offset_ms", "Estimated clock offset of a source (source - monitor)",
+                       {"source": source}).set(self.offset_ms(source))
+        registry.gauge("clock_probe_delay_ms", "Round-trip delay of the best probe in the window",
+                       {"source": source}).set(self.estimate(source)["delay_ms"])
+        return offset, delay
+
+    def estimate(self, source):
+        with self._lock:
+            samples = list(self._samples.get(source, ()))
+        if not samples:
+            return None
+        delay, offset = min(samples)
+        return {"offset_ms": offset, "delay_ms": delay, "error_ms": max(delay, 0.0) / 2, "samples": len(samples)}
+
+    def offset_ms(self, source):
+        with self._lock:
+            samples = self._samples.get(source)
+            # Sources that never answered a probe are taken to be in sync
+            return min(samples)[1] if samples else 0.0
+
+    def sources(self):
+        with self._lock:
+            return list(self._samples)
+
+
+class ClockSync:
+    """Monitor side: broadcast probes on PROBE_TOPIC and turn replies into offset estimates.
+
+    publish(topic, payload) sends a message; replies arriving on reply_topic are passed to
+    handle_reply by whoever receives them.
+    """
+
+    def __init__(self, publish, clock=local_clock, interval_s=2.0, window=16, monitor_id=None):
+        self.publish = publish
+        self.clock = clock
+        self.interval_s = interval_s
+        self.estimator = OffsetEstimator(window)
+        self.reply_topic = REPLY_TOPIC + (monitor_id or uuid.uuid4().hex[:12])
+        self._next_id = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.probe()
+            except Exception as e:
+                print(f"Clock probe failed: {e}")
+            time.sleep(self.interval_s)
+
+    def probe(self):
+        self._next_id += 1
+        payload = {"id": self._next_id, "reply_to": self.reply_topic, "t1": self.clock.now_ms()}
+        self.publish(PROBE_TOPIC, json.dumps(payload))
+
+    def handle_reply(self, payload, received_ms=None):
+        t4 = received_ms if received_ms is not None else self.clock.now_ms()
+        reply = json.loads(payload)
+        return self.estimator.add_sample(reply["source"], reply["t1"], reply["t2"], reply["t3"], t4)
+
+    def offset_ms(self, source):
+        return self.estimator.offset_ms(source)
+
+    def to_local_ms(self, source, remote_ms):
+        """A timestamp taken on source's clock, expressed on the monitor's clock."""
+        return remote_ms - self.estimator.offset_ms(source)
+
+
+class ClockResponder:
+    """Node side: answer probes with this node's receive and send times.
+
+    Answers on the wall clock, the one sinks stamp results with, so the offset still matches
+    their timestamps after an NTP step on the node. offset_ms shifts this node's clock, so a
+    responder on the monitor host can stand in for a skewed remote node.
+    """
+
+    def __init__(self, publish, source, clock=wall_clock, offset_ms=0.0):
+        self.publish = publish
+        self.source = source
+        self.clock = clock
+        self.offset_ms = offset_ms
+
+    def now_ms(self):
+        return self.clock.now_ms() + self.offset_ms
+
+    def handle_probe(self, payload, received_ms=None):
+        t2 = received_ms if received_ms is not None else self.now_ms()
+        probe = json.loads(payload)
+        reply = {"id": probe["id"], "source": self.source, "t1": probe["t1"], "t2": t2}
+        reply["t3"] = self.now_ms()
+        self.publish(probe["reply_to"], json.dumps(reply))
+
+
+class LoopbackTransport:
+    """In-process stand-in for the broker: delivers published messages to subscribers after a delay.
+
+    delay_s(topic) returns the one-way delay of a message, so asymmetric or jittery links can
+    be simulated.
+    """
+
+    def __init__(self, delay_s=lambda topic: 0.0):
+        self.delay_s = delay_s
+        self._handlers = []
+
+    def subscribe(self, prefix, handler):
+        self._handlers.append((prefix, handler))
+
+    def publish(self, topic, payload):
+        for prefix, handler in self._handlers:
+            if topic.startswith(prefix):
+                threading.Timer(self.delay_s(topic), handler, args=(payload,)).start()
@@ -0,0 +1,102 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Container metrics correlated with latency; network counters are turned into byte rates first
+METRICS = ("cpu", "memory", "net_rx_rate", "net_tx_rate")
+
+
+def resample(ts, values, grid, step, weights=None):
+    """values sampled at ts (epoch s) on the grid of [g, g + step) bins.
+
+    Each bin gets the (weighted) mean of its samples; empty bins are interpolated from their
+    neighbours, bins before the first or after the last sample are NaN.
+    """
+    out = np.full(len(grid), np.nan)
+    if not len(ts):
+        return out
+    ts, values = np.asarray(ts, dtype=float), np.asarray(values, dtype=float)
+    weights = np.ones(len(ts)) if weights is None else np.asarray(weights, dtype=float)
+    bins = np.floor((ts - grid[0]) / step).astype(np.int64)
+    inside = (bins >= 0) & (bins < len(grid))
+    totals = np.bincount(bins[inside], weights=(values * weights)[inside], minlength=len(grid))
+    counts = np.bincount(bins[inside], weights=weights[inside], minlength=len(grid))
+    filled = counts > 0
+    if not filled.any():
+        return out
+    out[filled] = totals[filled] / counts[filled]
+    first, last = np.flatnonzero(filled)[[0, -1]]
+    span = np.arange(first, last + 1)
+    out[span] = np.interp(span, np.flatnonzero(filled), out[filled])
+    return out
+
+
+def counter_rate(ts, counter):
+    """Per-second rate of a cumulative counter, at the later sample of each pair; resets give 0"""
+    ts, counter = np.asarray(ts, dtype=float), np.asarray(counter, dtype=float)
+    if len(ts) < 2:
+        return ts[:0], counter[:0]
+    dt = np.diff(ts)
+    rate = np.where(dt > 0, np.maximum(np.diff(counter), 0) / np.where(dt > 0, dt, 1), 0)
+    return ts[1:], rate
+
+
+def lagged_correlation(x, y, max_lag):
+    """Pearson correlation of x[t] with y[t + lag] for every lag in -max_lag..max_lag.
+
+    All lags are computed at once from a sliding-window view of y over the same stretch of x,
+    so every lag is measured on the same number of samples. Lags of a constant stretch are NaN.
+    """
+    m = len(x) - 2 * max_lag
+    if m < 2:
+        return np.full(2 * max_lag + 1, np.nan)
+    xs = x[max_lag:max_lag + m] - x[max_lag:max_lag + m].mean()
+    windows = sliding_window_view(y, m)
+    ys = windows - windows.mean(axis=1, keepdims=True)
+    denominator = np.sqrt((xs * xs).sum() * (ys * ys).sum(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, ys @ xs / denominator, np.nan)
+
+
+def rank_bottlenecks(stats, latency_ts, latency, start, end, step=3.0, max_lag_s=30.0, weights=None,
+                     min_samples=10, extra=None):
+    """Container metrics ranked by how well they predict end-to-end latency over [start, end].
+
+    stats maps container names to {"ts", "cpu", "memory", "net_rx", "net_tx"} arrays, latency is
+    sampled at latency_ts (optionally weighted, e.g. by rollup bucket counts). Everything is
+    resampled onto one step-second grid; a metric scores its highest correlation with latency at
+    a lag of 0 to max_lag_s (the metric moving first, or together with latency). Rows hold the
+    container, metric, score, that lag in seconds, the correlation without lag and the number of
+    aligned samples, best first. extra adds other metrics as {source: {metric: (ts, values)}},
+    e.g. from utils/extended_metrics.py.
+    """
+    grid = np.arange(start, end, step)
+    if len(grid) < min_samples:
+        return []
+    target = resample(latency_ts, latency, grid, step, weights)
+    max_lag = int(max_lag_s // step)
+    candidates = []
+    for name, series in stats.items():
+        columns = {"cpu": (series["ts"], series["cpu"]), "memory": (series["ts"], series["memory"]),
+                   "net_rx_rate": counter_rate(series["ts"], series["net_rx"]),
+                   "net_tx_rate": counter_rate(series["ts"], series["net_tx"])}
+        candidates += [(name, metric, *columns[metric]) for metric in METRICS]
+    for name, metrics in (extra or {}).items():
+        candidates += [(name, metric, ts, values) for metric, (ts, values) in metrics.items()]
+    rows = []
+    for name, metric, ts, values in candidates:
+        values = resample(ts, values, grid, step)
+        valid = np.flatnonzero(np.isfinite(values) & np.isfinite(target))
+        if len(valid) < max(min_samples, 2 * max_lag + 2):
+            continue
+        # Interpolation leaves no gaps inside the range both are defined on
+        stretch = slice(valid[0], valid[-1] + 1)
+        correlations = lagged_correlation(values[stretch], target[stretch], max_lag)
+        leading = correlations[max_lag:]
+        if np.isnan(leading).all():
+            continue
+        best = int(np.nanargmax(leading))
+        rows.append({"container": name, "metric": metric, "score": round(float(leading[best]), 3),
+                     "lag_s": best * step, "corr_0": round(float(leading[0]), 3),
+                     "samples": len(valid)})
+    rows.sort(key=lambda row: row["score"], reverse=True)
+    return rows
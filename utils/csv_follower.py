@@ -0,0 +1,125 @@
+import os
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+
+class CSVFollower:
+    """Incrementally follow append-only CSV files, parsing only new rows.
+
+    Rows are kept in per-column arrays with spare capacity, so an append costs O(new rows)
+    amortized; the returned frame is a view of the filled part. Treat it as read-only.
+    """
+
+    def __init__(self, max_files=8):
+        self.max_files = max_files
+        self._files = OrderedDict()
+
+    def read(self, path):
+        """Return (dataframe, changed) for path, reusing the cached frame when possible."""
+        st = os.stat(path)
+        state = self._files.get(path)
+
+        if (state is None or not state['header'] or state['inode'] != st.st_ino
+                or st.st_size < state['offset']):
+            state = self._load_full(path, st)
+            changed = True
+        elif st.st_size == state['offset']:
+            if st.st_mtime_ns == state['mtime']:
+                self._files.move_to_end(path)
+                return state['df'], False
+            # Same size but touched: the file may have been rewritten in place
+            state = self._load_full(path, st)
+            changed = True
+        else:
+            changed = self._load_tail(path, state, st)
+            state = self._files[path]
+
+        return state['df'], changed
+
+    def forget(self, path):
+        self._files.pop(path, None)
+
+    def _store(self, path, state):
+        self._files[path] = state
+        self._files.move_to_end(path)
+        while len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+        return state
+
+    def _load_full(self, path, st):
+        with open(path, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        header_end = data.find(b"\n") + 1
+        complete = data[:end]
+
+        if header_end == 0:
+            # Not even a complete header line yet
+            df = pd.DataFrame()
+            header = b""
+            end = 0
+        else:
+            header = data[:header_end]
+            df = pd.read_csv(BytesIO(complete))
+
+        state = {
+            'inode': st.st_ino,
+            'mtime': st.st_mtime_ns,
+            'offset': end,
+            'header': header,
+            'columns': list(df.columns),
+            'buffers': {column: df[column].to_numpy() for column in df.columns},
+            'rows': len(df),
+        }
+        state['df'] = self._frame(state)
+        return self._store(path, state)
+
+    def _load_tail(self, path, state, st):
+        with open(path, "rb") as f:
+            if f.read(len(state['header'])) != state['header']:
+                # Header no longer matches: truncated and rewritten, start over
+                self._load_full(path, st)
+                return True
+            f.seek(state['offset'])
+            chunk = f.read()
+
+        end = chunk.rfind(b"\n") + 1
+        state['mtime'] = st.st_mtime_ns
+        if end == 0:
+            # Only a partially written row so far, pick it up on the next poll
+            return False
+
+        new_rows = pd.read_csv(BytesIO(chunk[:end]), header=None, names=state['columns'])
+        self._append(state, new_rows)
+        state['offset'] += end
+        self._files.move_to_end(path)
+        return True
+
+    def _append(self, state, new_rows):
+        rows, added = state['rows'], len(new_rows)
+        buffers = state['buffers']
+        for column in state['columns']:
+            values = new_rows[column].to_numpy()
+            buffer = buffers[column]
+            # A header-only file parses to object columns; take the first rows' types instead
+            dtype = values.dtype if rows == 0 else np.result_type(buffer.dtype, values.dtype)
+            if rows + added > len(buffer) or dtype != buffer.dtype:
+                # Doubling keeps the copies amortized O(1) per row; a column whose rows stop
+                # fitting its type (ints, then floats or text) is widened once
+                grown = np.empty(max(2 * len(buffer), rows + added, 1024), dtype=dtype)
+                grown[:rows] = buffer[:rows]
+                buffer = buffers[column] = grown
+            buffer[rows:rows + added] = values
+        state['rows'] = rows + added
+        state['df'] = self._frame(state)
+
+    @staticmethod
+    def _frame(state):
+        # Views of the filled rows, no copy; text stays object dtype, converting it to pandas'
+        # string dtype would copy the whole column on every append
+        rows = state['rows']
+        return pd.DataFrame({column: pd.Series(buffer[:rows], dtype=buffer.dtype, copy=False)
+                             for column, buffer in state['buffers'].items()}, copy=False)
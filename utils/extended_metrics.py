@@ -0,0 +1,369 @@
+import glob
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+# Jiffies per second of /proc/<pid>/stat times, and bytes per /proc/diskstats sector
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+SECTOR_BYTES = 512
+# Block devices that are not disks
+VIRTUAL_DEVICES = ("loop", "ram", "zram", "dm-", "md")
+
+# HotSpot counters read from a JVM's hsperfdata file (what jstat reads, without starting a JVM)
+GC_COUNTERS = ("sun.gc.collector.0.invocations", "sun.gc.collector.0.time",
+               "sun.gc.collector.1.invocations", "sun.gc.collector.1.time",
+               "sun.rt.safepointTime", "sun.os.hrt.frequency")
+# Pause of a unified (-Xlog:gc) or legacy (-XX:+PrintGC) GC log line, in ms or s
+GC_PAUSE = re.compile(rb"Pause.*?(\d+(?:\.\d+)?)\s*(ms|secs)")
+
+
+def read_host(stat_path="/proc/stat"):
+    """Busy and total jiffies of every core and the host's context switch count"""
+    cores = []
+    ctxt = 0
+    with open(stat_path, "rb") as f:
+        for line in f:
+            if line.startswith(b"cpu") and line[3:4].isdigit():
+                # user nice system idle iowait irq softirq steal; guest time is already in user
+                fields = [int(v) for v in line.split()[1:9]]
+                total = sum(fields)
+                cores.append((total - fields[3] - fields[4], total))
+            elif line.startswith(b"ctxt "):
+                ctxt = int(line.split()[1])
+    return cores, ctxt
+
+
+def disk_devices(sys_block="/sys/block"):
+    try:
+        return {name for name in os.listdir(sys_block) if not name.startswith(VIRTUAL_DEVICES)}
+    except OSError:
+        return set()
+
+
+def read_disks(devices, diskstats_path="/proc/diskstats"):
+    """Bytes read and written by the given whole disks since boot"""
+    read = written = 0
+    with open(diskstats_path, "rb") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) > 9 and fields[2].decode() in devices:
+                read += int(fields[5]) * SECTOR_BYTES
+                written += int(fields[9]) * SECTOR_BYTES
+    return read, written
+
+
+def read_process_cpu(pid):
+    """utime + stime of a process in seconds"""
+    with open(f"/proc/{pid}/stat", "rb") as f:
+        # The command name can hold spaces and parentheses, fields start after its last ")"
+        fields = f.read().rsplit(b")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def read_process_io(pid):
+    """Bytes the process made the block layer read and write, None without permission"""
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            values = dict(line.split(b":") for line in f.read().splitlines())
+    except OSError:
+        return None
+    return int(values[b"read_bytes"]), int(values[b"write_bytes"])
+
+
+def read_context_switches(pid):
+    """Voluntary and involuntary context switches summed over the threads of a process"""
+    voluntary = involuntary = 0
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return None
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/status", "rb") as f:
+                status = f.read()
+        except OSError:
+            # The thread exited
+            continue
+        # The two counters end the file, found without splitting it into lines
+        start = status.rfind(b"\nvoluntary_ctxt_switches:")
+        if start < 0:
+            continue
+        fields = status[start:].split()
+        voluntary += int(fields[1])
+        involuntary += int(fields[3])
+    return voluntary, involuntary
+
+
+def read_process_net(pid):
+    """Bytes received and sent on the non-loopback interfaces of the process's network namespace"""
+    rx = tx = 0
+    with open(f"/proc/{pid}/net/dev", "rb") as f:
+        for line in f.readlines()[2:]:
+            name, data = line.split(b":", 1)
+            if name.strip() == b"lo":
+                continue
+            fields = data.split()
+            rx += int(fields[0])
+            tx += int(fields[8])
+    return rx, tx
+
+
+def hsperfdata_path(pid):
+    """The JVM's perf data file, also found for JVMs in containers through /proc/<pid>/root"""
+    nspid = pid
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"NSpid:"):
+                    # The pid inside the innermost namespace names the file
+                    nspid = int(line.split()[-1])
+    except OSError:
+        return None
+    paths = glob.glob(f"/proc/{pid}/root/tmp/hsperfdata_*/{nspid}")
+    return paths[0] if paths else None
+
+
+class HsPerfData:
+    """Long counters of a HotSpot hsperfdata file, memory-mapped.
+
+    The entry table is parsed once for the offsets of the wanted counters; each read is then a
+    handful of 8-byte loads from the mapping, with no process started and no JVM attached.
+    """
+
+    MAGIC = 0xCAFEC0C0
+    # entry_length, name_offset, vector_length, data_type, flags, data_units, data_variability, data_offset
+    ENTRY = "iiiBBBBi"
+    REINDEX_S = 10.0
+
+    def __init__(self, path, names=GC_COUNTERS):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byte_order = struct.unpack_from(">IB", self.mm, 0)
+        if magic != self.MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path} is not a hsperfdata file")
+        self.endian = "<" if byte_order == 1 else ">"
+        self.names = names
+        self.offsets = {}
+        self._indexed = 0.0
+        self._index()
+
+    def _index(self):
+        self._indexed = time.monotonic()
+        # After magic, byte order, versions, accessible flag, used, overflow and mod time stamp
+        entry_offset, num_entries = struct.unpack_from(self.endian + "ii", self.mm, 24)
+        entry = struct.Struct(self.endian + self.ENTRY)
+        position = entry_offset
+        for _ in range(num_entries):
+            length, name_offset, vector_length, data_type, _, _, _, data_offset = entry.unpack_from(self.mm, position)
+            if length <= 0:
+                break
+            name_start = position + name_offset
+            name = self.mm[name_start:self.mm.find(b"\0", name_start)].decode()
+            if name in self.names and data_type == ord("J") and vector_length == 0:
+                self.offsets[name] = position + data_offset
+            position += length
+
+    def read(self):
+        """{counter: value} of the wanted counters present in the file"""
+        if len(self.offsets) < len(self.names) and time.monotonic() - self._indexed > self.REINDEX_S:
+            # The JVM registers some counters after start-up, and some collectors have none
+            self._index()
+        return {name: struct.unpack_from(self.endian + "q", self.mm, offset)[0]
+                for name, offset in self.offsets.items()}
+
+    def close(self):
+        self.mm.close()
+
+
+class GcLogTail:
+    """GC pauses appended to a GC log since the last read, for JVMs without perf data"""
+
+    def __init__(self, path):
+        self.path = path
+        self.position = os.path.getsize(path) if os.path.exists(path) else 0
+        self.partial = b""
+
+    def read(self):
+        """(pauses, pause ms) logged since the previous call"""
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self.position:
+                    # Rotated
+                    self.position = 0
+                f.seek(self.position)
+                data = f.read()
+                self.position = f.tell()
+        except OSError:
+            return 0, 0.0
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        count, total_ms = 0, 0.0
+        for line in lines:
+            match = GC_PAUSE.search(line)
+            if match:
+                count += 1
+                total_ms += float(match.group(1)) * (1000 if match.group(2) == b"secs" else 1)
+        return count, total_ms
+
+
+class ExtendedMetricsCollector:
+    """Host and per-process metrics sampled from /proc every interval_s.
+
+    Host: busy % of every core, context switches/s and disk bytes/s. Every process returned by
+    discover() ({name: pid}, refreshed every discover_s): CPU %, block I/O bytes/s, network
+    bytes/s and voluntary/involuntary context switches/s; for JVMs also GC pauses/s, GC pause
+    ms/s and safepoint ms/s from their hsperfdata file. gc_logs ({name: path}) adds GC pauses
+    from GC logs. Per-thread context switches cost a file read per thread, so they are sampled
+    less often the more threads there are (see switches_budget). Each tick calls sink(ts,
+    [(source, metric, value)]).
+    """
+
+    def __init__(self, sink, discover=None, interval_s=0.25, discover_s=10.0, gc_logs=None, switches_budget=0.004,
+                 clock=time.time):
+        self.sink = sink
+        self.discover = discover or (lambda: {})
+        self.interval_s = interval_s
+        self.discover_s = discover_s
+        self.switches_budget = switches_budget
+        self._next_switches = 0.0
+        self.clock = clock
+        self.gc_logs = {name: GcLogTail(path) for name, path in (gc_logs or {}).items()}
+        self.devices = disk_devices()
+        self.processes = {}
+        self.perf = {}
+        self._previous = {}
+        self._discovered = 0.0
+        # CPU seconds spent sampling per wall second, smoothed
+        self.overhead = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            started, cpu_started = time.monotonic(), time.thread_time()
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Extended metrics sampling error: {e}")
+            busy = time.thread_time() - cpu_started
+            elapsed = time.monotonic() - started
+            time.sleep(max(self.interval_s - elapsed, 0.0))
+            self.overhead += 0.05 * (busy / max(time.monotonic() - started, 1e-9) - self.overhead)
+
+    def _rate(self, key, value, now):
+        """Change per second of a counter since its previous sample, None on the first one"""
+        previous = self._previous.get(key)
+        self._previous[key] = (now, value)
+        if previous is None or now <= previous[0]:
+            return None
+        return max(value - previous[1], 0) / (now - previous[0])
+
+    def _refresh_processes(self, now):
+        if now - self._discovered < self.discover_s:
+            return
+        self._discovered = now
+        try:
+            processes = self.discover()
+        except Exception as e:
+            print(f"Extended metrics discovery error: {e}")
+            return
+        for name in set(self.perf) - set(processes):
+            self.perf.pop(name).close()
+        # Counters of processes that exited or were restarted under the same name start over
+        gone = {name for name, pid in self.processes.items() if processes.get(name) != pid}
+        for key in [key for key in self._previous if key[0] in gone]:
+            del self._previous[key]
+        for name, pid in processes.items():
+            if name not in self.perf or self.processes.get(name) != pid:
+                path = hsperfdata_path(pid)
+                try:
+                    if name in self.perf:
+                        self.perf.pop(name).close()
+                    if path:
+                        self.perf[name] = HsPerfData(path)
+                except (OSError, ValueError):
+                    pass
+        self.processes = processes
+
+    def sample(self):
+        now = self.clock()
+        rows = []
+        # Per-thread context switches cost a file read per thread: scan them no more often than
+        # keeps that cost within switches_budget of a core, and at most once a second
+        scan_switches = time.monotonic() >= self._next_switches
+        scan_cpu = time.thread_time()
+
+        cores, ctxt = read_host()
+        for i, (busy, total) in enumerate(cores):
+            previous = self._previous.get(("core", i))
+            self._previous[("core", i)] = (busy, total)
+            if previous and total > previous[1]:
+                rows.append(("host", f"cpu{i}", 100.0 * (busy - previous[0]) / (total - previous[1])))
+        rows.append(("host", "ctxt_per_s", self._rate(("host", "ctxt"), ctxt, now)))
+        if self.devices:
+            read, written = read_disks(self.devices)
+            rows.append(("host", "disk_read_bps", self._rate(("host", "disk_read"), read, now)))
+            rows.append(("host", "disk_write_bps", self._rate(("host", "disk_write"), written, now)))
+
+        self._refresh_processes(now)
+        for name, pid in list(self.processes.items()):
+            try:
+                cpu = self._rate((name, "cpu"), read_process_cpu(pid), now)
+                rows.append((name, "cpu", None if cpu is None else 100.0 * cpu))
+                io = read_process_io(pid)
+                if io is not None:
+                    rows.append((name, "io_read_bps", self._rate((name, "io_read"), io[0], now)))
+                    rows.append((name, "io_write_bps", self._rate((name, "io_write"), io[1], now)))
+                rx, tx = read_process_net(pid)
+                rows.append((name, "net_rx_bps", self._rate((name, "net_rx"), rx, now)))
+                rows.append((name, "net_tx_bps", self._rate((name, "net_tx"), tx, now)))
+                switches = read_context_switches(pid) if scan_switches else None
+                if switches is not None:
+                    voluntary, involuntary = switches
+                    rows.append((name, "vol_ctxt_per_s", self._rate((name, "vol_ctxt"), voluntary, now)))
+                    rows.append((name, "invol_ctxt_per_s", self._rate((name, "invol_ctxt"), involuntary, now)))
+            except (OSError, IndexError, ValueError):
+                # Exited; dropped at the next discovery
+                continue
+            perf = self.perf.get(name)
+            if perf is not None:
+                rows.extend(self._gc_rows(name, perf.read(), now))
+        if scan_switches:
+            cost = time.thread_time() - scan_cpu
+            self._next_switches = time.monotonic() + max(1.0, cost / self.switches_budget)
+        for name, tail in self.gc_logs.items():
+            count, pause_ms = tail.read()
+            previous = self._previous.get((name, "gc_log"))
+            self._previous[(name, "gc_log")] = now
+            if previous is not None and now > previous:
+                rows.append((name, "gc_per_s", count / (now - previous)))
+                rows.append((name, "gc_pause_ms_per_s", pause_ms / (now - previous)))
+
+        rows = [row for row in rows if row[2] is not None]
+        if rows:
+            self.sink(now, rows)
+        return rows
+
+    def _gc_rows(self, name, counters, now):
+        frequency = counters.get("sun.os.hrt.frequency")
+        if not frequency:
+            return []
+        invocations = sum(counters.get(f"sun.gc.collector.{i}.invocations", 0) for i in (0, 1))
+        ticks = sum(counters.get(f"sun.gc.collector.{i}.time", 0) for i in (0, 1))
+        pause_ms = self._rate((name, "gc_time"), 1000.0 * ticks / frequency, now)
+        safepoint_ms = self._rate((name, "safepoint"), 1000.0 * counters.get("sun.rt.safepointTime", 0) / frequency,
+                                  now)
+        return [(name, "gc_per_s", self._rate((name, "gc"), invocations, now)),
+                (name, "gc_pause_ms_per_s", pause_ms),
+                (name, "safepoint_ms_per_s", safepoint_ms)]
@@ -0,0 +1,236 @@
+import os
+import subprocess
+
+import numpy as np
+
+HARDWARE_PROFILES = {
+    "small": {"cpu_cores": 1, "cpu_ghz": 1.8, "memory_mb": 2048},
+    "medium": {"cpu_cores": 2, "cpu_ghz": 2.5, "memory_mb": 8192},
+    "large": {"cpu_cores": 8, "cpu_ghz": 3.2, "memory_mb": 32768},
+}
+
+LINK_PROFILES = {
+    "lan": {"bandwidth_mbit": 1000, "latency_ms": 0.5},
+    "wan": {"bandwidth_mbit": 100, "latency_ms": 20.0},
+    "edge": {"bandwidth_mbit": 10, "latency_ms": 50.0},
+}
+
+# Profile mix per "Hardware Heterogeneity" setting, as probabilities per node / per link
+NODE_DISTRIBUTIONS = {
+    "homogeneous": {"medium": 1.0},
+    "heterogeneous": {"small": 0.5, "medium": 0.3, "large": 0.2},
+}
+LINK_DISTRIBUTIONS = {
+    "homogeneous": {"lan": 1.0},
+    "heterogeneous": {"lan": 0.6, "wan": 0.3, "edge": 0.1},
+}
+
+# CPU frequency cannot be capped per process, so it is emulated by shrinking the CPU quota
+REFERENCE_GHZ = 3.2
+CGROUP_ROOT = "/sys/fs/cgroup/stream-benchmark"
+
+
+def _uniform(indices, seed):
+    """Uniform [0, 1) per item index (splitmix64 of index and seed).
+
+    Every item is drawn on its own, so any subset of a topology gets the same profiles as the
+    whole one without drawing the rest.
+    """
+    x = np.asarray(indices, dtype=np.uint64) + np.uint64((seed * 0x9E3779B97F4A7C15) & (2 ** 64 - 1))
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / 2.0 ** 53
+
+
+def profile_indices(indices, distribution, seed=0):
+    """Profile names of a {name: probability} distribution and the one drawn per item index."""
+    names = list(distribution)
+    weights = np.cumsum([distribution[name] for name in names], dtype=np.float64)
+    picks = np.searchsorted(weights / weights[-1], _uniform(indices, seed), side="right")
+    return names, np.minimum(picks, len(names) - 1)
+
+
+def sample_profiles(count, distribution, seed=0):
+    """Draw one profile name per item from a {name: probability} distribution."""
+    names, picks = profile_indices(np.arange(count), distribution, seed)
+    return [names[i] for i in picks.tolist()]
+
+
+def node_hardware(profile_name):
+    profile = HARDWARE_PROFILES[profile_name]
+    return {
+        "profile": profile_name,
+        **profile,
+        "cpu": f"{profile['cpu_cores']} × {profile['cpu_ghz']} GHz",
+        "memory": f"{profile['memory_mb'] // 1024}GB",
+    }
+
+
+def link_model(profile_name):
+    return {"link": profile_name, **LINK_PROFILES[profile_name]}
+
+
+def hardware_at(nodes, heterogeneity="homogeneous", seed=0, node_overrides=None):
+    """Hardware of the given node indices, as assign_hardware would give them.
+
+    node_overrides maps node id to a profile name and wins over the distribution. Nodes share
+    one dict per profile, callers must copy before modifying.
+    """
+    distribution = NODE_DISTRIBUTIONS.get(heterogeneity, NODE_DISTRIBUTIONS["homogeneous"])
+    names, picks = profile_indices(nodes, distribution, seed)
+    overrides = {int(node_id): name for node_id, name in (node_overrides or {}).items()}
+    for name in overrides.values():
+        if name not in HARDWARE_PROFILES:
+            raise ValueError(f"Unknown hardware profile: {name}")
+    hardware = {name: node_hardware(name) for name in HARDWARE_PROFILES}
+    return [hardware[overrides.get(i, names[pick])] for i, pick in zip(np.asarray(nodes).tolist(), picks.tolist())]
+
+
+def links_at(edges, heterogeneity="homogeneous", seed=0):
+    """Link models of the given edge indices, as assign_hardware would give them (shared dicts)"""
+    distribution = LINK_DISTRIBUTIONS.get(heterogeneity, LINK_DISTRIBUTIONS["homogeneous"])
+    names, picks = profile_indices(edges, distribution, seed + 1)
+    links = [link_model(name) for name in names]
+    return [links[pick] for pick in picks.tolist()]
+
+
+def link_arrays(num_edges, heterogeneity="homogeneous", seed=0):
+    """Bandwidth (Mbit/s) and latency (ms) of every edge as arrays, without building link dicts"""
+    distribution = LINK_DISTRIBUTIONS.get(heterogeneity, LINK_DISTRIBUTIONS["homogeneous"])
+    names, picks = profile_indices(np.arange(num_edges), distribution, seed + 1)
+    bandwidth = np.array([LINK_PROFILES[name]["bandwidth_mbit"] for name in names], dtype=np.float64)
+    latency = np.array([LINK_PROFILES[name]["latency_ms"] for name in names], dtype=np.float64)
+    return bandwidth[picks], latency[picks]
+
+
+def assign_hardware(num_nodes, num_edges, heterogeneity="homogeneous", seed=0, node_overrides=None):
+    """Hardware per node and link model per edge for a topology.
+
+    node_overrides maps node id to a profile name and wins over the distribution.
+    """
+    return (hardware_at(np.arange(num_nodes), heterogeneity, seed, node_overrides),
+            links_at(np.arange(num_edges), heterogeneity, seed))
+
+
+class ResourceLimiter:
+    """Enforce hardware profiles on local worker processes (cgroup v2) or containers (docker update),
+    and link models with tc netem."""
+
+    @staticmethod
+    def cpu_quota(node):
+        # cgroup cpu.max is "<quota> <period>" in microseconds
+        period = 100_000
+        cores = node["cpu_cores"] * min(node["cpu_ghz"] / REFERENCE_GHZ, 1.0)
+        return f"{max(int(cores * period), 1000)} {period}"
+
+    @staticmethod
+    def enable_controllers(path):
+        """Enable the cpu and memory controllers for the children of path and of its parents.
+
+        cpu.max and memory.max only exist in a cgroup whose parent lists the controllers in its
+        cgroup.subtree_control.
+        """
+        parent = os.path.dirname(path)
+        if os.path.exists(os.path.join(parent, "cgroup.subtree_control")) and parent != os.path.dirname(parent):
+            ResourceLimiter.enable_controllers(parent)
+        with open(os.path.join(path, "cgroup.subtree_control")) as f:
+            enabled = f.read().split()
+        if "cpu" not in enabled or "memory" not in enabled:
+            with open(os.path.join(path, "cgroup.subtree_control"), "w") as f:
+                f.write("+cpu +memory")
+
+    @staticmethod
+    def apply_cgroup(name, pid, node):
+        path = os.path.join(CGROUP_ROOT, name)
+        try:
+            os.makedirs(path, exist_ok=True)
+            ResourceLimiter.enable_controllers(CGROUP_ROOT)
+            with open(os.path.join(path, "cpu.max"), "w") as f:
+                f.write(ResourceLimiter.cpu_quota(node))
+            with open(os.path.join(path, "memory.max"), "w") as f:
+                f.write(str(node["memory_mb"] * 1024 * 1024))
+            with open(os.path.join(path, "cgroup.procs"), "w") as f:
+                f.write(str(pid))
+            return None
+        except OSError as e:
+            return f"cgroup limits for {name} (pid {pid}) not applied: {e}"
+
+    @staticmethod
+    def docker_update_command(container, node):
+        cpus = node["cpu_cores"] * min(node["cpu_ghz"] / REFERENCE_GHZ, 1.0)
+        memory = f"{node['memory_mb']}m"
+        return ["docker", "update", "--cpus", f"{cpus:.2f}", "--memory", memory,
+                "--memory-swap", memory, container]
+
+    @staticmethod
+    def netem_commands(interface, link, peers=None):
+        """tc commands shaping egress of one interface.
+
+        Without peers the whole interface gets one link model; with peers ({ip: link}) every
+        destination gets its own htb class with a netem child.
+        """
+        if not peers:
+            return [["tc", "qdisc", "replace", "dev", interface, "root", "netem",
+                     "delay", f"{link['latency_ms']}ms", "rate", f"{link['bandwidth_mbit']}mbit"]]
+        commands = [["tc", "qdisc", "replace", "dev", interface, "root", "handle", "1:", "htb"]]
+        for i, (ip, peer_link) in enumerate(peers.items(), start=1):
+            classid = f"1:{i}"
+            commands.append(["tc", "class", "replace", "dev", interface, "parent", "1:", "classid", classid,
+                             "htb", "rate", f"{peer_link['bandwidth_mbit']}mbit"])
+            commands.append(["tc", "qdisc", "replace", "dev", interface, "parent", classid, "handle", f"{i + 1}0:",
+                             "netem", "delay", f"{peer_link['latency_ms']}ms"])
+            commands.append(["tc", "filter", "replace", "dev", interface, "protocol", "ip", "parent", "1:",
+                             "prio", "1", "u32", "match", "ip", "dst", f"{ip}/32", "flowid", classid])
+        return commands
+
+    @staticmethod
+    def _run(command, prefix=None):
+        try:
+            result = subprocess.run((prefix or []) + command, capture_output=True, text=True, timeout=10)
+        except FileNotFoundError as e:
+            return f"{command[0]} not available: {e}"
+        except Exception as e:
+            return str(e)
+        if result.returncode != 0:
+            return f"{' '.join(command[:3])} failed: {result.stderr.strip()}"
+        return None
+
+    @staticmethod
+    def node_links(topology, node_id):
+        """Link model of the first link attached to a node, used as its egress shaping."""
+        for (u, v), link in zip(topology["edges"], topology["links"]):
+            if node_id in (u, v):
+                return link
+        return None
+
+    @staticmethod
+    def apply_topology(topology, interface="eth0"):
+        """Apply limits to every node bound to a "container" or "pid"; returns (applied, errors)."""
+        applied, errors = [], []
+        for node in topology["nodes"]:
+            container, pid = node.get("container"), node.get("pid")
+            if not container and not pid:
+                continue
+            name = container or f"node-{node['id']}"
+            if container:
+                error = ResourceLimiter._run(ResourceLimiter.docker_update_command(container, node))
+                # Shape inside the container's network namespace
+                prefix = ["docker", "exec", container]
+            else:
+                error = ResourceLimiter.apply_cgroup(name, pid, node)
+                prefix = ["nsenter", "-t", str(pid), "-n"]
+            if error:
+                errors.append(error)
+                continue
+            link = ResourceLimiter.node_links(topology, node["id"])
+            if link:
+                peers = node.get("peers")
+                for command in ResourceLimiter.netem_commands(node.get("interface", interface), link, peers):
+                    error = ResourceLimiter._run(command, prefix)
+                    if error:
+                        errors.append(f"{name}: {error}")
+                        break
+            applied.append(name)
+        return applied, errors
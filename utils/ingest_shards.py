@@ -0,0 +1,100 @@
+import threading
+import time
+
+import numpy as np
+
+from utils.clock_sync import local_clock
+from utils.payloads import decode_results
+
+# One decoded result: receive time on this host and event time on the sink's clock (ms), and
+# the shard-local id of its (query, sink, clock source)
+SHARD_DTYPE = np.dtype([("received_ms", "f8"), ("event_ms", "f8"), ("series", "u2")])
+
+
+def shard_topics(topics, shard, shards, group=None):
+    """Subscriptions of one shard: every topic through a shared subscription when group is set,
+    otherwise its round-robin share of the topics."""
+    if group:
+        return [f"$share/{group}/{topic}" for topic in topics]
+    return topics[shard::shards]
+
+
+def run_shard(conn, shard, broker, port, topics, query_field, source_field, flush_s=0.05):
+    """Subscriber process: decode results (JSON, MessagePack or Arrow, see utils/payloads.py) and
+    send them to the parent over conn in batches.
+
+    Every flush_s a ("batch", shard, new names, records, watermark, counts) message is sent, even
+    when empty. The watermark promises that no later batch holds a result received before it.
+    """
+    import paho.mqtt.client as mqtt
+
+    names = {}
+    new_names = {}
+    # Single results as tuples, batched binary payloads as SHARD_DTYPE arrays
+    rows = []
+    chunks = []
+    counts = {"messages": 0, "results": 0, "bytes": 0, "errors": 0}
+    lock = threading.Lock()
+    in_flight = [None]
+
+    def on_message(client, userdata, msg):
+        with lock:
+            received = local_clock.now_ms()
+            in_flight[0] = received
+        try:
+            groups = decode_results(msg.payload, msg.topic, query_field, source_field)
+            error = 0
+        except Exception:
+            groups, error = [], 1
+        with lock:
+            counts["messages"] += 1
+            counts["bytes"] += len(msg.payload)
+            counts["errors"] += error
+            for query, sink, event_ms in groups:
+                key = (query, sink, sink or msg.topic)
+                local = names.get(key)
+                if local is None:
+                    local = names[key] = len(names)
+                    new_names[local] = key
+                counts["results"] += len(event_ms)
+                if len(event_ms) == 1:
+                    rows.append((received, float(event_ms[0]), local))
+                else:
+                    chunk = np.empty(len(event_ms), dtype=SHARD_DTYPE)
+                    chunk["received_ms"] = received
+                    chunk["event_ms"] = event_ms
+                    chunk["series"] = local
+                    chunks.append(chunk)
+            in_flight[0] = None
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            # More shards than topics leaves some without any
+            if topics:
+                client.subscribe([(topic, 0) for topic in topics])
+        else:
+            print(f"Ingest shard {shard}: connection failed with code {rc}")
+
+    client = mqtt.Client()
+    client.on_message = on_message
+    client.on_connect = on_connect
+    client.connect_async(broker, port, 60)
+    client.loop_start()
+
+    while True:
+        time.sleep(flush_s)
+        with lock:
+            batch, rows[:] = [np.array(rows, dtype=SHARD_DTYPE)] + chunks, []
+            chunks.clear()
+            names_sent = dict(new_names)
+            new_names.clear()
+            sent_counts = dict(counts)
+            counts.update(messages=0, results=0, bytes=0, errors=0)
+            watermark = in_flight[0] if in_flight[0] is not None else local_clock.now_ms()
+        records = np.concatenate(batch)
+        try:
+            conn.send(("batch", shard, names_sent, records.tobytes(), watermark, sent_counts))
+        except (BrokenPipeError, EOFError, OSError):
+            # The parent is gone
+            client.loop_stop()
+            return
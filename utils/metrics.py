@@ -0,0 +1,241 @@
+import bisect
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; the hot paths we care about take microseconds to a few hundred milliseconds
+DURATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Counter:
+    """A monotonically increasing count, or one read from fn whenever metrics are collected."""
+
+    def __init__(self, name, help, labels=None, fn=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.value = 0
+        self.fn = fn
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        value = self.fn() if self.fn is not None else self.value
+        return {"name": self.name, "type": "counter", "help": self.help, "labels": self.labels, "value": value}
+
+
+class Gauge:
+    """A value that is set, or read from fn whenever metrics are collected."""
+
+    def __init__(self, name, help, labels=None, fn=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.value = 0
+        self.fn = fn
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        value = self.fn() if self.fn is not None else self.value
+        return {"name": self.name, "type": "gauge", "help": self.help, "labels": self.labels, "value": value}
+
+
+class Histogram:
+    def __init__(self, name, help, labels=None, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf overflow, cumulated only when collected
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        return {"name": self.name, "type": "histogram", "help": self.help, "labels": self.labels,
+                "buckets": list(self.buckets), "counts": counts, "sum": total, "count": sum(counts)}
+
+
+class MetricsRegistry:
+    """Metrics of this process, keyed by name and label values."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(name, help, labels, **kwargs)
+        return metric
+
+    def counter(self, name, help, labels=None, fn=None):
+        return self._get(Counter, name, help, labels, fn=fn)
+
+    def gauge(self, name, help, labels=None, fn=None):
+        return self._get(Gauge, name, help, labels, fn=fn)
+
+    def histogram(self, name, help, labels=None, buckets=DURATION_BUCKETS):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return [metric.snapshot() for metric in metrics]
+
+
+registry = MetricsRegistry()
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def render_prometheus(sources):
+    """Prometheus text exposition format for (extra labels, snapshot) pairs.
+
+    Samples of one metric are grouped under a single HELP/TYPE header whichever process
+    they come from.
+    """
+    lines = []
+    described = set()
+    metrics = [(metric, extra_labels) for extra_labels, snapshot in sources for metric in snapshot]
+    for metric, extra_labels in sorted(metrics, key=lambda item: item[0]["name"]):
+        name = metric["name"]
+        labels = {**(extra_labels or {}), **metric["labels"]}
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+        if metric["type"] != "histogram":
+            lines.append(f"{name}{_label_text(labels)} {metric['value']}")
+            continue
+        cumulative = 0
+        for bound, count in zip(metric["buckets"] + ["+Inf"], metric["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_label_text({**labels, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum{_label_text(labels)} {metric['sum']}")
+        lines.append(f"{name}_count{_label_text(labels)} {metric['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_quantile(metric, q):
+    """Quantile estimate from histogram buckets, interpolated like Prometheus does."""
+    total = metric["count"]
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    lower = 0.0
+    for bound, count in zip(metric["buckets"], metric["counts"]):
+        if cumulative + count >= rank:
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound
+    # In the +Inf bucket, the largest finite bound is the best we can say
+    return metric["buckets"][-1]
+
+
+def process_metrics(registry):
+    """CPU time and memory of this process, to show what the tool itself costs."""
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def resident_bytes():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * page_size
+        except OSError:
+            # ru_maxrss is the peak, in KiB on Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    registry.counter("process_cpu_seconds_total", "CPU time used by this process", fn=time.process_time)
+    registry.gauge("process_resident_memory_bytes", "Resident memory of this process", fn=resident_bytes)
+    registry.gauge("process_threads", "Threads in this process", fn=threading.active_count)
+
+
+def count_subprocesses(registry):
+    """Count every subprocess started by this process, per executable, with an audit hook."""
+    def hook(event, args):
+        if event == "subprocess.Popen":
+            executable, command = args[0], args[1]
+            if not executable:
+                executable = command.split()[0] if isinstance(command, str) else command[0]
+            registry.counter("subprocess_spawns_total", "Subprocesses started",
+                             {"command": os.path.basename(os.fsdecode(executable))}).inc()
+    sys.addaudithook(hook)
+
+
+def instrument_dash(app, registry):
+    """Duration and response size of every Dash callback request, labelled by callback name."""
+    from flask import g, request
+
+    server = app.server
+
+    @server.before_request
+    def start_timer():
+        if request.path.endswith("/_dash-update-component"):
+            g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        body = request.get_json(silent=True) or {}
+        callback = app.callback_map.get(body.get("output"), {}).get("callback")
+        name = getattr(callback, "__name__", "unknown")
+        labels = {"callback": name}
+        registry.histogram("dash_callback_duration_seconds", "Server-side Dash callback time",
+                           labels).observe(time.perf_counter() - start)
+        if not response.direct_passthrough:
+            registry.histogram("dash_callback_response_bytes", "Dash callback response size (figures included)",
+                               labels, SIZE_BUCKETS).observe(response.calculate_content_length() or 0)
+        return response
+
+
+def register_metrics_endpoint(server, registry, sources=(), route="/metrics"):
+    """Serve the registry in Prometheus format.
+
+    sources are (labels, fn) pairs returning snapshots of other processes, such as the ingester.
+    """
+    from flask import Response
+
+    @server.route(route)
+    def metrics():
+        collected = [({"process": "web", "pid": os.getpid()}, registry.snapshot())]
+        collected += [(labels, fn() or []) for labels, fn in sources]
+        return Response(render_prometheus(collected), mimetype="text/plain; version=0.0.4")
+    return metrics
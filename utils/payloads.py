@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+
+TIMESTAMP_FIELD = "bid$timestamp"
+# An Arrow IPC stream starts with a continuation marker, an Arrow IPC file with its magic
+ARROW_STREAM_MARKER = b"\xff\xff\xff\xff"
+ARROW_FILE_MAGIC = b"ARROW1"
+# Milliseconds per unit of an Arrow timestamp column
+_ARROW_UNIT_MS = {"s": 1e3, "ms": 1.0, "us": 1e-3, "ns": 1e-6}
+
+
+def detect_format(payload):
+    """"json", "arrow" or "msgpack", from the first bytes of an MQTT payload.
+
+    JSON results start with "{" or "[" (after whitespace); anything else that is not an Arrow
+    stream or file is taken to be MessagePack, whose arrays and maps never start with those.
+    """
+    if payload.startswith(ARROW_STREAM_MARKER) or payload.startswith(ARROW_FILE_MAGIC):
+        return "arrow"
+    if payload[:64].lstrip()[:1] in (b"{", b"["):
+        return "json"
+    return "msgpack"
+
+
+def decode_results(payload, topic, query_field="query", source_field="source"):
+    """Results of one MQTT message as [(query, sink, event times in ms as a float64 array)].
+
+    A message holds one JSON result, a JSON or MessagePack array of results, a MessagePack map
+    of columns, or Arrow IPC record batches. Results are grouped by query and sink; the query
+    falls back to the topic and the sink to None when the fields are absent.
+    """
+    kind = detect_format(payload)
+    if kind == "arrow":
+        return _decode_arrow(payload, topic, query_field, source_field)
+    if kind == "json":
+        data = json.loads(payload)
+    else:
+        try:
+            import msgpack
+        except ImportError:
+            raise ValueError("MessagePack payload received but msgpack is not installed")
+        data = msgpack.unpackb(payload)
+    if isinstance(data, dict) and isinstance(data.get(TIMESTAMP_FIELD), list):
+        return _group(np.asarray(data[TIMESTAMP_FIELD], dtype=float),
+                      data.get(query_field, topic), data.get(source_field))
+    if isinstance(data, dict):
+        return [(data.get(query_field, topic), data.get(source_field),
+                 np.array([float(data[TIMESTAMP_FIELD])]))]
+    event_ms = np.fromiter((row[TIMESTAMP_FIELD] for row in data), dtype=float, count=len(data))
+    return _group(event_ms, [row.get(query_field, topic) for row in data],
+                  [row.get(source_field) for row in data])
+
+
+def _decode_arrow(payload, topic, query_field, source_field):
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError:
+        raise ValueError("Arrow payload received but pyarrow is not installed")
+    if payload.startswith(ARROW_FILE_MAGIC):
+        table = pa.ipc.open_file(pa.py_buffer(payload)).read_all()
+    else:
+        table = pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+    column = table.column(TIMESTAMP_FIELD)
+    if pa.types.is_timestamp(column.type):
+        scale = _ARROW_UNIT_MS[column.type.unit]
+        event_ms = column.cast(pa.int64()).to_numpy() * scale
+    else:
+        event_ms = column.to_numpy().astype(float, copy=False)
+    names = table.column_names
+    queries = table.column(query_field).to_pylist() if query_field in names else topic
+    sinks = table.column(source_field).to_pylist() if source_field in names else None
+    return _group(event_ms, queries, sinks)
+
+
+def _group(event_ms, queries, sinks):
+    """Split event times by (query, sink); either may be one value for the whole batch"""
+    if not isinstance(queries, list) and not isinstance(sinks, list):
+        return [(queries, sinks, event_ms)] if len(event_ms) else []
+    n = len(event_ms)
+    queries = queries if isinstance(queries, list) else [queries] * n
+    sinks = sinks if isinstance(sinks, list) else [sinks] * n
+    keys = {}
+    labels = np.fromiter((keys.setdefault(key, len(keys)) for key in zip(queries, sinks)), dtype=np.int64, count=n)
+    if len(keys) == 1:
+        return [(*next(iter(keys)), event_ms)]
+    return [(query, sink, event_ms[labels == label]) for (query, sink), label in keys.items()]
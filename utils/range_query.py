@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import numpy as np
+
+
+class SampleRing:
+    """The last capacity (time, value) samples of a series, appended in time order.
+
+    Kept as two numpy arrays so a time window is found with a binary search on each of the
+    ring's two contiguous halves instead of a scan. dtype of the values can be narrowed (e.g.
+    "f4") for metrics that do not need double precision.
+    """
+
+    def __init__(self, capacity, dtype="f8"):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity)
+        self.values = np.zeros(capacity, dtype=dtype)
+        self.count = 0
+
+    def append(self, ts, value):
+        i = self.count % self.capacity
+        self.ts[i] = ts
+        self.values[i] = value
+        self.count += 1
+
+    def extend(self, ts, values):
+        """Many samples at once, numpy arrays in time order"""
+        ts, values = ts[-self.capacity:], values[-self.capacity:]
+        positions = (self.count + np.arange(len(ts))) % self.capacity
+        self.ts[positions] = ts
+        self.values[positions] = values
+        self.count += len(ts)
+
+    def _segments(self):
+        # Oldest first: the part after the write position, then the part before it
+        count, i = self.count, self.count % self.capacity
+        if count <= self.capacity:
+            return [slice(0, count)]
+        return [slice(i, self.capacity), slice(0, i)]
+
+    def oldest(self):
+        if not self.count:
+            return None
+        return float(self.ts[self._segments()[0].start])
+
+    def window(self, start, end):
+        """(times, values) of the samples within [start, end], copied"""
+        ts_parts, value_parts = [], []
+        for segment in self._segments():
+            ts = self.ts[segment]
+            lo, hi = np.searchsorted(ts, start, "left"), np.searchsorted(ts, end, "right")
+            ts_parts.append(ts[lo:hi])
+            value_parts.append(self.values[segment][lo:hi])
+        return np.concatenate(ts_parts), np.concatenate(value_parts)
+
+
+def parse_relayout_range(relayout_data, axis="xaxis", dates=True):
+    """The x range a graph was zoomed to, in epoch seconds for a date axis, as sent otherwise.
+
+    Returns (start, end) for a zoom or pan, False when the axis went back to autorange and
+    None for relayouts that do not touch the axis (legend clicks, resizes...).
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get(f"{axis}.autorange"):
+        return False
+    bounds = relayout_data.get(f"{axis}.range")
+    if bounds is None:
+        bounds = (relayout_data.get(f"{axis}.range[0]"), relayout_data.get(f"{axis}.range[1]"))
+    if bounds[0] is None or bounds[1] is None:
+        return None
+    start, end = (to_epoch(value) if dates else value for value in bounds)
+    return min(start, end), max(start, end)
+
+
+def to_epoch(value):
+    """Epoch seconds of a Plotly date axis value ("2024-05-01 12:00:03.25") or a number"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def decimate_minmax(x, y, max_points):
+    """At most max_points points that keep the shape of a long series.
+
+    The samples are cut into max_points / 2 equal-count bins and each bin keeps its minimum and
+    maximum in time order, so spikes survive where plain subsampling would drop them.
+    """
+    n = len(x)
+    if n <= max_points:
+        return x, y
+    bins = max(max_points // 2, 1)
+    edges = np.linspace(0, n, bins + 1).astype(int)
+    starts = edges[:-1]
+    lo = np.minimum.reduceat(y, starts)
+    hi = np.maximum.reduceat(y, starts)
+    # Positions of the min and max inside each bin
+    bin_of = np.repeat(np.arange(bins), np.diff(edges))
+    lo_at = _arg_in_bins(y, bin_of, lo)
+    hi_at = _arg_in_bins(y, bin_of, hi)
+    keep = np.unique(np.concatenate([lo_at, hi_at]))
+    return x[keep], y[keep]
+
+
+def _arg_in_bins(y, bin_of, per_bin):
+    """First index in each bin whose value equals that bin's entry of per_bin"""
+    hits = np.flatnonzero(y == per_bin[bin_of])
+    first = np.unique(bin_of[hits], return_index=True)[1]
+    return hits[first]
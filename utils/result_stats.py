@@ -0,0 +1,155 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (50, 90, 95, 99)
+STATS_SUFFIX = ".stats.json"
+STATS_VERSION = 2
+
+
+def column_stats(df):
+    """count/mean/std/min/max/percentiles for every numeric column in one pass over a 2D array."""
+    numeric = df.apply(pd.to_numeric, errors="coerce")
+    numeric = numeric.loc[:, numeric.notna().any()]
+    if numeric.empty:
+        return {}
+    values = numeric.to_numpy(dtype=np.float64)
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+    stats = {
+        "count": counts,
+        "mean": np.nanmean(values, axis=0),
+        "std": np.nanstd(values, axis=0, ddof=1) if len(values) > 1 else np.zeros(values.shape[1]),
+        "min": np.nanmin(values, axis=0),
+        "max": np.nanmax(values, axis=0),
+    }
+    pcts = np.nanpercentile(values, PERCENTILES, axis=0)
+    for i, p in enumerate(PERCENTILES):
+        stats[f"p{p}"] = pcts[i]
+
+    result = {}
+    for j, column in enumerate(numeric.columns):
+        result[str(column)] = {key: _to_float(arr[j]) for key, arr in stats.items()}
+        result[str(column)]["count"] = int(counts[j])
+    return result
+
+
+def to_seconds(series):
+    """Convert a time column (datetimes, or epoch numbers in s/ms) to float seconds."""
+    if pd.api.types.is_numeric_dtype(series):
+        seconds = series.to_numpy(dtype=np.float64)
+        finite = seconds[np.isfinite(seconds)]
+        # Epoch milliseconds are what the stream system's sinks emit
+        if len(finite) and np.nanmedian(finite) > 1e11:
+            seconds = seconds / 1000.0
+        return seconds
+    parsed = pd.to_datetime(series, errors="coerce")
+    missing = parsed.isna().to_numpy()
+    if missing.all():
+        return None
+    # NaT is int64 min once converted, it has to become NaN rather than a time in year 1677
+    seconds = parsed.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+    seconds[missing] = np.nan
+    return seconds
+
+
+def throughput_windows(seconds, window=1.0, max_windows=100_000):
+    """Events per time window, bucketed with a single bincount."""
+    seconds = seconds[np.isfinite(seconds)]
+    if len(seconds) == 0:
+        return None
+    start = float(seconds.min())
+    # Widen the window rather than allocate millions of buckets for a long or odd time axis
+    window = max(window, (float(seconds.max()) - start) / max_windows)
+    buckets = ((seconds - start) // window).astype(np.int64)
+    counts = np.bincount(buckets)
+    rates = counts / window
+    return {
+        "window": window,
+        "start": start,
+        "counts": counts.tolist(),
+        "mean_rate": _to_float(rates.mean()),
+        "peak_rate": _to_float(rates.max()),
+    }
+
+
+def latency_histogram(values, bins=50):
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+    counts, edges = np.histogram(values, bins=bins)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def summarize_frame(df, time_column=None, latency_column=None, window=1.0, bins=50):
+    """Summary of a result frame: column stats, throughput over windows and a latency histogram.
+
+    By the same convention as the plots, the first column is taken as time and the second as
+    the measured latency unless given explicitly.
+    """
+    summary = {"rows": int(len(df)), "columns": column_stats(df), "throughput": None, "histogram": None}
+    if len(df.columns) == 0:
+        return summary
+
+    time_column = time_column or df.columns[0]
+    seconds = to_seconds(df[time_column])
+    if seconds is not None:
+        summary["throughput"] = throughput_windows(seconds, window)
+
+    if latency_column is None and len(df.columns) > 1:
+        latency_column = df.columns[1]
+    if latency_column is not None:
+        latency = pd.to_numeric(df[latency_column], errors="coerce").to_numpy(dtype=np.float64)
+        summary["histogram"] = latency_histogram(latency, bins)
+        summary["latency_column"] = str(latency_column)
+    summary["time_column"] = str(time_column)
+    return summary
+
+
+def stats_path(path):
+    return path + STATS_SUFFIX
+
+
+def load_or_compute(path, window=1.0, bins=50):
+    """Return the summary for a result file, using the cached JSON next to it when still valid."""
+    st = os.stat(path)
+    key = {"version": STATS_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+           "window": window, "bins": bins}
+    cache_file = stats_path(path)
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return cached["summary"]
+    except (OSError, ValueError):
+        pass
+
+    summary = summarize_frame(pd.read_csv(path), window=window, bins=bins)
+    tmp_file = cache_file + ".tmp"
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump({"key": key, "summary": summary}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[WARN] Could not cache stats for {path}: {e}")
+    return summary
+
+
+def summary_metrics(summary):
+    """Flatten the headline numbers of a summary for the run catalog."""
+    metrics = {"rows": summary["rows"]}
+    latency_column = summary.get("latency_column")
+    if latency_column and latency_column in summary["columns"]:
+        latency = summary["columns"][latency_column]
+        for key in ("mean", "min", "max") + tuple(f"p{p}" for p in PERCENTILES):
+            metrics[f"latency_{key}"] = latency[key]
+    if summary["throughput"]:
+        metrics["throughput_mean"] = summary["throughput"]["mean_rate"]
+        metrics["throughput_peak"] = summary["throughput"]["peak_rate"]
+    return metrics
+
+
+def _to_float(value):
+    value = float(value)
+    return None if np.isnan(value) else value
@@ -0,0 +1,250 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+from utils.run_catalog import run_catalog
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal ctypes binding for watching a single directory on Linux."""
+
+    def __init__(self, directory, mask=WATCH_MASK):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify not supported on this platform")
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read_events(self, timeout=None):
+        """Block until events arrive and return a list of (mask, name) tuples."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + name_len].rstrip(b"\0").decode(errors="replace")
+            pos += name_len
+            events.append((mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ResultsIndex:
+    """In-memory index of result CSVs, kept current by inotify or by polling.
+
+    on_members(names) is called with the sorted file names whenever files are added or removed,
+    e.g. to push the new list to the browsers.
+    """
+
+    def __init__(self, directory="results", catalog=None, poll_interval=2.0, settle_delay=0.2, on_members=None):
+        self.directory = directory
+        self.catalog = catalog
+        self.on_members = on_members
+        self.poll_interval = poll_interval
+        self.settle_delay = settle_delay
+        # version changes with any file, members_version only when files are added or removed
+        self.version = 0
+        self.members_version = 0
+        self.mode = None
+        self._entries = {}
+        self._sorted_names = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._scan()
+        self._thread.start()
+
+    def names(self):
+        self.start()
+        with self._lock:
+            if self._sorted_names is None:
+                self._sorted_names = sorted(self._entries)
+            return self._sorted_names
+
+    def get(self, name):
+        """Return a metadata dict for one run, counting rows lazily."""
+        self.start()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            entry = dict(entry)
+        if entry['rows_offset'] < entry['size']:
+            self._count_rows(name, entry)
+        if entry['params'] is None and self.catalog is not None:
+            run = self.catalog.run_for_path(entry['path'])
+            if run is not None:
+                entry['params'] = run['params']
+                with self._lock:
+                    if name in self._entries:
+                        self._entries[name]['params'] = run['params']
+        return {
+            'name': name,
+            'path': entry['path'],
+            'size': entry['size'],
+            'mtime': entry['mtime'],
+            'rows': max(entry['lines'] - 1, 0),
+            'params': entry['params'],
+        }
+
+    def _count_rows(self, name, entry):
+        try:
+            with open(entry['path'], "rb") as f:
+                f.seek(entry['rows_offset'])
+                data = f.read(entry['size'] - entry['rows_offset'])
+        except OSError:
+            return
+        entry['lines'] += data.count(b"\n")
+        entry['rows_offset'] += len(data)
+        with self._lock:
+            current = self._entries.get(name)
+            if current is not None and current['size'] >= entry['rows_offset']:
+                current['lines'] = entry['lines']
+                current['rows_offset'] = entry['rows_offset']
+
+    def _is_result(self, name):
+        return name.lower().endswith(".csv")
+
+    def _scan(self):
+        seen = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if self._is_result(item.name) and item.is_file():
+                        seen[item.name] = item.stat()
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            members = set(self._entries) != set(seen)
+            changed = members
+            for name in list(self._entries):
+                if name not in seen:
+                    del self._entries[name]
+            for name, st in seen.items():
+                changed |= self._apply_stat(name, st)
+            if changed:
+                self._bump(members)
+        if members:
+            self._members_changed()
+
+    def _refresh(self, names):
+        with self._lock:
+            changed = members = False
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    if self._entries.pop(name, None) is not None:
+                        changed = members = True
+                    continue
+                members |= name not in self._entries
+                changed |= self._apply_stat(name, st)
+            if changed:
+                self._bump(members)
+        if members:
+            self._members_changed()
+
+    def _apply_stat(self, name, st):
+        entry = self._entries.get(name)
+        if entry is not None and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime:
+            return False
+        if entry is None or st.st_size < entry['rows_offset']:
+            entry = {
+                'path': os.path.join(self.directory, name),
+                'lines': 0,
+                'rows_offset': 0,
+                'params': None,
+            }
+            self._entries[name] = entry
+        entry['size'] = st.st_size
+        entry['mtime'] = st.st_mtime
+        return True
+
+    def _bump(self, members=True):
+        self.version += 1
+        if members:
+            self._sorted_names = None
+            self.members_version += 1
+
+    def _members_changed(self):
+        # Outside the lock, the callback may read the index
+        if self.on_members is None:
+            return
+        try:
+            self.on_members(self.names())
+        except Exception as e:
+            print(f"Results index: member change handler failed ({e})")
+
+    def _watch_loop(self):
+        try:
+            watcher = Inotify(self.directory)
+        except OSError as e:
+            print(f"Results index: inotify unavailable ({e}), polling every {self.poll_interval}s")
+            self.mode = "polling"
+            self._poll_loop()
+            return
+
+        self.mode = "inotify"
+        # Catch anything written between the initial scan and the watch being set up
+        self._scan()
+        try:
+            while True:
+                events = watcher.read_events()
+                # Writers append in bursts, let them settle before touching the index
+                time.sleep(self.settle_delay)
+                events += watcher.read_events(timeout=0)
+                if any(mask & IN_DELETE_SELF for mask, _ in events):
+                    raise OSError("results directory was removed")
+                if any(mask & IN_Q_OVERFLOW for mask, _ in events):
+                    self._scan()
+                    continue
+                self._refresh({name for _, name in events if self._is_result(name)})
+        except OSError as e:
+            print(f"Results index: inotify failed ({e}), falling back to polling")
+            watcher.close()
+            self.mode = "polling"
+            self._poll_loop()
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self._scan()
+
+
+results_index = ResultsIndex(catalog=run_catalog)
@@ -0,0 +1,207 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+# (resolution s, buckets kept): an hour at 1 s, six hours at 10 s and a day at 1 min
+LEVELS = ((1, 3600), (10, 2160), (60, 1440))
+QUANTILES = (0.5, 0.95, 0.99)
+ROLLUP_DTYPE = np.dtype([("start", "f8"), ("series", "u2"), ("count", "u4"), ("min", "f8"), ("max", "f8"),
+                         ("mean", "f8"), ("p50", "f8"), ("p95", "f8"), ("p99", "f8")])
+# Latencies at or below this (ms) share the sketch's lowest bin, min still reports them exactly
+MIN_VALUE = 1e-3
+
+
+class LogSketch:
+    """Quantile sketch with log-spaced bins (DDSketch).
+
+    A value x falls in bin ceil(log_gamma(x)); every quantile estimate is within
+    relative_accuracy of a value actually seen, in memory that grows with the log of the
+    value range rather than the sample count.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.count = 0
+
+    def key(self, value):
+        return math.ceil(math.log(max(value, MIN_VALUE)) / self.log_gamma)
+
+    def add_key(self, key):
+        self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+
+    def add_keys(self, keys):
+        for key, count in zip(*(a.tolist() for a in np.unique(keys, return_counts=True))):
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += len(keys)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        cumulative = 0
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                # Midpoint of the bin (gamma^(key-1), gamma^key] in the relative sense
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+class RollupLevel:
+    """The open bucket and the last capacity closed buckets of one resolution"""
+
+    def __init__(self, resolution, capacity, relative_accuracy):
+        self.resolution = resolution
+        self.relative_accuracy = relative_accuracy
+        self.closed = deque(maxlen=capacity)
+        self.start = None
+        # Start of the newest closed bucket, and samples dropped for arriving after it closed
+        self.last_start = None
+        self.late = 0
+
+    def _open(self, start):
+        self.start = start
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.sketch = LogSketch(self.relative_accuracy)
+
+    def _is_late(self, start, count):
+        # A flushed bucket has already been handed to on_close; reopening it would give readers
+        # a second record with the same start, so its stragglers are dropped
+        if self.start is None and self.last_start is not None and start <= self.last_start:
+            self.late += count
+            return True
+        return False
+
+    def _advance(self, start):
+        # A sample slightly older than the open bucket (e.g. from another ingest shard) joins it
+        if self.start is not None and start <= self.start:
+            return None
+        closed = self.close()
+        self._open(start)
+        return closed
+
+    def add(self, ts, value, key):
+        """Returns the bucket this sample closed, if any"""
+        start = ts - ts % self.resolution
+        if self._is_late(start, 1):
+            return None
+        closed = self._advance(start)
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add_key(key)
+        return closed
+
+    def add_many(self, start, values, keys):
+        """Samples of one bucket at once, numpy arrays"""
+        if self._is_late(start, len(values)):
+            return None
+        closed = self._advance(start)
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.add_keys(keys)
+        return closed
+
+    def close(self):
+        if self.start is None or not self.count:
+            return None
+        # Sketch estimates are clamped to what was actually seen
+        quantiles = [min(max(self.sketch.quantile(q), self.min), self.max) for q in QUANTILES]
+        record = (self.start, self.count, self.min, self.max, self.sum / self.count, *quantiles)
+        self.closed.append(record)
+        self.last_start = self.start
+        self.start = None
+        return record
+
+
+class RollupStore:
+    """1 s / 10 s / 1 min rollups of one series, maintained as samples arrive.
+
+    Every bucket keeps count, min, max, mean and sketch percentiles; memory is bounded by the
+    number of buckets kept per level, whatever the length of the experiment. on_close(resolution,
+    record) is called with every bucket as it closes, e.g. to copy it to a shared store.
+    """
+
+    def __init__(self, series=0, levels=LEVELS, relative_accuracy=0.01, on_close=None):
+        self.series = series
+        self.levels = [RollupLevel(resolution, capacity, relative_accuracy) for resolution, capacity in levels]
+        self.on_close = on_close
+        sketch = LogSketch(relative_accuracy)
+        self._key = sketch.key
+        self._log_gamma = sketch.log_gamma
+        # Samples come from the ingest thread, flushes from readers or a timer
+        self._lock = threading.Lock()
+
+    def add(self, ts, value):
+        key = self._key(value)
+        with self._lock:
+            for level in self.levels:
+                closed = level.add(ts, value, key)
+                if closed is not None and self.on_close is not None:
+                    self.on_close(level.resolution, self._record(closed))
+
+    def add_batch(self, ts, values):
+        """Samples in time order as numpy arrays, aggregated per bucket with numpy"""
+        if not len(ts):
+            return
+        keys = np.ceil(np.log(np.maximum(values, MIN_VALUE)) / self._log_gamma).astype(np.int64)
+        with self._lock:
+            for level in self.levels:
+                starts = ts - ts % level.resolution
+                # Each bucket is one contiguous run of the batch
+                bounds = (np.flatnonzero(np.diff(starts)) + 1).tolist()
+                for lo, hi in zip([0] + bounds, bounds + [len(ts)]):
+                    closed = level.add_many(float(starts[lo]), values[lo:hi], keys[lo:hi])
+                    if closed is not None and self.on_close is not None:
+                        self.on_close(level.resolution, self._record(closed))
+
+    def flush(self, now):
+        """Close buckets whose time has passed, for when samples stop arriving.
+
+        now is in epoch seconds on the clock the samples are stamped with.
+        """
+        with self._lock:
+            for level in self.levels:
+                if level.start is not None and level.start + level.resolution <= now:
+                    closed = level.close()
+                    if closed is not None and self.on_close is not None:
+                        self.on_close(level.resolution, self._record(closed))
+
+    def _record(self, closed):
+        return (closed[0], self.series) + closed[1:]
+
+    def records(self, resolution, start=None, end=None):
+        """Closed buckets of one resolution as a ROLLUP_DTYPE array, optionally within [start, end]"""
+        level = next(level for level in self.levels if level.resolution == resolution)
+        with self._lock:
+            rows = [self._record(closed) for closed in level.closed]
+        return select_window(np.array(rows, dtype=ROLLUP_DTYPE), start, end)
+
+
+def select_window(records, start=None, end=None):
+    if start is not None:
+        records = records[records["start"] >= start]
+    if end is not None:
+        records = records[records["start"] <= end]
+    return records
+
+
+def pick_resolution(span_s, max_points, levels=LEVELS):
+    """The finest rollup resolution that shows span_s seconds in at most max_points buckets"""
+    for resolution, _ in levels:
+        if span_s / resolution <= max_points:
+            return resolution
+    return levels[-1][0]
@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+CATALOG_PATH = os.path.join("results", "catalog.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_set TEXT,
+    query TEXT,
+    heterogeneity TEXT,
+    topology TEXT,
+    nodes INTEGER,
+    params TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'running',
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    data_path TEXT UNIQUE,
+    metrics TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_runs_topology_nodes ON runs (topology, nodes);
+CREATE INDEX IF NOT EXISTS idx_runs_query ON runs (query, data_set);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs (started_at);
+"""
+
+PARAM_COLUMNS = ("data_set", "query", "heterogeneity", "topology", "nodes")
+
+
+class RunCatalog:
+    """SQLite catalog of experiment runs: parameters, timing, metrics and data file."""
+
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # WAL lets the UI read while a benchmark process is writing
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def begin_run(self, params, results_dir="results"):
+        """Atomically allocate a run ID and its data file path, returns (run_id, data_path)."""
+        conn = self._connect()
+        started_at = datetime.now()
+        values = [params.get(column) for column in PARAM_COLUMNS]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO runs (data_set, query, heterogeneity, topology, nodes, params, started_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                values + [json.dumps(params, default=str), started_at.isoformat()],
+            )
+            run_id = cursor.lastrowid
+            timestamp = started_at.strftime("%d-%m-%y_%H_%M")
+            data_path = os.path.join(results_dir, f"experiment_results_{timestamp}_run{run_id}.csv")
+            conn.execute("UPDATE runs SET data_path = ? WHERE id = ?", (data_path, run_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return run_id, data_path
+
+    def finish_run(self, run_id, status="completed", metrics=None):
+        conn = self._connect()
+        conn.execute(
+            "UPDATE runs SET status = ?, finished_at = ? WHERE id = ?",
+            (status, datetime.now().isoformat(), run_id),
+        )
+        if metrics:
+            self.update_metrics(run_id, metrics)
+
+    def update_metrics(self, run_id, metrics):
+        """Merge metrics into the run's stored summary."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT metrics FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return
+            merged = json.loads(row["metrics"])
+            merged.update(metrics)
+            conn.execute("UPDATE runs SET metrics = ? WHERE id = ?",
+                         (json.dumps(merged, default=str), run_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_run(self, run_id):
+        row = self._connect().execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._to_dict(row)
+
+    def run_for_path(self, data_path):
+        if not os.path.exists(self.path):
+            return None
+        row = self._connect().execute("SELECT * FROM runs WHERE data_path = ?", (data_path,)).fetchone()
+        return self._to_dict(row)
+
+    def find_runs(self, status=None, limit=None, **filters):
+        """Query runs by parameter columns, e.g. find_runs(topology="mesh", nodes=32)."""
+        clauses = []
+        values = []
+        for column, value in filters.items():
+            if column not in PARAM_COLUMNS:
+                raise ValueError(f"Unknown run parameter: {column}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                values.append(value)
+        if status is not None:
+            clauses.append("status = ?")
+            values.append(status)
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        return [self._to_dict(row) for row in self._connect().execute(sql, values)]
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        run = dict(row)
+        run["params"] = json.loads(run["params"])
+        run["metrics"] = json.loads(run["metrics"])
+        return run
+
+
+run_catalog = RunCatalog()
@@ -0,0 +1,153 @@
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PROFILE_PROBS = np.linspace(0.0, 1.0, 101)
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+class RunLoader:
+    """Load one numeric column per result file, cached by (path, size, mtime)."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+
+    def load(self, path, column=None):
+        st = os.stat(path)
+        key = (path, column, st.st_size, st.st_mtime_ns)
+        values = self._cache.get(key)
+        if values is None:
+            values = self._read(path, column)
+            self._cache[key] = values
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return values
+
+    @staticmethod
+    def _read(path, column):
+        if column is None:
+            # Same convention as the plots: the second column is the measured value
+            header = pd.read_csv(path, nrows=0).columns
+            if len(header) < 2:
+                raise ValueError(f"{path} needs at least two columns")
+            column = header[1]
+        series = pd.read_csv(path, usecols=[column], engine="c")[column]
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+        return values[~np.isnan(values)]
+
+
+def _subsample(values, max_samples, rng):
+    if len(values) <= max_samples:
+        return values
+    return values[rng.choice(len(values), size=max_samples, replace=False)]
+
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test with tie correction (normal approximation), returns (U, p)."""
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return float("nan"), float("nan")
+    combined = np.concatenate([a, b])
+    unique, inverse, counts = np.unique(combined, return_inverse=True, return_counts=True)
+    # Average rank of each distinct value, ties share the mean of their positions
+    upper = np.cumsum(counts)
+    avg_rank = upper - (counts - 1) / 2.0
+    rank_sum_a = avg_rank[inverse[:n1]].sum()
+    u1 = rank_sum_a - n1 * (n1 + 1) / 2.0
+
+    n = n1 + n2
+    tie_term = np.sum(counts.astype(np.float64) ** 3 - counts) / (n * (n - 1)) if n > 1 else 0.0
+    sigma = math.sqrt(n1 * n2 / 12.0 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return float(u1), 1.0
+    z = (u1 - n1 * n2 / 2.0) / sigma
+    return float(u1), math.erfc(abs(z) / math.sqrt(2.0))
+
+
+def bootstrap_median_delta(a, b, n_boot=1000, max_samples=5000, confidence=0.95, seed=0, chunk=200):
+    """Bootstrap CI for median(b) - median(a).
+
+    Resamples at most max_samples values per run (m-out-of-n bootstrap) and rescales each
+    run's spread by its own sqrt(m / n), which keeps the cost independent of run size.
+    """
+    rng = np.random.default_rng(seed)
+    point = float(np.median(b) - np.median(a))
+    m_a, m_b = min(len(a), max_samples), min(len(b), max_samples)
+    medians_a, medians_b = np.empty(n_boot), np.empty(n_boot)
+    for start in range(0, n_boot, chunk):
+        stop = min(start + chunk, n_boot)
+        idx_a = rng.integers(0, len(a), size=(stop - start, m_a))
+        idx_b = rng.integers(0, len(b), size=(stop - start, m_b))
+        medians_a[start:stop] = np.median(a[idx_a], axis=1)
+        medians_b[start:stop] = np.median(b[idx_b], axis=1)
+
+    # Each run's deviations shrunk to its full size; a run resampled in full keeps its spread
+    spread = ((medians_b - medians_b.mean()) * math.sqrt(m_b / len(b))
+              - (medians_a - medians_a.mean()) * math.sqrt(m_a / len(a)))
+    tail = (1.0 - confidence) / 2.0
+    low, high = np.quantile(spread, [tail, 1.0 - tail])
+    return point, point + float(low), point + float(high)
+
+
+def quantile_profile(values, probs=PROFILE_PROBS):
+    """Distribution on a common probability grid so runs of different lengths line up."""
+    if len(values) == 0:
+        return np.full(len(probs), np.nan)
+    return np.quantile(values, probs)
+
+
+def compare_runs(baseline_name, runs, threshold=0.05, alpha=0.01, higher_is_better=False,
+                 max_test_samples=200_000, seed=0):
+    """Compare every run in runs (name -> values) against the pinned baseline run.
+
+    A run is flagged as a regression when the median moved in the bad direction by more
+    than threshold (relative), the Mann-Whitney test is significant at alpha, and the
+    bootstrap CI of the median delta excludes zero.
+    """
+    rng = np.random.default_rng(seed)
+    base = runs[baseline_name]
+    base_test = _subsample(base, max_test_samples, rng)
+    base_pcts = np.percentile(base, SUMMARY_PERCENTILES) if len(base) else None
+    sign = -1.0 if higher_is_better else 1.0
+
+    rows = []
+    for name, values in runs.items():
+        row = {"run": name, "samples": int(len(values)), "baseline": name == baseline_name}
+        if len(values) == 0 or len(base) == 0:
+            row["regression"] = False
+            rows.append(row)
+            continue
+        pcts = np.percentile(values, SUMMARY_PERCENTILES)
+        for p, value, base_value in zip(SUMMARY_PERCENTILES, pcts, base_pcts):
+            row[f"p{p}"] = float(value)
+            row[f"p{p}_delta_pct"] = float((value - base_value) / base_value * 100) if base_value else float("nan")
+        row["mean"] = float(values.mean())
+
+        if name == baseline_name:
+            row.update(p_value=float("nan"), median_delta=0.0, ci_low=0.0, ci_high=0.0, regression=False)
+            rows.append(row)
+            continue
+
+        _, p_value = mann_whitney(base_test, _subsample(values, max_test_samples, rng))
+        delta, ci_low, ci_high = bootstrap_median_delta(base, values, seed=seed)
+        base_median = float(np.median(base))
+        relative = sign * delta / base_median if base_median else 0.0
+        ci_excludes_zero = (sign * ci_low > 0) if sign > 0 else (sign * ci_high > 0)
+        row.update(
+            p_value=p_value,
+            median_delta=delta,
+            ci_low=ci_low,
+            ci_high=ci_high,
+            regression=bool(p_value < alpha and relative > threshold and ci_excludes_zero),
+        )
+        rows.append(row)
+    return rows
+
+
+run_loader = RunLoader()
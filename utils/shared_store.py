@@ -0,0 +1,321 @@
+import fcntl
+import json
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.rollup import ROLLUP_DTYPE
+
+# Set by the production entry point, web workers and the ingester attach to this store
+STORE_ENV = "STREAM_UI_SHARED_STORE"
+
+# series is the index of the query/sink series, names are kept in the series slot
+LATENCY_DTYPE = np.dtype([("ts", "f8"), ("latency", "f8"), ("series", "u2")])
+# Long enough for Kubernetes pod names (253), longer names are cut by stats_name
+STATS_DTYPE = np.dtype([("name", "S256"), ("cpu", "f8"), ("memory", "f8"),
+                        ("net_rx", "f8"), ("net_tx", "f8"), ("ts", "f8")])
+TERMINAL_DTYPE = np.dtype([("text", "S256")])
+# key indexes the [source, metric, since] names kept in the extended_keys slot
+EXTENDED_DTYPE = np.dtype([("ts", "f8"), ("key", "u2"), ("value", "f4")])
+
+RINGS = {
+    # About a day of 10 results/s, for zooming into raw samples
+    "latency": (LATENCY_DTYPE, 1 << 20),
+    "stats": (STATS_DTYPE, 16384),
+    "terminal": (TERMINAL_DTYPE, 8192),
+    # Closed rollup buckets of every series, one ring per resolution
+    "rollup_1s": (ROLLUP_DTYPE, 65536),
+    "rollup_10s": (ROLLUP_DTYPE, 16384),
+    "rollup_60s": (ROLLUP_DTYPE, 16384),
+    # Extended /proc and JVM metrics, e.g. 50 metrics at 4 samples/s for about 1.5 hours
+    "extended": (EXTENDED_DTYPE, 1 << 20),
+}
+SLOTS = {
+    "ingest": 64 * 1024,
+    "experiment": 4096,
+    "metrics": 256 * 1024,
+    # Series summaries including up to WINDOW_S per-second throughput buckets each
+    "series": 1024 * 1024,
+    # Latest detected latency anomalies with their correlated containers: MonitoringConfig.MAX_ANOMALIES
+    # (500) events of about 550 bytes with three containers, with room for long container names
+    "anomalies": 1024 * 1024,
+    "extended_keys": 64 * 1024,
+}
+
+
+_truncated_names = set()
+
+
+def stats_name(name):
+    """A container name as stored in STATS_DTYPE records, warning once if it has to be cut"""
+    encoded = name.encode()
+    size = STATS_DTYPE["name"].itemsize
+    if len(encoded) > size and name not in _truncated_names:
+        _truncated_names.add(name)
+        print(f"[WARN] Container name longer than {size} bytes is stored cut short: {name}")
+    return encoded[:size]
+
+
+# tmpfs, so segments never touch the disk
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class _Segment:
+    """A named memory-mapped file in SHM_DIR.
+
+    Used instead of multiprocessing.shared_memory, whose resource tracker unlinks segments
+    when any attaching process exits (before Python 3.13).
+    """
+
+    def __init__(self, name, size=0, create=False):
+        self.path = os.path.join(SHM_DIR, name)
+        flags = os.O_RDWR | (os.O_CREAT | os.O_EXCL if create else 0)
+        fd = os.open(self.path, flags, 0o600)
+        try:
+            if create:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self.buf = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        self.buf.close()
+
+    def unlink(self):
+        os.remove(self.path)
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock shared by every process on this host."""
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SharedRing:
+    """Fixed-size ring of numpy records in shared memory.
+
+    The header holds the total number of records ever written. Writers fill the records first
+    and bump the counter afterwards, so readers never see a position that is not written yet.
+    """
+
+    HEADER = 16
+
+    def __init__(self, shm, dtype, lock_path=None):
+        self.shm = shm
+        self.dtype = np.dtype(dtype)
+        self._header = np.ndarray((2,), dtype=np.uint64, buffer=shm.buf)
+        self.capacity = int(self._header[1])
+        self._records = np.ndarray((self.capacity,), dtype=self.dtype, buffer=shm.buf, offset=self.HEADER)
+        self.lock_path = lock_path
+
+    @classmethod
+    def create(cls, name, dtype, capacity, lock_path=None):
+        shm = _Segment(name, cls.HEADER + capacity * np.dtype(dtype).itemsize, create=True)
+        header = np.ndarray((2,), dtype=np.uint64, buffer=shm.buf)
+        header[0], header[1] = 0, capacity
+        return cls(shm, dtype, lock_path)
+
+    @classmethod
+    def attach(cls, name, dtype, lock_path=None):
+        return cls(_Segment(name), dtype, lock_path)
+
+    @property
+    def seq(self):
+        return int(self._header[0])
+
+    def append(self, records):
+        records = np.asarray(records, dtype=self.dtype).reshape(-1)
+        if self.lock_path is None:
+            self._write(records)
+        else:
+            with file_lock(self.lock_path):
+                self._write(records)
+
+    def _write(self, records):
+        end = self.seq + len(records)
+        # Only the last capacity records of an oversized batch survive
+        records = records[-self.capacity:]
+        positions = np.arange(end - len(records), end) % self.capacity
+        self._records[positions] = records
+        self._header[0] = end
+
+    def read_since(self, cursor):
+        """Records written after cursor, oldest first, and the new cursor."""
+        end = self.seq
+        start = max(cursor, end - self.capacity)
+        if start >= end:
+            return self._records[:0].copy(), end
+        records = self._records[np.arange(start, end) % self.capacity]
+        # Drop anything a writer lapped while it was being copied
+        overwritten = self.seq - self.capacity - start
+        if overwritten > 0:
+            records = records[overwritten:]
+        return records, end
+
+    def latest(self, n):
+        return self.read_since(max(self.seq - n, 0))[0]
+
+    def oldest(self):
+        """The oldest record still in the ring, None while it is empty"""
+        end = self.seq
+        if not end:
+            return None
+        return self._records[max(end - self.capacity, 0) % self.capacity].copy()
+
+    def read_range(self, field, low, high):
+        """Records with low <= field <= high, for a field that never decreases in write order.
+
+        Found with a binary search over the ring, so only the matching records are copied.
+        """
+        end = self.seq
+        start = max(end - self.capacity, 0)
+        first = self._search(field, low, start, end, right=False)
+        last = self._search(field, high, first, end, right=True)
+        records = self._records[np.arange(first, last) % self.capacity]
+        overwritten = self.seq - self.capacity - first
+        if overwritten > 0:
+            records = records[overwritten:]
+        return records
+
+    def _search(self, field, value, lo, hi, right):
+        values = self._records[field]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if values[mid % self.capacity] < value or (right and values[mid % self.capacity] == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def close(self):
+        self._header = self._records = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class SharedSlot:
+    """A JSON document in shared memory, guarded by a sequence lock.
+
+    The counter is odd while a write is in progress; readers retry until they copy a
+    document with the same even counter before and after.
+    """
+
+    HEADER = 16
+
+    def __init__(self, shm, lock_path=None):
+        self.shm = shm
+        self._header = np.ndarray((2,), dtype=np.uint64, buffer=shm.buf)
+        self.size = shm.size - self.HEADER
+        self.lock_path = lock_path
+
+    @classmethod
+    def create(cls, name, size, lock_path=None):
+        shm = _Segment(name, cls.HEADER + size, create=True)
+        np.ndarray((2,), dtype=np.uint64, buffer=shm.buf)[:] = 0
+        return cls(shm, lock_path)
+
+    @classmethod
+    def attach(cls, name, lock_path=None):
+        return cls(_Segment(name), lock_path)
+
+    @property
+    def version(self):
+        return int(self._header[0])
+
+    def set(self, value):
+        data = json.dumps(value, default=str).encode()
+        if len(data) > self.size:
+            raise ValueError(f"Value of {len(data)} bytes does not fit the {self.size} byte slot")
+        if self.lock_path is None:
+            self._write(data)
+        else:
+            with file_lock(self.lock_path):
+                self._write(data)
+
+    def _write(self, data):
+        seq = self.version
+        self._header[0] = seq + 1
+        self.shm.buf[self.HEADER:self.HEADER + len(data)] = data
+        self._header[1] = len(data)
+        self._header[0] = seq + 2
+
+    def get(self, default=None, retries=10000):
+        for _ in range(retries):
+            before = self.version
+            if before % 2:
+                continue
+            length = int(self._header[1])
+            data = bytes(self.shm.buf[self.HEADER:self.HEADER + length])
+            if self.version == before:
+                return json.loads(data) if length else default
+        # A writer died halfway through, nothing consistent to read
+        return default
+
+    def close(self):
+        self._header = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class SharedStore:
+    """The rings and slots shared between the ingester process and the web workers.
+
+    The latency, rollup and extended rings and the ingest, metrics, series, anomalies and extended_keys slots have a
+    single writer (the ingester); everything else can be written by any worker and is serialized with a lock file.
+    """
+
+    SINGLE_WRITER = ("latency", "ingest", "metrics", "series", "anomalies", "rollup_1s", "rollup_10s", "rollup_60s",
+                     "extended", "extended_keys")
+
+    def __init__(self, prefix, rings, slots):
+        self.prefix = prefix
+        self.rings = rings
+        self.slots = slots
+
+    @staticmethod
+    def lock_path(prefix):
+        return os.path.join(SHM_DIR, f"{prefix}.lock")
+
+    @classmethod
+    def create(cls, prefix):
+        lock = cls.lock_path(prefix)
+        rings = {name: SharedRing.create(f"{prefix}-{name}", dtype, capacity,
+                                         None if name in cls.SINGLE_WRITER else lock)
+                 for name, (dtype, capacity) in RINGS.items()}
+        slots = {name: SharedSlot.create(f"{prefix}-{name}", size, None if name in cls.SINGLE_WRITER else lock)
+                 for name, size in SLOTS.items()}
+        return cls(prefix, rings, slots)
+
+    @classmethod
+    def attach(cls, prefix):
+        lock = cls.lock_path(prefix)
+        rings = {name: SharedRing.attach(f"{prefix}-{name}", dtype, None if name in cls.SINGLE_WRITER else lock)
+                 for name, (dtype, _) in RINGS.items()}
+        slots = {name: SharedSlot.attach(f"{prefix}-{name}", None if name in cls.SINGLE_WRITER else lock)
+                 for name in SLOTS}
+        return cls(prefix, rings, slots)
+
+    def close(self):
+        for item in list(self.rings.values()) + list(self.slots.values()):
+            item.close()
+
+    def unlink(self):
+        for item in list(self.rings.values()) + list(self.slots.values()):
+            item.unlink()
+        try:
+            os.remove(self.lock_path(self.prefix))
+        except OSError:
+            pass
@@ -0,0 +1,111 @@
+import time
+
+import numpy as np
+
+# Seconds of per-second counts kept, the longest span a run's peak throughput is taken from
+WINDOW_S = 600
+
+
+class ThroughputCounter:
+    """Events per second at the sink, the running total and the newest event time seen.
+
+    Counts live in a fixed ring of per-second buckets indexed by second. Only the ingest thread
+    writes, so counting takes no lock; readers copy the ring and ignore buckets left over from
+    an earlier lap.
+    """
+
+    def __init__(self, window_s=WINDOW_S):
+        self.window_s = window_s
+        self.seconds = [-1] * window_s
+        self.counts = [0] * window_s
+        self.total = 0
+        self.max_event_ms = None
+
+    def add(self, received_ms, event_ms=None, count=1):
+        self._count(int(received_ms // 1000), count)
+        self.total += count
+        if event_ms is not None and (self.max_event_ms is None or event_ms > self.max_event_ms):
+            self.max_event_ms = event_ms
+
+    def add_many(self, received_ms, event_ms):
+        """A batch of results, numpy arrays of receive and event times (ms)"""
+        if not len(received_ms):
+            return
+        seconds, counts = np.unique((received_ms // 1000).astype(np.int64), return_counts=True)
+        for second, count in zip(seconds.tolist(), counts.tolist()):
+            self._count(second, count)
+        self.total += len(received_ms)
+        newest = float(event_ms.max())
+        if self.max_event_ms is None or newest > self.max_event_ms:
+            self.max_event_ms = newest
+
+    def _count(self, second, count):
+        i = second % self.window_s
+        if self.seconds[i] != second:
+            self.counts[i] = 0
+            self.seconds[i] = second
+        self.counts[i] += count
+
+    def snapshot(self):
+        """Plain data for the shared store: totals and the non-empty buckets as [second, count]"""
+        buckets = sorted([second, count] for second, count in zip(list(self.seconds), list(self.counts))
+                         if second >= 0 and count)
+        return {"total": self.total, "max_event_ms": self.max_event_ms, "buckets": buckets}
+
+
+def throughput_history(snapshot, now_ms=None, span_s=60):
+    """[(second, count)] of the last span_s complete seconds before now, empty seconds included"""
+    now = int((now_ms if now_ms is not None else time.time() * 1000) // 1000)
+    counts = dict(map(tuple, snapshot["buckets"]))
+    return [(second, counts.get(second, 0)) for second in range(now - span_s, now)]
+
+
+def throughput_stats(snapshot, now_ms=None, span_s=60):
+    """Events in the last complete second, peak second and event-time lag, as of now_ms"""
+    now_ms = now_ms if now_ms is not None else time.time() * 1000
+    history = throughput_history(snapshot, now_ms, span_s)
+    max_event_ms = snapshot["max_event_ms"]
+    return {
+        "total": snapshot["total"],
+        "rate": history[-1][1] if history else 0,
+        "peak": max((count for _, count in history), default=0),
+        "lag_ms": now_ms - max_event_ms if max_event_ms is not None else None,
+        "history": history,
+    }
+
+
+def run_throughput(snapshots, baseline, started_ms, finished_ms):
+    """Sink metrics of one run from throughput snapshots taken at its end.
+
+    baseline holds each series' total when the run started. The peak only covers the last
+    WINDOW_S seconds of longer runs.
+    """
+    duration_s = max((finished_ms - started_ms) / 1000, 1e-9)
+    first, last = int(started_ms // 1000), int(finished_ms // 1000)
+    per_series = {}
+    combined = {}
+    for name, snapshot in snapshots.items():
+        events = snapshot["total"] - baseline.get(name, 0)
+        if events <= 0:
+            continue
+        in_run = [(second, count) for second, count in snapshot["buckets"] if first <= second <= last]
+        for second, count in in_run:
+            combined[second] = combined.get(second, 0) + count
+        max_event_ms = snapshot["max_event_ms"]
+        per_series[name] = {
+            "events": events,
+            "throughput_mean": events / duration_s,
+            "throughput_peak": max((count for _, count in in_run), default=0),
+            "event_time_lag_ms": finished_ms - max_event_ms if max_event_ms is not None else None,
+        }
+    if not per_series:
+        return {}
+    events = sum(s["events"] for s in per_series.values())
+    lags = [s["event_time_lag_ms"] for s in per_series.values() if s["event_time_lag_ms"] is not None]
+    return {
+        "sink_events": events,
+        "sink_throughput_mean": events / duration_s,
+        "sink_throughput_peak": max(combined.values(), default=0),
+        "sink_event_time_lag_ms": max(lags) if lags else None,
+        "sink_series": per_series,
+    }
@@ -0,0 +1,248 @@
+import json
+import math
+import os
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from utils.hardware import assign_hardware, hardware_at, links_at, link_arrays
+
+TOPOLOGY_TYPES = ("star", "mesh", "tree")
+
+# Above this many edges nodes are collapsed into groups with bundled edges
+MAX_RENDER_EDGES = 400
+MAX_GROUPS = 16
+
+
+def subtree_size(i, num, fanout=2):
+    """Size of the subtree rooted at i in a heap-ordered k-ary tree of num nodes.
+
+    Level by level the subtree covers the contiguous index range [lo, hi], so this is
+    O(log num) instead of walking every descendant.
+    """
+    size = 0
+    lo = hi = i
+    while lo < num:
+        size += min(hi, num - 1) - lo + 1
+        lo = fanout * lo + 1
+        hi = fanout * hi + fanout
+    return size
+
+
+def count_descendants(i, num, fanout=2):
+    return subtree_size(i, num, fanout) - 1
+
+
+def edge_array(kind, num, degree=None):
+    """Edges of a topology as an (m, 2) array of node indices with source < target.
+
+    degree is the fan-out of a tree (default 2) or the neighbours per node of a mesh (default
+    all). A mesh needs at least two neighbours per node to stay connected, so degree 1 builds
+    the same ring as degree 2.
+    """
+    if num < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    if kind == "star":
+        targets = np.arange(1, num)
+        return np.column_stack([np.zeros_like(targets), targets])
+    if kind == "tree":
+        fanout = degree or 2
+        targets = np.arange(1, num)
+        return np.column_stack([(targets - 1) // fanout, targets])
+    if kind == "mesh":
+        if not degree or degree >= num - 1:
+            return np.column_stack(np.triu_indices(num, 1))
+        # Partial mesh: ring lattice where every node links to its degree nearest neighbours
+        nodes = np.arange(num)
+        pairs = [np.column_stack([nodes, (nodes + step) % num]) for step in range(1, max(degree // 2, 1) + 1)]
+        if degree % 2 and degree > 1:
+            # Odd degree: one more chord per node to the opposite side of the ring (Harary graph);
+            # with an odd node count one node ends up with degree + 1
+            half = num // 2
+            sources = np.arange((num + 1) // 2)
+            pairs.append(np.column_stack([sources, (sources + half) % num]))
+        pairs = np.sort(np.concatenate(pairs), axis=1)
+        return np.unique(pairs, axis=0)
+    raise ValueError(f"Unknown topology type: {kind}")
+
+
+@lru_cache(maxsize=16)
+def generate_topology(kind, num, degree=None, heterogeneity="homogeneous", seed=0, node_profiles=()):
+    """Topology config handed to runBenchmark.py; cached, treat the result as read-only.
+
+    node_profiles is a tuple of (node id, hardware profile) pairs pinning individual nodes.
+    """
+    edges = edge_array(kind, num, degree)
+    overrides = {node_id: profile for node_id, profile in node_profiles if int(node_id) < num}
+    hardware, links = assign_hardware(num, len(edges), heterogeneity, seed, overrides)
+    nodes = []
+    for i in range(num):
+        role = "coordinator" if i == 0 else "worker"
+        nodes.append({"id": i, "role": role, **hardware[i]})
+    return {
+        "type": kind,
+        "num_nodes": num,
+        "degree": degree,
+        "heterogeneity": heterogeneity,
+        "seed": seed,
+        "nodes": nodes,
+        "edges": edges.tolist(),
+        "links": links,
+    }
+
+
+def node_element(node, label=None):
+    return {'data': {'id': str(node['id']), 'label': label or f"Node {node['id']}",
+                     'cpu': node['cpu'], 'memory': node['memory'], 'profile': node['profile']}}
+
+
+def edge_element(source, target, link):
+    return {'data': {'source': str(source), 'target': str(target), 'link': link['link'],
+                     'bandwidth': link['bandwidth_mbit'], 'latency': link['latency_ms']}}
+
+
+def save_topology(topology, directory=os.path.join("results", "topologies"), name=None):
+    os.makedirs(directory, exist_ok=True)
+    if name is None:
+        timestamp = datetime.now().strftime("%d-%m-%y_%H_%M_%S_%f")
+        name = f"{topology['type']}_{topology['num_nodes']}_{timestamp}.json"
+    path = os.path.join(directory, name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(topology, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_topology(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def topology_elements(kind, num, degree=None, expanded=(), heterogeneity="homogeneous", seed=0, node_profiles=()):
+    """Cytoscape elements for a topology, collapsing parts of it so large graphs stay responsive."""
+    return _topology_elements(kind, num, degree, frozenset(expanded), heterogeneity, seed, tuple(node_profiles))
+
+
+@lru_cache(maxsize=32)
+def _topology_elements(kind, num, degree, expanded, heterogeneity, seed, node_profiles):
+    # Cached results are shared between callers, treat them as read-only. Hardware and links
+    # are looked up by node and edge index for what is drawn only, never for the whole topology.
+    overrides = {int(node_id): profile for node_id, profile in node_profiles if int(node_id) < num}
+    if kind == "tree":
+        return _build_tree_elements(num, expanded, degree or 2, heterogeneity, seed, overrides)
+    return _grouped_elements(kind, num, degree, expanded, heterogeneity, seed, overrides)
+
+
+def build_tree_elements(num, expanded, fanout=2):
+    return _topology_elements("tree", num, fanout, frozenset(expanded), "homogeneous", 0, ())
+
+
+def _build_tree_elements(num, expanded, fanout=2, heterogeneity="homogeneous", seed=0, overrides=None):
+    if num <= 0:
+        return []
+    # Explicit stack keeps the same element order as a depth-first walk without recursion
+    walk = []
+    stack = [("node", 0, None)]
+    while stack:
+        kind, i, parent = stack.pop()
+        walk.append((kind, i, parent))
+        if kind == "edge" or i not in expanded:
+            continue
+        first_child = fanout * i + 1
+        for child in reversed(range(first_child, min(first_child + fanout, num))):
+            stack.append(("edge", child, i))
+            stack.append(("node", child, None))
+
+    # Both in walk order, consumed in the same order below
+    hardware = iter(hardware_at([i for kind, i, _ in walk if kind == "node"], heterogeneity, seed, overrides))
+    # Tree edges are generated in child order, so the link into node i is edge i - 1
+    links = iter(links_at([i - 1 for kind, i, _ in walk if kind == "edge"], heterogeneity, seed))
+    elements = []
+    for kind, i, parent in walk:
+        if kind == "edge":
+            elements.append(edge_element(parent, i, next(links)))
+            continue
+        if fanout * i + 1 < num and i not in expanded:
+            label = f"Node {i} [+{count_descendants(i, num, fanout)}]"
+        else:
+            label = f"Node {i}"
+        elements.append(node_element({"id": i, **next(hardware)}, label))
+    return elements
+
+
+def node_groups(kind, num, num_edges):
+    """Group index per node for level-of-detail rendering, or None if the graph is small enough."""
+    if num_edges <= MAX_RENDER_EDGES:
+        return None
+    nodes = np.arange(num)
+    if kind == "star":
+        # Keep the hub on its own and split the leaves into contiguous ranges
+        group_size = math.ceil((num - 1) / (MAX_GROUPS - 1))
+        groups = 1 + (nodes - 1) // group_size
+        groups[0] = 0
+        return groups
+    return nodes // math.ceil(num / MAX_GROUPS)
+
+
+def _grouped_elements(kind, num, degree, expanded, heterogeneity="homogeneous", seed=0, overrides=None):
+    edges = edge_array(kind, num, degree)
+    groups = node_groups(kind, num, len(edges))
+
+    if groups is None:
+        elements = [node_element({"id": i, **hardware})
+                    for i, hardware in enumerate(hardware_at(np.arange(num), heterogeneity, seed, overrides))]
+        links = links_at(np.arange(len(edges)), heterogeneity, seed)
+        elements += [edge_element(u, v, link) for (u, v), link in zip(edges.tolist(), links)]
+        return elements
+
+    n_groups = int(groups.max()) + 1
+    sizes = np.bincount(groups, minlength=n_groups)
+    open_groups = np.zeros(n_groups, dtype=bool)
+    for item in expanded:
+        if isinstance(item, str) and item.startswith("g"):
+            open_groups[int(item[1:])] = True
+    # A group of one is always drawn as its node
+    open_groups |= sizes == 1
+    shown = open_groups[groups]
+
+    # Map every edge endpoint to either its node or its collapsed group, then bundle duplicates
+    endpoint = np.where(shown, np.arange(num), num + groups)
+    a = endpoint[edges[:, 0]]
+    b = endpoint[edges[:, 1]]
+    inside = a == b
+    internal = np.bincount(groups[edges[inside, 0]], minlength=n_groups)
+    lo = np.minimum(a[~inside], b[~inside])
+    hi = np.maximum(a[~inside], b[~inside])
+    width = num + n_groups
+    keys, inverse, counts = np.unique(lo * width + hi, return_inverse=True, return_counts=True)
+    # Bundles carry the summed capacity and the worst latency of their links
+    bandwidth, latency = link_arrays(len(edges), heterogeneity, seed)
+    bandwidth, latency = bandwidth[~inside], latency[~inside]
+    bundle_bandwidth = np.bincount(inverse, weights=bandwidth, minlength=len(keys))
+    bundle_latency = np.zeros(len(keys))
+    np.maximum.at(bundle_latency, inverse, latency)
+
+    def element_id(index):
+        return str(index) if index < num else f"g{index - num}"
+
+    elements = []
+    shown_nodes = np.flatnonzero(shown)
+    for i, hardware in zip(shown_nodes.tolist(), hardware_at(shown_nodes, heterogeneity, seed, overrides)):
+        elements.append(node_element({"id": i, **hardware}))
+    # Groups are contiguous index ranges, so each one is described by its first node and size
+    starts = np.searchsorted(groups, np.arange(n_groups))
+    for g in np.flatnonzero(~open_groups):
+        first, last = starts[g], starts[g] + sizes[g] - 1
+        elements.append({
+            'data': {'id': f"g{g}", 'label': f"Nodes {first}–{last} [{sizes[g]}]",
+                     'members': int(sizes[g]), 'internal_links': int(internal[g])},
+            'classes': 'group',
+        })
+    for key, count, bw, lat in zip(keys, counts, bundle_bandwidth, bundle_latency):
+        source, target = divmod(int(key), width)
+        data = {'source': element_id(source), 'target': element_id(target),
+                'bandwidth': float(bw), 'latency': float(lat), 'count': int(count)}
+        elements.append({'data': data, 'classes': 'bundle' if count > 1 else ''})
+    return elements
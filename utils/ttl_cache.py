@@ -0,0 +1,51 @@
+import functools
+import threading
+import time
+
+
+def ttl_cache(ttl):
+    """Cache a function's results per arguments for ttl seconds.
+
+    Once an entry expires the stale value is still returned while a background thread
+    recomputes it, so only the very first call for some arguments waits.
+    """
+    def decorator(fn):
+        entries = {}
+        refreshing = set()
+        lock = threading.Lock()
+
+        def refresh(key, args, kwargs):
+            try:
+                value = fn(*args, **kwargs)
+                with lock:
+                    entries[key] = (value, time.monotonic() + ttl)
+            finally:
+                with lock:
+                    refreshing.discard(key)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    return entry[0]
+                stale = entry is not None and key not in refreshing
+                if stale:
+                    refreshing.add(key)
+            if entry is None:
+                value = fn(*args, **kwargs)
+                with lock:
+                    entries[key] = (value, time.monotonic() + ttl)
+                return value
+            if stale:
+                threading.Thread(target=refresh, args=(key, args, kwargs), daemon=True).start()
+            return entry[0]
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator